@@ -6,6 +6,44 @@ FAULTY_NODES = 1
 
 PORTLIST = [50054, 50055, 50056, 50057]
 
+OUTBOX = True           # coalesce peer sends into one bft.MessageBatch per peer
+OUTBOX_FLUSH_S = 0.0    # extra wait before draining a peer queue (0 = drain immediately)
+OUTBOX_MAX_BATCH = 512  # max messages per SendBatch
+OUTBOX_MAX_PENDING = 65536  # per-peer queue cap; beyond it the oldest message is dropped
+ABBA_FLUSH_S = 0.001    # ABBA votes may wait this long in the outbox so votes of many instances share a batch
+TRANSPORT = "stream"    # "stream": one long-lived Node.Stream per peer; "unary": one SendBatch per flush
+STREAM_WINDOW = 64      # max unacknowledged batches per peer stream
+PIPELINE_WINDOW = 8     # max undelivered client instances in flight per node
+SUBMIT_TIMEOUT_S = 30.0 # how long a SUBMIT Propose waits for its ordered decision
+CLIENT_WAITERS = 32     # client Proposes (TX / SUBMIT / admission) that may block a server thread at once; more get "busy"
+ADMIT_TIMEOUT_S = 10.0  # how long a client Propose waits for room in the window before RESOURCE_EXHAUSTED
+STALL_SKIP_S = 10.0     # no delivery for this long with work queued behind: propose a no-op for the stuck instance (0 = off)
+BATCH_SIZE = 1000       # txs per MVBA proposal
+BATCH_TIMEOUT_S = 0.05  # cut a partial batch after this long
+MEMPOOL_MAX = 100000    # pending txs per node before TX is refused ("full")
+MEMPOOL = False         # join every instance a peer starts with a (possibly empty) TX batch, so a TX sent to one node commits
+CERT_BACKEND = "sim"    # VCBC certificates: "sim" (sleep-modelled costs) or "schnorr" (secp256k1 multi-signature)
+KEY_SEED = "async-bft-suite"  # without KEY_DIR every key is derived from this public seed: insecure, tests only
+KEY_DIR = ""            # per-node key files written by the dealer (python -m src.keys); see src/keys.py
+VERIFY_WORKERS = 0      # processes for share/cert verification (0 = inline on the actor)
+VERIFY_BATCH = 64       # max signature shares per batch verification job
+CHARGE_THREADS = 4      # threads that sleep modelled crypto costs off the actor (see cost.py)
+CERT_CACHE_SIZE = 4096  # verified certificates/shares remembered (LRU)
+FUTURE_MAX_PER_SENDER = 1024  # early (future round / unstarted instance) ABBA msgs buffered per sender
+ABBA_ENGINE = "dict"    # ABBA vote storage: "dict" (per-message tallies) or "numpy" (vectorized, abba_vec)
+COIN_BACKEND = "hash"   # common coin: "hash" (sha256 XOR, insecure) or "threshold" (CKS threshold coin)
+COIN_PIGGYBACK = True   # send my coin share for round r inside MAINVOTE(r) instead of a separate COIN round-trip
+COIN_LOOKAHEAD = 2      # rounds of my own coin shares computed ahead of need
+DISPERSAL = False       # VCBC sends each node one Reed-Solomon fragment (cert on the Merkle root) instead of the full value
+RETAIN_DECIDED = 64     # decided instances kept below the agreed low watermark
+PRUNE_INTERVAL_S = 1.0  # how often the pruner recomputes the watermark
+DECIDED_LOG = 1024      # MVBA outputs kept past pruning for peers that fall behind (see catchup.py)
+CATCHUP_AFTER_S = 2.0   # no delivery for this long with work queued: ask peers for decided results (0 = off)
+METRICS_PORT = 0        # serve /metrics (Prometheus text) and /metrics.json on this port (0 = off)
+METRICS_DUMP = ""       # write the JSON metrics snapshot to this file periodically ("" = off)
+METRICS_DUMP_S = 10.0   # how often METRICS_DUMP is rewritten
+ACTOR_SHARDS = 1        # protocol actor threads per node (instances sharded by inst % shards; see actor.ActorPool before raising)
+
 PREPROCESS = "PREPROCESS"
 PREVOTE    = "PREVOTE"
 MAINVOTE   = "MAINVOTE"
@@ -78,6 +116,7 @@ COMMIT = "Commit"
 TYPE = "type"
 ROUND = "round"
 VALUE = "value"
+DIGEST = "digest"
 JUSTIFICATION = "justification"
 SIGN = "sign"
 INSTANCE = "instance"
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: bft.proto
+# Protobuf Python Version: 5.29.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    29,
+    0,
+    '',
+    'bft.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tbft.proto\x12\x03\x62\x66t\"i\n\x07Message\x12\x13\n\x0bprotocol_id\x18\x01 \x01(\t\x12\x11\n\tsender_id\x18\x02 \x01(\x05\x12\x13\n\x0binstance_id\x18\x03 \x01(\x05\x12\x10\n\x08msg_type\x18\x04 \x01(\t\x12\x0f\n\x07payload\x18\x05 \x01(\x0c\"_\n\x0cMessageBatch\x12\x1e\n\x08messages\x18\x01 \x03(\x0b\x32\x0c.bft.Message\x12\x11\n\tsender_id\x18\x02 \x01(\x05\x12\x0f\n\x07session\x18\x03 \x01(\x04\x12\x0b\n\x03seq\x18\x04 \x01(\x04\"A\n\x03\x41\x63k\x12\n\n\x02ok\x18\x01 \x01(\x08\x12\x1e\n\x06status\x18\x02 \x01(\x0e\x32\x0e.bft.AckStatus\x12\x0e\n\x06reason\x18\x03 \x01(\t*4\n\tAckStatus\x12\x0c\n\x08\x41\x43\x43\x45PTED\x10\x00\x12\x0c\n\x08REJECTED\x10\x01\x12\x0b\n\x07PENDING\x10\x02\x32\x82\x01\n\x04Node\x12%\n\x0bSendMessage\x12\x0c.bft.Message\x1a\x08.bft.Ack\x12(\n\tSendBatch\x12\x11.bft.MessageBatch\x1a\x08.bft.Ack\x12)\n\x06Stream\x12\x11.bft.MessageBatch\x1a\x08.bft.Ack(\x01\x30\x01\x62\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'bft_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_ACKSTATUS']._serialized_start=289
+  _globals['_ACKSTATUS']._serialized_end=341
+  _globals['_MESSAGE']._serialized_start=18
+  _globals['_MESSAGE']._serialized_end=123
+  _globals['_MESSAGEBATCH']._serialized_start=125
+  _globals['_MESSAGEBATCH']._serialized_end=220
+  _globals['_ACK']._serialized_start=222
+  _globals['_ACK']._serialized_end=287
+  _globals['_NODE']._serialized_start=344
+  _globals['_NODE']._serialized_end=474
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,52 @@
+from google.protobuf.internal import containers as _containers
+from google.protobuf.internal import enum_type_wrapper as _enum_type_wrapper
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import message as _message
+from typing import ClassVar as _ClassVar, Iterable as _Iterable, Mapping as _Mapping, Optional as _Optional, Union as _Union
+
+DESCRIPTOR: _descriptor.FileDescriptor
+
+class AckStatus(int, metaclass=_enum_type_wrapper.EnumTypeWrapper):
+    __slots__ = ()
+    ACCEPTED: _ClassVar[AckStatus]
+    REJECTED: _ClassVar[AckStatus]
+    PENDING: _ClassVar[AckStatus]
+ACCEPTED: AckStatus
+REJECTED: AckStatus
+PENDING: AckStatus
+
+class Message(_message.Message):
+    __slots__ = ("protocol_id", "sender_id", "instance_id", "msg_type", "payload")
+    PROTOCOL_ID_FIELD_NUMBER: _ClassVar[int]
+    SENDER_ID_FIELD_NUMBER: _ClassVar[int]
+    INSTANCE_ID_FIELD_NUMBER: _ClassVar[int]
+    MSG_TYPE_FIELD_NUMBER: _ClassVar[int]
+    PAYLOAD_FIELD_NUMBER: _ClassVar[int]
+    protocol_id: str
+    sender_id: int
+    instance_id: int
+    msg_type: str
+    payload: bytes
+    def __init__(self, protocol_id: _Optional[str] = ..., sender_id: _Optional[int] = ..., instance_id: _Optional[int] = ..., msg_type: _Optional[str] = ..., payload: _Optional[bytes] = ...) -> None: ...
+
+class MessageBatch(_message.Message):
+    __slots__ = ("messages", "sender_id", "session", "seq")
+    MESSAGES_FIELD_NUMBER: _ClassVar[int]
+    SENDER_ID_FIELD_NUMBER: _ClassVar[int]
+    SESSION_FIELD_NUMBER: _ClassVar[int]
+    SEQ_FIELD_NUMBER: _ClassVar[int]
+    messages: _containers.RepeatedCompositeFieldContainer[Message]
+    sender_id: int
+    session: int
+    seq: int
+    def __init__(self, messages: _Optional[_Iterable[_Union[Message, _Mapping]]] = ..., sender_id: _Optional[int] = ..., session: _Optional[int] = ..., seq: _Optional[int] = ...) -> None: ...
+
+class Ack(_message.Message):
+    __slots__ = ("ok", "status", "reason")
+    OK_FIELD_NUMBER: _ClassVar[int]
+    STATUS_FIELD_NUMBER: _ClassVar[int]
+    REASON_FIELD_NUMBER: _ClassVar[int]
+    ok: bool
+    status: AckStatus
+    reason: str
+    def __init__(self, ok: bool = ..., status: _Optional[_Union[AckStatus, str]] = ..., reason: _Optional[str] = ...) -> None: ...
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10helloworld.proto\x12\nhelloworld\":\n\x0e\x45LeaderRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0e\n\x06\x63share\x18\x03 \x01(\t\"8\n\x0c\x45LeaderReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0e\n\x06\x63share\x18\x03 \x01(\t\"I\n\x11\x43SelectionRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0f\n\x07parties\x18\x03 \x01(\x05\x12\t\n\x01\x66\x18\x04 \x01(\x05\"\x1f\n\x0f\x43SelectionReply\x12\x0c\n\x04\x63omm\x18\x01 \x01(\x05\"V\n\nPRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"\x17\n\x08PROReply\x12\x0b\n\x03yes\x18\x01 \x01(\t\"]\n\x11\x43lassicPRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"[\n\x0f\x43lassicPROReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"P\n\x14\x43lassicCommitRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0c\n\x04list\x18\x04 \x01(\t\"N\n\x12\x43lassicCommitReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0c\n\x04list\x18\x04 \x01(\t\"+\n\x0b\x43PRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08instance\x18\x02 \x01(\x05\"8\n\tCPROReply\x12\r\n\x05\x63\x66rom\x18\x01 \x01(\t\x12\r\n\x05proof\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\t\"h\n\x0bRECORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0f\n\x07recomID\x18\x04 \x01(\t\x12\r\n\x05proof\x18\x05 \x01(\t\x12\r\n\x05value\x18\x06 \x01(\t\"f\n\tRECOReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0f\n\x07recomID\x18\x04 \x01(\t\x12\r\n\x05proof\x18\x05 \x01(\t\x12\r\n\x05value\x18\x06 \x01(\t\" \n\x0e\x43ommitteMember\x12\x0e\n\x06member\x18\x01 \x01(\x05\"8\n\tCommittee\x12+\n\x07\x43Member\x18\x01 \x03(\x0b\x32\x1a.helloworld.CommitteMember\"N\n\x05mDict\x12\x10\n\x08instance\x18\x01 \x01(\x05\x12\x0c\n\x04step\x18\x02 \x01(\x05\x12\n\n\x02ts\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\t\x12\n\n\x02id\x18\x05 \x01(\t\"|\n\x0bmessageABBA\x12\x10\n\x08instance\x18\x01 \x01(\x05\x12\r\n\x05round\x18\x02 \x01(\x05\x12\r\n\x05value\x18\x03 \x01(\x05\x12\x15\n\rjustification\x18\x04 \x01(\t\x12\x0c\n\x04sign\x18\x05 \x01(\t\x12\x0c\n\x04type\x18\x06 \x01(\t\x12\n\n\x02id\x18\x07 \x01(\t\"7\n\x0b\x41\x42\x42\x41Request\x12(\n\x07message\x18\x01 \x01(\x0b\x32\x17.helloworld.messageABBA\"5\n\tABBAReply\x12(\n\x07message\x18\x01 \x01(\x0b\x32\x17.helloworld.messageABBA\"\x1c\n\x0cHelloRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"-\n\x0bVCBCRequest\x12\x1e\n\x03msg\x18\x01 \x01(\x0b\x32\x11.helloworld.mDict\"+\n\tVCBCReply\x12\x1e\n\x03msg\x18\x01 \x01(\x0b\x32\x11.helloworld.mDict\"\x1d\n\nHelloReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\xc0\x07\n\x07Greeter\x12>\n\x08SayHello\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x12\x38\n\x04VCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12?\n\x0b\x43lassicVCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12\x39\n\x05pVCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12\x38\n\x04\x41\x42\x42\x41\x12\x17.helloworld.ABBARequest\x1a\x15.helloworld.ABBAReply\"\x00\x12?\n\x0b\x43lassicABBA\x12\x17.helloworld.ABBARequest\x1a\x15.helloworld.ABBAReply\"\x00\x12\x39\n\x07Propose\x12\x16.helloworld.PRORequest\x1a\x14.helloworld.PROReply\"\x00\x12N\n\x0e\x43lassicPropose\x12\x1d.helloworld.ClassicPRORequest\x1a\x1b.helloworld.ClassicPROReply\"\x00\x12S\n\rClassicCommit\x12 .helloworld.ClassicCommitRequest\x1a\x1e.helloworld.ClassicCommitReply\"\x00\x12\x43\n\x0f\x43ollectProposal\x12\x17.helloworld.CPRORequest\x1a\x15.helloworld.CPROReply\"\x00\x12=\n\tRecommend\x12\x17.helloworld.RECORequest\x1a\x15.helloworld.RECOReply\"\x00\x12K\n\x13SayHelloStreamReply\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x30\x01\x12L\n\x12SayHelloBidiStream\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00(\x01\x30\x01\x12\x45\n\x0b\x45lectLeader\x12\x1a.helloworld.ELeaderRequest\x1a\x18.helloworld.ELeaderReply\"\x00\x32\xa6\x01\n\x07\x43\x65ntral\x12\x45\n\x0b\x45lectLeader\x12\x1a.helloworld.ELeaderRequest\x1a\x18.helloworld.ELeaderReply\"\x00\x12T\n\x12\x43ommitteeSelection\x12\x1d.helloworld.CSelectionRequest\x1a\x1b.helloworld.CSelectionReply\"\x00\x30\x01\x42\x36\n\x1bio.grpc.examples.helloworldB\x0fHelloWorldProtoP\x01\xa2\x02\x03HLWb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x10helloworld.proto\x12\nhelloworld\":\n\x0e\x45LeaderRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0e\n\x06\x63share\x18\x03 \x01(\t\"8\n\x0c\x45LeaderReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0e\n\x06\x63share\x18\x03 \x01(\t\"I\n\x11\x43SelectionRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04view\x18\x02 \x01(\x05\x12\x0f\n\x07parties\x18\x03 \x01(\x05\x12\t\n\x01\x66\x18\x04 \x01(\x05\"\x1f\n\x0f\x43SelectionReply\x12\x0c\n\x04\x63omm\x18\x01 \x01(\x05\"V\n\nPRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"\x17\n\x08PROReply\x12\x0b\n\x03yes\x18\x01 \x01(\t\"]\n\x11\x43lassicPRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"[\n\x0f\x43lassicPROReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\r\n\x05proof\x18\x04 \x01(\t\x12\r\n\x05value\x18\x05 \x01(\t\"P\n\x14\x43lassicCommitRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0c\n\x04list\x18\x04 \x01(\t\"N\n\x12\x43lassicCommitReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0c\n\x04list\x18\x04 \x01(\t\"+\n\x0b\x43PRORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08instance\x18\x02 \x01(\x05\"8\n\tCPROReply\x12\r\n\x05\x63\x66rom\x18\x01 \x01(\t\x12\r\n\x05proof\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\t\"h\n\x0bRECORequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0f\n\x07recomID\x18\x04 \x01(\t\x12\r\n\x05proof\x18\x05 \x01(\t\x12\r\n\x05value\x18\x06 \x01(\t\"f\n\tRECOReply\x12\n\n\x02id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\x12\x10\n\x08instance\x18\x03 \x01(\x05\x12\x0f\n\x07recomID\x18\x04 \x01(\t\x12\r\n\x05proof\x18\x05 \x01(\t\x12\r\n\x05value\x18\x06 \x01(\t\" \n\x0e\x43ommitteMember\x12\x0e\n\x06member\x18\x01 \x01(\x05\"8\n\tCommittee\x12+\n\x07\x43Member\x18\x01 \x03(\x0b\x32\x1a.helloworld.CommitteMember\"N\n\x05mDict\x12\x10\n\x08instance\x18\x01 \x01(\x05\x12\x0c\n\x04step\x18\x02 \x01(\x05\x12\n\n\x02ts\x18\x03 \x01(\t\x12\r\n\x05value\x18\x04 \x01(\t\x12\n\n\x02id\x18\x05 \x01(\t\"\x8b\x01\n\x0bmessageABBA\x12\x10\n\x08instance\x18\x01 \x01(\x05\x12\r\n\x05round\x18\x02 \x01(\x05\x12\r\n\x05value\x18\x03 \x01(\x05\x12\x15\n\rjustification\x18\x04 \x01(\t\x12\x0c\n\x04sign\x18\x05 \x01(\t\x12\x0c\n\x04type\x18\x06 \x01(\t\x12\n\n\x02id\x18\x07 \x01(\t\x12\r\n\x05index\x18\x08 \x01(\x05\"7\n\x0b\x41\x42\x42\x41Request\x12(\n\x07message\x18\x01 \x01(\x0b\x32\x17.helloworld.messageABBA\"5\n\tABBAReply\x12(\n\x07message\x18\x01 \x01(\x0b\x32\x17.helloworld.messageABBA\"\x1c\n\x0cHelloRequest\x12\x0c\n\x04name\x18\x01 \x01(\t\"-\n\x0bVCBCRequest\x12\x1e\n\x03msg\x18\x01 \x01(\x0b\x32\x11.helloworld.mDict\"+\n\tVCBCReply\x12\x1e\n\x03msg\x18\x01 \x01(\x0b\x32\x11.helloworld.mDict\"\x1d\n\nHelloReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\xc0\x07\n\x07Greeter\x12>\n\x08SayHello\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x12\x38\n\x04VCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12?\n\x0b\x43lassicVCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12\x39\n\x05pVCBC\x12\x17.helloworld.VCBCRequest\x1a\x15.helloworld.VCBCReply\"\x00\x12\x38\n\x04\x41\x42\x42\x41\x12\x17.helloworld.ABBARequest\x1a\x15.helloworld.ABBAReply\"\x00\x12?\n\x0b\x43lassicABBA\x12\x17.helloworld.ABBARequest\x1a\x15.helloworld.ABBAReply\"\x00\x12\x39\n\x07Propose\x12\x16.helloworld.PRORequest\x1a\x14.helloworld.PROReply\"\x00\x12N\n\x0e\x43lassicPropose\x12\x1d.helloworld.ClassicPRORequest\x1a\x1b.helloworld.ClassicPROReply\"\x00\x12S\n\rClassicCommit\x12 .helloworld.ClassicCommitRequest\x1a\x1e.helloworld.ClassicCommitReply\"\x00\x12\x43\n\x0f\x43ollectProposal\x12\x17.helloworld.CPRORequest\x1a\x15.helloworld.CPROReply\"\x00\x12=\n\tRecommend\x12\x17.helloworld.RECORequest\x1a\x15.helloworld.RECOReply\"\x00\x12K\n\x13SayHelloStreamReply\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00\x30\x01\x12L\n\x12SayHelloBidiStream\x12\x18.helloworld.HelloRequest\x1a\x16.helloworld.HelloReply\"\x00(\x01\x30\x01\x12\x45\n\x0b\x45lectLeader\x12\x1a.helloworld.ELeaderRequest\x1a\x18.helloworld.ELeaderReply\"\x00\x32\xa6\x01\n\x07\x43\x65ntral\x12\x45\n\x0b\x45lectLeader\x12\x1a.helloworld.ELeaderRequest\x1a\x18.helloworld.ELeaderReply\"\x00\x12T\n\x12\x43ommitteeSelection\x12\x1d.helloworld.CSelectionRequest\x1a\x1b.helloworld.CSelectionReply\"\x00\x30\x01\x42\x36\n\x1bio.grpc.examples.helloworldB\x0fHelloWorldProtoP\x01\xa2\x02\x03HLWb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -66,22 +66,22 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_COMMITTEE']._serialized_end=1124
   _globals['_MDICT']._serialized_start=1126
   _globals['_MDICT']._serialized_end=1204
-  _globals['_MESSAGEABBA']._serialized_start=1206
-  _globals['_MESSAGEABBA']._serialized_end=1330
-  _globals['_ABBAREQUEST']._serialized_start=1332
-  _globals['_ABBAREQUEST']._serialized_end=1387
-  _globals['_ABBAREPLY']._serialized_start=1389
-  _globals['_ABBAREPLY']._serialized_end=1442
-  _globals['_HELLOREQUEST']._serialized_start=1444
-  _globals['_HELLOREQUEST']._serialized_end=1472
-  _globals['_VCBCREQUEST']._serialized_start=1474
-  _globals['_VCBCREQUEST']._serialized_end=1519
-  _globals['_VCBCREPLY']._serialized_start=1521
-  _globals['_VCBCREPLY']._serialized_end=1564
-  _globals['_HELLOREPLY']._serialized_start=1566
-  _globals['_HELLOREPLY']._serialized_end=1595
-  _globals['_GREETER']._serialized_start=1598
-  _globals['_GREETER']._serialized_end=2558
-  _globals['_CENTRAL']._serialized_start=2561
-  _globals['_CENTRAL']._serialized_end=2727
+  _globals['_MESSAGEABBA']._serialized_start=1207
+  _globals['_MESSAGEABBA']._serialized_end=1346
+  _globals['_ABBAREQUEST']._serialized_start=1348
+  _globals['_ABBAREQUEST']._serialized_end=1403
+  _globals['_ABBAREPLY']._serialized_start=1405
+  _globals['_ABBAREPLY']._serialized_end=1458
+  _globals['_HELLOREQUEST']._serialized_start=1460
+  _globals['_HELLOREQUEST']._serialized_end=1488
+  _globals['_VCBCREQUEST']._serialized_start=1490
+  _globals['_VCBCREQUEST']._serialized_end=1535
+  _globals['_VCBCREPLY']._serialized_start=1537
+  _globals['_VCBCREPLY']._serialized_end=1580
+  _globals['_HELLOREPLY']._serialized_start=1582
+  _globals['_HELLOREPLY']._serialized_end=1611
+  _globals['_GREETER']._serialized_start=1614
+  _globals['_GREETER']._serialized_end=2574
+  _globals['_CENTRAL']._serialized_start=2577
+  _globals['_CENTRAL']._serialized_end=2743
 # @@protoc_insertion_point(module_scope)
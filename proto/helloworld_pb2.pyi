@@ -192,7 +192,7 @@ class mDict(_message.Message):
     def __init__(self, instance: _Optional[int] = ..., step: _Optional[int] = ..., ts: _Optional[str] = ..., value: _Optional[str] = ..., id: _Optional[str] = ...) -> None: ...
 
 class messageABBA(_message.Message):
-    __slots__ = ("instance", "round", "value", "justification", "sign", "type", "id")
+    __slots__ = ("instance", "round", "value", "justification", "sign", "type", "id", "index")
     INSTANCE_FIELD_NUMBER: _ClassVar[int]
     ROUND_FIELD_NUMBER: _ClassVar[int]
     VALUE_FIELD_NUMBER: _ClassVar[int]
@@ -200,6 +200,7 @@ class messageABBA(_message.Message):
     SIGN_FIELD_NUMBER: _ClassVar[int]
     TYPE_FIELD_NUMBER: _ClassVar[int]
     ID_FIELD_NUMBER: _ClassVar[int]
+    INDEX_FIELD_NUMBER: _ClassVar[int]
     instance: int
     round: int
     value: int
@@ -207,7 +208,8 @@ class messageABBA(_message.Message):
     sign: str
     type: str
     id: str
-    def __init__(self, instance: _Optional[int] = ..., round: _Optional[int] = ..., value: _Optional[int] = ..., justification: _Optional[str] = ..., sign: _Optional[str] = ..., type: _Optional[str] = ..., id: _Optional[str] = ...) -> None: ...
+    index: int
+    def __init__(self, instance: _Optional[int] = ..., round: _Optional[int] = ..., value: _Optional[int] = ..., justification: _Optional[str] = ..., sign: _Optional[str] = ..., type: _Optional[str] = ..., id: _Optional[str] = ..., index: _Optional[int] = ...) -> None: ...
 
 class ABBARequest(_message.Message):
     __slots__ = ("message",)
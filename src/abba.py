@@ -2,51 +2,98 @@
 from proto import helloworld_pb2
 from config import constants as Constants
 from . import coin
+from . import metrics
+from . import transport
+from . import pruning
+
+# An ABBA instance is keyed by aid = (MVBA inst, idx): MVBA runs one ABBA per
+# position idx of the instance's common permutation (see mvba.py). On the
+# wire aid travels as messageABBA.instance / .index.
 
 ABSTAIN = -1
+VOTE_TYPES = (Constants.PREPROCESS, Constants.PREVOTE, Constants.MAINVOTE)
 
-def _store(ctx, inst, rnd, mtype, sender, bit):
-    inst_map = ctx.abba_messages.setdefault(inst, {})
-    rnd_map = inst_map.setdefault(rnd, {})
-    typ_map = rnd_map.setdefault(mtype, {})
-    if sender in typ_map:
-        return False
-    typ_map[sender] = bit
-    return True
+class Tally:
+    """
+    Votes for one (inst, round, type): sender -> bit plus running counters
+    for 0, 1 and ABSTAIN, so every quorum check is O(1).
+    """
+    __slots__ = ("votes", "counts", "fired")
+
+    def __init__(self):
+        self.votes = {}
+        self.counts = {0: 0, 1: 0, ABSTAIN: 0}
+        self.fired = set()
+
+    def add(self, sender, bit) -> bool:
+        if sender in self.votes:
+            return False
+        self.votes[sender] = bit
+        self.counts[bit] = self.counts.get(bit, 0) + 1
+        return True
+
+    def total(self) -> int:
+        return len(self.votes)
 
-def _count(ctx, inst, rnd, mtype, bit=None):
-    typ_map = ctx.abba_messages.get(inst, {}).get(rnd, {}).get(mtype, {})
-    if bit is None:
-        return len(typ_map)
-    return sum(1 for b in typ_map.values() if b == bit)
+    def count(self, bit) -> int:
+        return self.counts.get(bit, 0)
 
-def _values(ctx, inst, rnd, mtype):
-    return list(ctx.abba_messages.get(inst, {}).get(rnd, {}).get(mtype, {}).values())
+    def fire_once(self, event: str, condition: bool) -> bool:
+        # True exactly once: the first time `condition` holds for `event`
+        if not condition or event in self.fired:
+            return False
+        self.fired.add(event)
+        return True
 
-def _has(ctx, inst, rnd, mtype, bit):
-    return any(b == bit for b in _values(ctx, inst, rnd, mtype))
+def _tally(ctx, aid, rnd, mtype):
+    return ctx.abba_messages.setdefault(aid, {}).setdefault(rnd, {}).setdefault(mtype, Tally())
 
-def broadcast_abba(ctx, get_stub, inst, rnd, bit, mtype, justification=""):
+def _peek(ctx, aid, rnd, mtype):
+    return ctx.abba_messages.get(aid, {}).get(rnd, {}).get(mtype)
+
+def _store(ctx, aid, rnd, mtype, sender, bit):
+    return _tally(ctx, aid, rnd, mtype).add(sender, bit)
+
+def _count(ctx, aid, rnd, mtype, bit=None):
+    if ctx.abba_votes is not None and ctx.abba_votes.tracks(mtype):
+        return ctx.abba_votes.count(aid, rnd, mtype, bit)
+    t = _peek(ctx, aid, rnd, mtype)
+    if t is None:
+        return 0
+    return t.total() if bit is None else t.count(bit)
+
+def _has(ctx, aid, rnd, mtype, bit):
+    return _count(ctx, aid, rnd, mtype, bit) > 0
+
+def broadcast_abba(ctx, get_stub, aid, rnd, bit, mtype, justification="", sign=""):
+    inst, idx = aid
     msg = helloworld_pb2.messageABBA(
         instance=int(inst),
         round=int(rnd),
         value=int(bit),
         justification=justification,
-        sign="",
+        sign=sign,
         type=mtype,
         id=ctx.node_id,
+        index=int(idx),
     )
     req = helloworld_pb2.ABBARequest(message=msg)
 
-    for port in Constants.PORTLIST[: ctx.n]:
-        if port == ctx.port:
-            continue
-        try:
-            get_stub(port).ABBA(req, timeout=2.0)
-        except Exception as e:
-            print(f"[{ctx.node_id}] ABBA send failed to {port}: {e}", flush=True)
+    transport.broadcast(ctx, "ABBA", req, stub_for=get_stub)
+    if mtype != Constants.DECISION:
+        # broadcast skips this node: count my own vote towards my quorums as well,
+        # so q of n suffice and not q of the n-1 peers
+        own = dict(inst=inst, idx=idx, rnd=rnd, mtype=mtype, sender=ctx.node_id, bit=bit,
+                   justification=justification, sign=sign)
+        ctx.actor.submit(inst, _batch_handler(ctx), ctx, get_stub, [own])
 
-def start(ctx, inst, input_bit=None, justification="", get_stub=None, bit=None):
+def _batch_handler(ctx):
+    if ctx.abba_votes is not None:
+        from . import abba_vec   # abba_vec builds on this module
+        return abba_vec.on_abba_batch
+    return on_abba_batch
+
+def start(ctx, aid, input_bit=None, justification="", get_stub=None, bit=None):
     # accept alias bit
     if input_bit is None:
         input_bit = bit
@@ -57,137 +104,251 @@ def start(ctx, inst, input_bit=None, justification="", get_stub=None, bit=None):
 
     input_bit = int(input_bit)
 
-    if inst in ctx.abba_started or inst in ctx.abba_decided:
+    if aid in ctx.abba_started or aid in ctx.abba_decided:
         return
-    ctx.abba_started.add(inst)
+    ctx.abba_started.add(aid)
 
-    print(f"[{ctx.node_id}] 🚀 ABBA start inst={inst} input_bit={input_bit}", flush=True)
+    print(f"[{ctx.node_id}] 🚀 ABBA start inst={aid[0]} idx={aid[1]} input_bit={input_bit}", flush=True)
+    coin.precompute(ctx, aid, 1)
     # Round 1 PREPROCESS
-    broadcast_abba(ctx, get_stub, inst, 1, input_bit, Constants.PREPROCESS, justification=justification)
+    broadcast_abba(ctx, get_stub, aid, 1, input_bit, Constants.PREPROCESS, justification=justification)
+    _enter_round(ctx, get_stub, aid, 1)
+
+def hold_if_early(ctx, msg: dict) -> bool:
+    """
+    Buffer a vote (dict of on_abba_message kwargs) for an instance this node
+    has not started or a round it has not entered yet; _enter_round replays it.
+    """
+    if ctx.future is None or msg["mtype"] not in VOTE_TYPES:
+        return False
+    aid, rnd = (msg["inst"], msg.get("idx", 0)), msg["rnd"]
+    if aid in ctx.abba_started and rnd <= ctx.abba_round.get(aid, 0):
+        return False
+    ctx.future.hold(("ABBA", aid[0], aid[1], rnd), msg["sender"], msg)
+    return True
 
-def _maybe_send_prevote_r_gt_1(ctx, get_stub, inst, rnd):
+def _enter_round(ctx, get_stub, aid, rnd):
+    ctx.abba_round[aid] = max(ctx.abba_round.get(aid, 0), rnd)
+    if ctx.future is None:
+        return
+    held = ctx.future.take(("ABBA", aid[0], aid[1], rnd))
+    if not held:
+        return
+    print(f"[{ctx.node_id}] ⏪ replaying {len(held)} buffered ABBA msgs inst={aid[0]} idx={aid[1]} r={rnd}", flush=True)
+    # as a fresh actor turn, so the step that entered the round finishes first
+    ctx.actor.submit(aid[0], _batch_handler(ctx), ctx, get_stub, held)
+
+def _maybe_send_prevote_r_gt_1(ctx, get_stub, aid, rnd):
     """
     For rnd>1: derive PREVOTE(rnd) from MAINVOTE(rnd-1) (or coin if all abstain).
     """
     if rnd <= 1:
         return
 
-    sent_key = (inst, rnd, Constants.PREVOTE)
+    sent_key = (aid, rnd, Constants.PREVOTE)
     if sent_key in ctx.abba_sent:
         return
 
     prev_r = rnd - 1
-    if _count(ctx, inst, prev_r, Constants.MAINVOTE) < ctx.q:
+    if _count(ctx, aid, prev_r, Constants.MAINVOTE) < ctx.q:
         return
 
     # If any mainvote 0 exists => b=0; else if any 1 exists => b=1; else coin(prev_r)
-    if _has(ctx, inst, prev_r, Constants.MAINVOTE, 0):
+    if _has(ctx, aid, prev_r, Constants.MAINVOTE, 0):
         b = 0
-    elif _has(ctx, inst, prev_r, Constants.MAINVOTE, 1):
+    elif _has(ctx, aid, prev_r, Constants.MAINVOTE, 1):
         b = 1
     else:
         # all abstain -> must have coin(prev_r) ready
-        cb = ctx.coins.get((inst, prev_r))
+        cb = ctx.coins.get((aid, prev_r))
         if cb is None:
             return
         b = int(cb)
 
     ctx.abba_sent.add(sent_key)
     print(f"[{ctx.node_id}] ✅ PREVOTE r={rnd} derived from MAINVOTE r={prev_r} -> b={b}", flush=True)
-    broadcast_abba(ctx, get_stub, inst, rnd, b, Constants.PREVOTE)
+    broadcast_abba(ctx, get_stub, aid, rnd, b, Constants.PREVOTE)
+    coin.precompute(ctx, aid, rnd)
+    _enter_round(ctx, get_stub, aid, rnd)
 
-def on_abba_message(ctx, get_stub, inst: int, rnd: int, mtype: str, sender: str, bit: int, justification: str = ""):
-    if inst in ctx.abba_decided:
+def _on_coin(ctx, get_stub, aid, rnd, coin_bit):
+    if aid in ctx.abba_decided:
         return
+    ctx.coins[(aid, rnd)] = int(coin_bit)
+    metrics.coin_ready(ctx, aid, rnd)
+    # coin of round rnd is used only if previous round mainvotes were all abstain,
+    # but we can now *try* to derive PREVOTE(rnd+1).
+    _maybe_send_prevote_r_gt_1(ctx, get_stub, aid, rnd + 1)
 
-    # ---- COIN messages carry a share (0/1). Store & combine at q.
-    if mtype == Constants.COIN:
-        share = int(bit) & 1
-        coin_bit = coin.on_coin_share(ctx, inst, rnd, sender, share)
-        if coin_bit is not None:
-            ctx.coins[(inst, rnd)] = int(coin_bit)
-            # coin of round rnd is used only if previous round mainvotes were all abstain,
-            # but we can now *try* to derive PREVOTE(rnd+1).
-            _maybe_send_prevote_r_gt_1(ctx, get_stub, inst, rnd + 1)
+def _add_coin_share(ctx, get_stub, aid, rnd, sender, share):
+    coin_bit = coin.on_coin_share(
+        ctx, aid, rnd, sender, share,
+        on_ready=lambda b: _on_coin(ctx, get_stub, aid, rnd, b),
+    )
+    if coin_bit is not None:
+        _on_coin(ctx, get_stub, aid, rnd, coin_bit)
+
+def _send_mainvote(ctx, get_stub, aid, rnd, mv):
+    key = (aid, rnd, Constants.MAINVOTE)
+    if key in ctx.abba_sent:
         return
+    ctx.abba_sent.add(key)
+    sign = ""
+    if getattr(Constants, "COIN_PIGGYBACK", True):
+        ctx.coin_sent.add((aid, rnd))
+        share = coin.my_share(ctx, aid, rnd)
+        sign = coin.piggyback(share)
+        _add_coin_share(ctx, get_stub, aid, rnd, ctx.node_id, share)
+    broadcast_abba(ctx, get_stub, aid, rnd, mv, Constants.MAINVOTE, sign=sign)
 
-    bit = int(bit)
+def _decide(ctx, get_stub, aid, bit, rnd, how: str):
+    ctx.abba_decided[aid] = bit
+    print(f"[{ctx.node_id}] 🏁 ABBA DECIDE inst={aid[0]} idx={aid[1]} bit={bit} (r={rnd}, {how})", flush=True)
+    # let peers that fell behind adopt it (they need f+1 matching DECISIONs)
+    broadcast_abba(ctx, get_stub, aid, rnd, bit, Constants.DECISION)
+    if how == "quorum":
+        # one more round: every honest node saw a MAINVOTE for bit in rnd, so all
+        # of them prevote bit in rnd+1; they may need my votes there to reach q
+        nxt = rnd + 1
+        if (aid, nxt, Constants.PREVOTE) not in ctx.abba_sent:
+            ctx.abba_sent.add((aid, nxt, Constants.PREVOTE))
+            broadcast_abba(ctx, get_stub, aid, nxt, bit, Constants.PREVOTE)
+        _send_mainvote(ctx, get_stub, aid, nxt, bit)
+    metrics.decided_in(ctx, rnd)
+    _note_deciders(ctx, aid)
+    if ctx.mvba_on_aba_decide is not None:
+        ctx.mvba_on_aba_decide(aid, bit)
 
-    # ---- store/dedup
-    if not _store(ctx, inst, rnd, mtype, sender, bit):
+def _note_deciders(ctx, aid):
+    """
+    Tell pruning which peers finished aid's MVBA instance (it ends at the first
+    index decided 1, or after the last index). Only DECISIONs that match this
+    node's own decision count, and that decision rests on a quorum or on f+1
+    reports, so one forged DECISION cannot move a peer's watermark.
+    """
+    bit = ctx.abba_decided.get(aid)
+    if bit is None or not (bit == 1 or aid[1] == ctx.n - 1):
         return
+    t = _peek(ctx, aid, 0, Constants.DECISION)
+    for sender, b in (t.votes.items() if t is not None else ()):
+        if b == bit:
+            pruning.note_decided(ctx, sender, aid[0])
 
-    print(f"[{ctx.node_id}] 📨 ABBA | inst={inst} | r={rnd} | type={mtype} | from={sender} | bit={bit} | just={justification}", flush=True)
+def _on_decision(ctx, get_stub, aid, rnd, sender, bit):
+    # any round: DECISIONs are tallied under round 0; f+1 of them include an honest decider
+    t = _tally(ctx, aid, 0, Constants.DECISION)
+    if not t.add(sender, bit):
+        return
+    print(f"[{ctx.node_id}] 📨 ABBA DECISION inst={aid[0]} idx={aid[1]} from={sender} bit={bit} ({t.count(bit)}/{ctx.f + 1})", flush=True)
+    if aid in ctx.abba_decided:
+        _note_deciders(ctx, aid)
+    elif t.count(bit) >= ctx.f + 1:
+        _decide(ctx, get_stub, aid, bit, rnd, "learned")
 
+def _on_quorum(ctx, get_stub, aid, rnd, mtype, c0, c1, total) -> bool:
+    """
+    Step taken the first time (inst, rnd, mtype) holds >= q votes, given its
+    counts at that moment. Shared by the per-message path below and the
+    vectorized engine (abba_vec). Returns True if the instance decided.
+    """
     # ---- PREPROCESS -> PREVOTE (ONLY round 1)
     if mtype == Constants.PREPROCESS and rnd == 1:
-        if _count(ctx, inst, rnd, Constants.PREPROCESS) >= ctx.q:
-            c1 = _count(ctx, inst, rnd, Constants.PREPROCESS, 1)
-            c0 = _count(ctx, inst, rnd, Constants.PREPROCESS, 0)
-            b = 1 if c1 >= c0 else 0
-            key = (inst, rnd, Constants.PREVOTE)
-            if key not in ctx.abba_sent:
-                ctx.abba_sent.add(key)
-                print(f"[{ctx.node_id}] ✅ PREPROCESS quorum inst={inst} r=1 -> PREVOTE {b}", flush=True)
-                broadcast_abba(ctx, get_stub, inst, rnd, b, Constants.PREVOTE)
+        b = 1 if c1 >= c0 else 0
+        key = (aid, rnd, Constants.PREVOTE)
+        if key not in ctx.abba_sent:
+            ctx.abba_sent.add(key)
+            print(f"[{ctx.node_id}] ✅ PREPROCESS quorum inst={aid[0]} idx={aid[1]} r=1 -> PREVOTE {b}", flush=True)
+            broadcast_abba(ctx, get_stub, aid, rnd, b, Constants.PREVOTE)
 
     # ---- PREVOTE -> MAINVOTE (0/1/ABSTAIN)
     if mtype == Constants.PREVOTE:
-        if _count(ctx, inst, rnd, Constants.PREVOTE) >= ctx.q:
-            c1 = _count(ctx, inst, rnd, Constants.PREVOTE, 1)
-            c0 = _count(ctx, inst, rnd, Constants.PREVOTE, 0)
-
-            if c1 >= ctx.q:
-                mv = 1
-            elif c0 >= ctx.q:
-                mv = 0
-            else:
-                mv = ABSTAIN
-
-            key = (inst, rnd, Constants.MAINVOTE)
-            if key not in ctx.abba_sent:
-                ctx.abba_sent.add(key)
-                print(f"[{ctx.node_id}] ✅ PREVOTE quorum inst={inst} r={rnd} -> MAINVOTE {mv}", flush=True)
-                broadcast_abba(ctx, get_stub, inst, rnd, mv, Constants.MAINVOTE)
+        if c1 >= ctx.q:
+            mv = 1
+        elif c0 >= ctx.q:
+            mv = 0
+        else:
+            mv = ABSTAIN
+
+        if (aid, rnd, Constants.MAINVOTE) not in ctx.abba_sent:
+            print(f"[{ctx.node_id}] ✅ PREVOTE quorum inst={aid[0]} idx={aid[1]} r={rnd} -> MAINVOTE {mv}", flush=True)
+            _send_mainvote(ctx, get_stub, aid, rnd, mv)
 
     # ---- MAINVOTE: decide OR start coin(rnd)
     if mtype == Constants.MAINVOTE:
-        if _count(ctx, inst, rnd, Constants.MAINVOTE) >= ctx.q:
-            # Decide only if q mainvotes and ALL are 0 OR ALL are 1
-            vals = _values(ctx, inst, rnd, Constants.MAINVOTE)
-            # (vals length may exceed q; still fine)
-            if vals and all(v == 1 for v in vals):
-                decided = 1
-            elif vals and all(v == 0 for v in vals):
-                decided = 0
-            else:
-                decided = None
-
-            if decided is not None:
-                if inst not in ctx.abba_decided:
-                    ctx.abba_decided[inst] = decided
-                    print(f"[{ctx.node_id}] 🏁 ABBA DECIDE inst={inst} bit={decided} (r={rnd})", flush=True)
-                    broadcast_abba(ctx, get_stub, inst, rnd, decided, Constants.DECISION)
-                return
-
-            # No decision => broadcast my coin share once for this round
-            if (inst, rnd) not in ctx.coin_sent:
-                ctx.coin_sent.add((inst, rnd))
-                my_share = coin.make_share(ctx.node_id, inst, rnd)
-                print(f"[{ctx.node_id}] 🪙 no-decision => broadcast COIN SHARE inst={inst} r={rnd} share={my_share}", flush=True)
-                broadcast_abba(ctx, get_stub, inst, rnd, my_share, Constants.COIN)
-
-                # also feed my own share locally (so I can reach q without waiting on myself via RPC)
-                coin_bit = coin.on_coin_share(ctx, inst, rnd, ctx.node_id, my_share)
-                if coin_bit is not None:
-                    ctx.coins[(inst, rnd)] = int(coin_bit)
-                    _maybe_send_prevote_r_gt_1(ctx, get_stub, inst, rnd + 1)
-
-            # Regardless, try to derive PREVOTE(rnd+1) from MAINVOTE(rnd) if possible
-            _maybe_send_prevote_r_gt_1(ctx, get_stub, inst, rnd + 1)
-
-    # ---- DECISION receive (optional)
+        # Decide only if q mainvotes and ALL are 0 OR ALL are 1
+        # (once the quorum is not unanimous, later votes cannot make it so)
+        if c1 == total:
+            decided = 1
+        elif c0 == total:
+            decided = 0
+        else:
+            decided = None
+
+        if decided is not None:
+            if aid not in ctx.abba_decided:
+                _decide(ctx, get_stub, aid, decided, rnd, "quorum")
+            return True
+
+        # No decision => broadcast my coin share once for this round
+        # (already done when it was piggybacked on my MAINVOTE)
+        metrics.coin_needed(ctx, aid, rnd)
+        if (aid, rnd) not in ctx.coin_sent:
+            ctx.coin_sent.add((aid, rnd))
+            my_share = coin.my_share(ctx, aid, rnd)
+            print(f"[{ctx.node_id}] 🪙 no-decision => broadcast COIN SHARE inst={aid[0]} idx={aid[1]} r={rnd}", flush=True)
+            broadcast_abba(ctx, get_stub, aid, rnd, my_share if isinstance(my_share, int) else 0, Constants.COIN,
+                           sign=coin.encode_share(my_share))
+
+            # also feed my own share locally (so I can reach q without waiting on myself via RPC)
+            _add_coin_share(ctx, get_stub, aid, rnd, ctx.node_id, my_share)
+    return False
+
+def on_abba_message(ctx, get_stub, inst: int, rnd: int, mtype: str, sender: str, bit: int, justification: str = "", sign: str = "", idx: int = 0):
+    aid = (inst, idx)
+    if pruning.is_stale(ctx, inst):
+        return
+
+    # ---- DECISION: adopted once f+1 nodes report the same bit (still tallied after
+    # deciding: matching reports are what tells pruning that peers are done)
     if mtype == Constants.DECISION:
-        if inst not in ctx.abba_decided:
-            ctx.abba_decided[inst] = int(bit)
-            print(f"[{ctx.node_id}] ✅ ABBA DECISION learned inst={inst} bit={bit} (r={rnd})", flush=True)
\ No newline at end of file
+        _on_decision(ctx, get_stub, aid, rnd, sender, int(bit))
+        return
+
+    if aid in ctx.abba_decided:
+        return
+    if hold_if_early(ctx, dict(inst=inst, idx=idx, rnd=rnd, mtype=mtype, sender=sender, bit=bit, justification=justification, sign=sign)):
+        return
+
+    # ---- COIN messages carry a share (0/1). Store & combine at q.
+    if mtype == Constants.COIN:
+        share = coin.decode_share(sign) if sign else int(bit) & 1
+        _add_coin_share(ctx, get_stub, aid, rnd, sender, share)
+        return
+
+    # ---- MAINVOTE(rnd) may carry the sender's coin share for rnd: by the time
+    # q mainvotes are in, so is the coin, with no extra COIN round-trip
+    piggy = coin.unpiggyback(sign) if mtype == Constants.MAINVOTE else None
+    if piggy is not None and (aid, rnd) not in ctx.coins:
+        _add_coin_share(ctx, get_stub, aid, rnd, sender, piggy)
+
+    bit = int(bit)
+
+    # ---- store/dedup
+    if not _store(ctx, aid, rnd, mtype, sender, bit):
+        return
+
+    print(f"[{ctx.node_id}] 📨 ABBA | inst={inst} | idx={idx} | r={rnd} | type={mtype} | from={sender} | bit={bit} | just={justification}", flush=True)
+
+    t = _tally(ctx, aid, rnd, mtype)
+    if t.fire_once("quorum", t.total() >= ctx.q):
+        if _on_quorum(ctx, get_stub, aid, rnd, mtype, t.count(0), t.count(1), t.total()):
+            return
+
+    # Regardless, try to derive PREVOTE(rnd+1) from MAINVOTE(rnd) if possible
+    if mtype == Constants.MAINVOTE and t.total() >= ctx.q:
+        _maybe_send_prevote_r_gt_1(ctx, get_stub, aid, rnd + 1)
+
+def on_abba_batch(ctx, get_stub, msgs):
+    """Several ABBA messages (dicts of on_abba_message kwargs) handled in one actor turn."""
+    for m in msgs:
+        on_abba_message(ctx, get_stub, **m)
@@ -0,0 +1,166 @@
+# src/abba_vec.py
+import threading
+
+try:
+    import numpy as np
+except ImportError:  # only needed for ABBA_ENGINE = "numpy"
+    np = None
+
+from config import constants as Constants
+from . import abba
+from . import coin
+from . import pruning
+
+EMPTY = -2   # no vote yet (ABSTAIN is abba.ABSTAIN = -1)
+
+class VoteArrays:
+    """
+    PREPROCESS/PREVOTE/MAINVOTE votes of many ABBA instances in one int8
+    array [instance slot, round, type, sender]. Instances (aid = (inst, idx),
+    see abba.py) get a slot on
+    first use and give it back when pruned; slots and rounds grow by
+    doubling. `fired` marks cells whose quorum step already ran.
+
+    The arrays are shared by every actor shard (growth replaces them), so
+    all access goes through `lock`.
+    """
+    TYPES = (Constants.PREPROCESS, Constants.PREVOTE, Constants.MAINVOTE)
+
+    def __init__(self, n: int, capacity: int = 256, rounds: int = 4):
+        if np is None:
+            raise RuntimeError("ABBA_ENGINE='numpy' needs numpy installed")
+        self.n = n
+        self.type_index = {t: i for i, t in enumerate(self.TYPES)}
+        self.votes = np.full((capacity, rounds, len(self.TYPES), n), EMPTY, dtype=np.int8)
+        self.fired = np.zeros((capacity, rounds, len(self.TYPES)), dtype=bool)
+        self.slot_aid = [None] * capacity
+        self.slots = {}                          # aid -> slot
+        self.free = list(range(capacity - 1, -1, -1))
+        self.lock = threading.RLock()            # re-entered by abba._count from a quorum step
+
+    def tracks(self, mtype: str) -> bool:
+        return mtype in self.type_index
+
+    # ---- growth
+    def _grow_slots(self):
+        cap = len(self.slot_aid)
+        self.votes = np.concatenate([self.votes, np.full_like(self.votes, EMPTY)])
+        self.fired = np.concatenate([self.fired, np.zeros_like(self.fired)])
+        self.slot_aid.extend([None] * cap)
+        self.free.extend(range(2 * cap - 1, cap - 1, -1))
+
+    def _grow_rounds(self, rnd: int):
+        rounds = self.votes.shape[1]
+        while rounds <= rnd:
+            rounds *= 2
+        pad = rounds - self.votes.shape[1]
+        self.votes = np.pad(self.votes, ((0, 0), (0, pad), (0, 0), (0, 0)), constant_values=EMPTY)
+        self.fired = np.pad(self.fired, ((0, 0), (0, pad), (0, 0)))
+
+    def slot(self, aid) -> int:
+        with self.lock:
+            s = self.slots.get(aid)
+            if s is None:
+                if not self.free:
+                    self._grow_slots()
+                s = self.free.pop()
+                self.slots[aid] = s
+                self.slot_aid[s] = aid
+            return s
+
+    # ---- votes
+    def add(self, slots, rnds, types, senders, bits):
+        """Scatter a batch of votes; -> index array of the ones that were new."""
+        if rnds.max() >= self.votes.shape[1]:
+            self._grow_rounds(int(rnds.max()))
+        # first vote per (slot, rnd, type, sender) wins, inside the batch and against stored votes
+        flat = np.ravel_multi_index((slots, rnds, types, senders), self.votes.shape)
+        _, first = np.unique(flat, return_index=True)
+        first.sort()
+        new = first[self.votes.take(flat[first]) == EMPTY]
+        np.put(self.votes, flat[new], bits[new])
+        return new
+
+    def counts(self, slots, rnds, types):
+        """-> (c0, c1, total) for each cell, in one pass."""
+        v = self.votes[slots, rnds, types]                # (cells, n)
+        return (v == 0).sum(axis=1), (v == 1).sum(axis=1), (v != EMPTY).sum(axis=1)
+
+    def count(self, aid, rnd: int, mtype: str, bit=None) -> int:
+        with self.lock:
+            s = self.slots.get(aid)
+            if s is None or rnd >= self.votes.shape[1]:
+                return 0
+            v = self.votes[s, rnd, self.type_index[mtype]]
+            return int((v != EMPTY).sum()) if bit is None else int((v == bit).sum())
+
+    def forget_below(self, wm: int):
+        with self.lock:
+            for aid in [a for a in self.slots if a[0] < wm]:
+                s = self.slots.pop(aid)
+                self.votes[s] = EMPTY
+                self.fired[s] = False
+                self.slot_aid[s] = None
+                self.free.append(s)
+
+def on_abba_batch(ctx, get_stub, msgs):
+    """
+    Handle a batch of ABBA messages (dicts of on_abba_message kwargs) in one
+    actor turn: votes are scattered into ctx.abba_votes at once and quorum /
+    decision conditions are evaluated for every touched (aid, round, type)
+    cell in one vectorized pass; only cells that just reached quorum run
+    the (shared) per-instance step abba._on_quorum.
+    """
+    # held for the whole batch: another shard may grow (replace) the arrays in between
+    with ctx.abba_votes.lock:
+        _on_abba_batch(ctx, get_stub, msgs)
+
+def _on_abba_batch(ctx, get_stub, msgs):
+    eng = ctx.abba_votes
+    rows = []
+    for m in msgs:
+        mtype = m["mtype"]
+        if not eng.tracks(mtype):
+            abba.on_abba_message(ctx, get_stub, **m)   # COIN / DECISION
+            continue
+        aid, rnd, sender = (m["inst"], m.get("idx", 0)), m["rnd"], m["sender"]
+        if aid in ctx.abba_decided or pruning.is_stale(ctx, aid[0]):
+            continue
+        if abba.hold_if_early(ctx, m):
+            continue
+        idx = ctx.id_to_index.get(sender)
+        if idx is None:
+            continue
+        piggy = coin.unpiggyback(m.get("sign", "")) if mtype == Constants.MAINVOTE else None
+        if piggy is not None and (aid, rnd) not in ctx.coins:
+            abba._add_coin_share(ctx, get_stub, aid, rnd, sender, piggy)
+        rows.append((eng.slot(aid), rnd, eng.type_index[mtype], idx, int(m["bit"])))
+    if not rows:
+        return
+
+    slots, rnds, types, senders, bits = (np.array(col, dtype=np.int64) for col in zip(*rows))
+    new = eng.add(slots, rnds, types, senders, bits.astype(np.int8))
+    if len(new) == 0:
+        return
+
+    cells = np.unique(np.stack([slots[new], rnds[new], types[new]], axis=1), axis=0)
+    # lower rounds first, and PREPROCESS < PREVOTE < MAINVOTE inside a round
+    cells = cells[np.lexsort((cells[:, 2], cells[:, 1]))]
+    cs, cr, ct = cells[:, 0], cells[:, 1], cells[:, 2]
+    c0, c1, total = eng.counts(cs, cr, ct)
+
+    quorum = total >= ctx.q
+    fire = quorum & ~eng.fired[cs, cr, ct]
+    eng.fired[cs[fire], cr[fire], ct[fire]] = True
+    retry = quorum & (ct == eng.type_index[Constants.MAINVOTE])
+
+    print(f"[{ctx.node_id}] 📨 ABBA batch votes={len(new)}/{len(rows)} cells={len(cells)} quorum_steps={int(fire.sum())}", flush=True)
+
+    for k in np.flatnonzero(fire | retry):
+        aid, rnd, mtype = eng.slot_aid[cs[k]], int(cr[k]), VoteArrays.TYPES[ct[k]]
+        if aid in ctx.abba_decided:
+            continue
+        if fire[k] and abba._on_quorum(ctx, get_stub, aid, rnd, mtype, int(c0[k]), int(c1[k]), int(total[k])):
+            continue
+        if retry[k]:
+            abba._maybe_send_prevote_r_gt_1(ctx, get_stub, aid, rnd + 1)
@@ -0,0 +1,81 @@
+# src/actor.py
+import queue
+import threading
+import traceback
+
+class ProtocolActor:
+    """
+    One thread that runs protocol steps strictly in submission order.
+    gRPC handlers submit() decoded messages and return immediately, so
+    NodeContext state is only ever touched from the actor thread.
+    """
+
+    def __init__(self, name: str = "actor"):
+        self._q = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        self._q.put((fn, args, kwargs))
+
+    def close(self):
+        """Run what is already queued, then stop the thread."""
+        self._q.put(None)
+        if threading.current_thread() is not self._thread:
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            step = self._q.get()
+            if step is None:
+                return
+            fn, args, kwargs = step
+            try:
+                fn(*args, **kwargs)
+            except Exception:
+                traceback.print_exc()
+
+class ActorPool:
+    """
+    Shards protocol work across `shards` actors by instance id. Every piece
+    of per-instance state lives under its own inst key, so an instance is
+    always driven by exactly one actor thread.
+
+    State shared across instances is touched by several shards at once and
+    must bring its own lock: FutureBuffer, VoteArrays (slot allocation and
+    growth), CertCache, Pipeline and Metrics do, and the watermark fields
+    (peer_decided, decided_upto, low_watermark) are guarded by ctx.gc_lock,
+    and pruning deletes per-instance state from each shard's own turn.
+    Anything new that spans instances needs the same before ACTOR_SHARDS > 1
+    is safe with it.
+    """
+
+    def __init__(self, shards: int = 1):
+        self.actors = [ProtocolActor(name=f"actor-{i}") for i in range(max(1, shards))]
+        self.shards = len(self.actors)
+
+    def shard(self, inst: int) -> int:
+        return inst % len(self.actors)
+
+    def submit(self, inst: int, fn, /, *args, **kwargs):
+        self.actors[self.shard(inst)].submit(fn, *args, **kwargs)
+
+    def close(self):
+        for a in self.actors:
+            a.close()
+
+class LoopActor:
+    """Actor for aio nodes: the event loop already serializes all protocol steps."""
+    shards = 1
+
+    def __init__(self, loop):
+        self.loop = loop
+
+    def shard(self, inst: int) -> int:
+        return 0
+
+    def submit(self, inst: int, fn, /, *args, **kwargs):
+        self.loop.call_soon_threadsafe(lambda: fn(*args, **kwargs))
+
+    def close(self):
+        pass   # the loop belongs to the server
@@ -0,0 +1,68 @@
+# src/aio_server.py
+import asyncio
+
+import grpc
+
+from proto import helloworld_pb2_grpc
+from proto import bft_pb2_grpc
+
+from .context import NodeContext
+from .server import Greeter, Node
+from .actor import LoopActor
+
+# Greeter.Propose refusal replies (context None) -> the status a threaded server aborts with
+REFUSALS = {"busy": grpc.StatusCode.RESOURCE_EXHAUSTED}
+
+class AioGreeter(helloworld_pb2_grpc.GreeterServicer):
+    """
+    grpc.aio front-end for Greeter. Protocol handlers never block on the
+    network (all sends are scheduled on ctx.loop), so they run inline on the
+    event loop and one process can host thousands of concurrent instances.
+    """
+
+    def __init__(self, greeter: Greeter):
+        self.greeter = greeter
+
+    async def SayHello(self, request, context):
+        return self.greeter.SayHello(request, context)
+
+    async def Propose(self, request, context):
+        if request.type in ("", "SUBMIT", "TX"):
+            # client paths may wait on the pipeline window / decision: keep them off the loop.
+            # The aio context can only be aborted from the loop, so refusals come back as replies
+            reply = await asyncio.to_thread(self.greeter.Propose, request, None)
+            if reply.yes in REFUSALS:
+                await context.abort(REFUSALS[reply.yes], f"{reply.yes}: inst={request.instance}")
+            return reply
+        return self.greeter.Propose(request, context)
+
+    async def ABBA(self, request, context):
+        return self.greeter.ABBA(request, context)
+
+    async def VCBC(self, request, context):
+        # decode + hand to the actor only: the echo share is signed on the actor (vcbc_cert._echo)
+        return self.greeter.VCBC(request, context)
+
+class AioNode(bft_pb2_grpc.NodeServicer):
+    def __init__(self, node: Node):
+        self.node = node
+
+    async def SendBatch(self, request, context):
+        return self.node.SendBatch(request, context)
+
+    async def Stream(self, request_iterator, context):
+        async for batch in request_iterator:
+            yield self.node.SendBatch(batch, context)
+
+async def serve(ctx: NodeContext):
+    ctx.loop = asyncio.get_running_loop()
+    ctx.actor = LoopActor(ctx.loop)
+
+    greeter = Greeter(ctx)
+    server = grpc.aio.server()
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(AioGreeter(greeter), server)
+    bft_pb2_grpc.add_NodeServicer_to_server(AioNode(Node(greeter)), server)
+    server.add_insecure_port(f"[::]:{ctx.port}")
+    await server.start()
+    print(f"Server started (aio): id={ctx.node_id} port={ctx.port}", flush=True)
+    await server.wait_for_termination()
@@ -0,0 +1,276 @@
+# src/bench.py
+"""
+End-to-end throughput / latency benchmark.
+
+Workloads submit one proposal of `payload` bytes per instance:
+  open loop    instance k arrives at k / rate, whether or not earlier ones finished
+  closed loop  `concurrency` clients, each submitting its next instance once the last one delivered
+
+Targets:
+  loopback  an in-process cluster (src/loopback.py) built per run, so n and the
+            pipeline window can be swept; latencies come from the nodes' own
+            ABBA DECIDE / MVBA DECIDE / DELIVER events
+  grpc      running src.server nodes on Constants.PORTLIST (SUBMIT to every node);
+            only client-observed latency, n and window are whatever the servers use
+
+Every run becomes one JSON record (config, throughput, latency p50/p95/p99 per
+phase) printed to stdout and stored under --out; --compare BASELINE.json
+reports the relative change of each metric and exits 1 on a regression.
+
+  python -m src.bench --mode closed --concurrency 8 --n 4 7 --payload 100 10000 --instances 200
+  python -m src.bench --mode open --rate 50 --compare bench/results/<earlier>.json
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
+
+import argparse
+import json
+import subprocess
+import threading
+import time
+from concurrent import futures
+
+from config import constants as Constants
+
+def percentiles(samples) -> dict:
+    if not samples:
+        return {}
+    s = sorted(samples)
+    pick = lambda p: s[min(len(s) - 1, int(p * len(s)))]
+    return {"count": len(s), "mean": sum(s) / len(s), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99), "max": s[-1]}
+
+class LoopbackTarget:
+    """
+    In-process cluster; records when every node reached ABBA DECIDE / MVBA
+    DECIDE per instance. close() stops it and restores PIPELINE_WINDOW.
+    """
+
+    def __init__(self, n: int, window: int, timeout_s: float):
+        from . import loopback
+        self._window = getattr(Constants, "PIPELINE_WINDOW", None)
+        Constants.PIPELINE_WINDOW = window
+        self.cluster = loopback.Cluster(n)
+        self.timeout_s = timeout_s
+        self.events = {}                  # (phase, inst) -> {node_id: time}
+        self._lock = threading.Lock()
+        for g in self.cluster.greeters:
+            ctx = g.ctx
+            # ABBA (inst, idx) settles the instance when it decides 1 or is the last index
+            settles = lambda aid, bit, n=ctx.n: aid[0] if bit or aid[1] == n - 1 else None
+            ctx.mvba_on_aba_decide = self._tap(ctx, "abba_decide", ctx.mvba_on_aba_decide, settles)
+            ctx.mvba_on_decide = self._tap(ctx, "mvba_decide", ctx.mvba_on_decide)
+
+    def _tap(self, ctx, phase: str, fn, inst_of=None):
+        def hook(key, arg):
+            inst = key if inst_of is None else inst_of(key, arg)
+            if inst is not None:
+                with self._lock:
+                    # first occurrence only (ABBA's hook runs again when a fetched payload arrives)
+                    self.events.setdefault((phase, inst), {}).setdefault(ctx.node_id, time.perf_counter())
+            fn(key, arg)
+        return hook
+
+    def submit(self, inst: int, value: str) -> bool:
+        self.cluster.propose(inst, value)
+        return self.cluster.wait_delivered(inst, timeout=self.timeout_s)
+
+    def phase_done(self, phase: str, inst: int):
+        """Time the last node reached phase for inst, None if some node has not."""
+        with self._lock:
+            seen = self.events.get((phase, inst), {})
+            return max(seen.values()) if len(seen) == len(self.cluster.greeters) else None
+
+    def close(self):
+        self.cluster.close()
+        if self._window is None:
+            del Constants.PIPELINE_WINDOW
+        else:
+            Constants.PIPELINE_WINDOW = self._window
+
+class GrpcTarget:
+    """Running servers: a SUBMIT to every node, done when all replied with the decision."""
+
+    def __init__(self, host: str, timeout_s: float):
+        self.host = host
+        self.timeout_s = timeout_s
+        self.ports = Constants.PORTLIST[: getattr(Constants, "N", len(Constants.PORTLIST))]
+        self.pool = futures.ThreadPoolExecutor(max_workers=256)
+
+    def submit(self, inst: int, value: str) -> bool:
+        from .client import send_one
+        futs = [self.pool.submit(send_one, self.host, p, inst, value, self.timeout_s, "SUBMIT") for p in self.ports]
+        try:
+            return all(f.result().yes not in ("timeout", "stale", "ignored", "busy", "taken") for f in futs)
+        except Exception:
+            return False
+
+    def phase_done(self, phase: str, inst: int):
+        return None
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+def run_workload(target, mode: str, instances: int, payload: int, first_inst: int,
+                 rate: float = None, concurrency: int = None) -> dict:
+    arrive, delivered, failed = {}, {}, []
+    lock = threading.Lock()
+
+    def one(k: int, t_arrive: float):
+        ok = target.submit(k, f"v{k}|".ljust(payload, "x"))
+        with lock:
+            arrive[k] = t_arrive
+            if ok:
+                delivered[k] = time.perf_counter()
+            else:
+                failed.append(k)
+
+    insts = list(range(first_inst, first_inst + instances))
+    t0 = time.perf_counter()
+    if mode == "open":
+        # latency counts from the scheduled arrival, so queueing behind a full window shows up
+        with futures.ThreadPoolExecutor(max_workers=max(64, int(rate * 10))) as pool:
+            for i, k in enumerate(insts):
+                due = t0 + i / rate
+                time.sleep(max(0.0, due - time.perf_counter()))
+                pool.submit(one, k, due)
+    else:
+        todo = iter(insts)
+        next_lock = threading.Lock()
+
+        def client():
+            while True:
+                with next_lock:
+                    k = next(todo, None)
+                if k is None:
+                    return
+                one(k, time.perf_counter())
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    elapsed = time.perf_counter() - t0
+
+    latency = {"deliver": percentiles([delivered[k] - arrive[k] for k in delivered])}
+    for phase in ("abba_decide", "mvba_decide"):
+        done = {k: target.phase_done(phase, k) for k in delivered}
+        samples = [t - arrive[k] for k, t in done.items() if t is not None]
+        if samples:
+            latency[phase] = percentiles(samples)
+    return {
+        "elapsed_s": elapsed,
+        "delivered": len(delivered),
+        "failed": len(failed),
+        "throughput_inst_s": len(delivered) / elapsed,
+        "throughput_bytes_s": len(delivered) * payload / elapsed,
+        "latency_s": latency,
+    }
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        return ""
+
+def _key(rec: dict):
+    c = rec["config"]
+    return (c["target"], c["mode"], c["n"], c["window"], c["payload"], c.get("rate"), c.get("concurrency"))
+
+# metric path -> True when higher is better
+COMPARED = {
+    ("throughput_inst_s",): True,
+    ("latency_s", "deliver", "p50"): False,
+    ("latency_s", "deliver", "p99"): False,
+    ("latency_s", "mvba_decide", "p50"): False,
+    ("latency_s", "mvba_decide", "p99"): False,
+}
+
+def compare(records, baseline, tolerance: float, out=sys.stdout) -> bool:
+    """Print the change of every COMPARED metric against matching baseline runs; -> True if none regressed."""
+    base = {_key(r): r for r in baseline}
+    ok = True
+    for rec in records:
+        old = base.get(_key(rec))
+        if old is None:
+            print(f"compare: no baseline run for {_key(rec)}", file=out)
+            continue
+        for path, higher_better in COMPARED.items():
+            a, b = old["results"], rec["results"]
+            for p in path:
+                a, b = (a or {}).get(p), (b or {}).get(p)
+            if not a or b is None:
+                continue
+            change = (b - a) / a
+            worse = -change if higher_better else change
+            flag = "REGRESSION" if worse > tolerance else "ok"
+            ok = ok and flag == "ok"
+            print(f"compare {_key(rec)} {'.'.join(path)}: {a:.6g} -> {b:.6g} ({change:+.1%}) {flag}", file=out)
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--target", choices=["loopback", "grpc"], default="loopback")
+    ap.add_argument("--mode", choices=["open", "closed"], default="closed")
+    ap.add_argument("--rate", type=float, default=50.0, help="open loop: instances per second")
+    ap.add_argument("--concurrency", type=int, default=8, help="closed loop: clients")
+    ap.add_argument("--instances", type=int, default=100, help="instances per run")
+    ap.add_argument("--n", type=int, nargs="+", default=[getattr(Constants, "N", 4)], help="loopback: cluster sizes")
+    ap.add_argument("--window", type=int, nargs="+", default=[getattr(Constants, "PIPELINE_WINDOW", 8)], help="loopback: pipeline windows")
+    ap.add_argument("--payload", type=int, nargs="+", default=[100], help="proposal sizes in bytes")
+    ap.add_argument("--first_inst", type=int, default=1, help="grpc: first instance number (must be fresh on the servers)")
+    ap.add_argument("--host", default="localhost")
+    ap.add_argument("--timeout", type=float, default=getattr(Constants, "SUBMIT_TIMEOUT_S", 30.0))
+    ap.add_argument("--out", default="bench/results", help="directory results are stored in ('' = do not store)")
+    ap.add_argument("--compare", help="baseline results file to check for regressions")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    ap.add_argument("--verbose", action="store_true", help="keep the per-message node logs (loopback)")
+    args = ap.parse_args()
+
+    out = sys.stdout
+    if args.target == "loopback" and not args.verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    records = []
+    first = args.first_inst
+    sizes = args.n if args.target == "loopback" else [getattr(Constants, "N", len(Constants.PORTLIST))]
+    windows = args.window if args.target == "loopback" else [getattr(Constants, "PIPELINE_WINDOW", 8)]
+    for n in sizes:
+        for window in windows:
+            for payload in args.payload:
+                if args.target == "loopback":
+                    target, first = LoopbackTarget(n, window, args.timeout), 1
+                else:
+                    target = GrpcTarget(args.host, args.timeout)
+                config = {"target": args.target, "mode": args.mode, "n": n, "window": window,
+                          "payload": payload, "instances": args.instances}
+                if args.mode == "open":
+                    config["rate"] = args.rate
+                else:
+                    config["concurrency"] = args.concurrency
+                try:
+                    results = run_workload(target, args.mode, args.instances, payload, first,
+                                           rate=args.rate, concurrency=args.concurrency)
+                finally:
+                    target.close()
+                first += args.instances
+                rec = {"config": config, "results": results, "git": _git_rev(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+                records.append(rec)
+                print(json.dumps(rec), file=out, flush=True)
+
+    if args.out:
+        os.makedirs(args.out, exist_ok=True)
+        path = os.path.join(args.out, f"{args.target}-{args.mode}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, "w") as fh:
+            json.dump(records, fh, indent=1)
+        print(f"stored {path}", file=out, flush=True)
+
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+        if not compare(records, baseline, args.tolerance, out=out):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
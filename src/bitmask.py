@@ -0,0 +1,97 @@
+# src/bitmask.py
+
+class Bitmask:
+    """
+    Fixed-width bit vector over node indices 0..n-1, backed by a Python int.
+    OR, popcount and index tests are single big-int operations instead of
+    per-element list loops.
+    """
+    __slots__ = ("n", "bits")
+
+    def __init__(self, n: int, bits: int = 0):
+        self.n = n
+        self.bits = bits
+
+    @classmethod
+    def from_indices(cls, n: int, indices):
+        bits = 0
+        for i in indices:
+            bits |= 1 << i
+        return cls(n, bits)
+
+    @classmethod
+    def from_list(cls, bits_list):
+        return cls.from_indices(len(bits_list), (i for i, b in enumerate(bits_list) if b))
+
+    def set(self, i: int):
+        self.bits |= 1 << i
+
+    def test(self, i: int) -> bool:
+        return (self.bits >> i) & 1 == 1
+
+    def __getitem__(self, i: int) -> int:
+        return (self.bits >> i) & 1
+
+    def __or__(self, other):
+        return Bitmask(max(self.n, other.n), self.bits | other.bits)
+
+    def __ior__(self, other):
+        self.bits |= other.bits
+        self.n = max(self.n, other.n)
+        return self
+
+    def __eq__(self, other):
+        return isinstance(other, Bitmask) and self.n == other.n and self.bits == other.bits
+
+    def __hash__(self):
+        return hash((self.n, self.bits))
+
+    def popcount(self) -> int:
+        return self.bits.bit_count()
+
+    def indices(self):
+        bits, i = self.bits, 0
+        while bits:
+            if bits & 1:
+                yield i
+            bits >>= 1
+            i += 1
+
+    def to_list(self):
+        return [(self.bits >> i) & 1 for i in range(self.n)]
+
+    # ---- encodings
+    def to_bytes(self) -> bytes:
+        return self.bits.to_bytes((self.n + 7) // 8, "little")
+
+    @classmethod
+    def from_bytes(cls, n: int, data: bytes):
+        if len(data) != (n + 7) // 8:
+            return None
+        bits = int.from_bytes(data, "little")
+        if bits >> n:
+            return None
+        return cls(n, bits)
+
+    def to_wire(self) -> str:
+        # PRORequest.value is a proto3 string, so the packed bytes travel as hex: n/4 chars
+        return "x" + self.to_bytes().hex()
+
+    @classmethod
+    def from_wire(cls, s: str, n: int):
+        s = (s or "").strip()
+        if s.startswith("x"):
+            try:
+                return cls.from_bytes(n, bytes.fromhex(s[1:]))
+            except ValueError:
+                return None
+        # legacy '0'/'1' string, index 0 first
+        if len(s) != n or any(c not in "01" for c in s):
+            return None
+        return cls.from_indices(n, (i for i, c in enumerate(s) if c == "1"))
+
+    def __str__(self):
+        return "".join("1" if (self.bits >> i) & 1 else "0" for i in range(self.n))
+
+    def __repr__(self):
+        return f"Bitmask({self})"
@@ -2,15 +2,14 @@
 from proto import helloworld_pb2
 from config import constants as Constants
 from . import transport
+from . import metrics
+from .bitmask import Bitmask
 
-def bitvec_to_str(bits):
-    return "".join("1" if b else "0" for b in bits)
+def bitvec_to_str(bits: Bitmask):
+    return bits.to_wire()
 
 def str_to_bitvec(s: str, n: int):
-    s = (s or "").strip()
-    if len(s) != n or any(c not in "01" for c in s):
-        return None
-    return [1 if c == "1" else 0 for c in s]
+    return Bitmask.from_wire(s, n)
 
 def on_certproposal_maybe_broadcast_bitvec(ctx, inst: int):
     """
@@ -25,19 +24,19 @@ def on_certproposal_maybe_broadcast_bitvec(ctx, inst: int):
     if inst in ctx.bitvec_sent:
         return
     ctx.bitvec_sent.add(inst)
+    metrics.mark(ctx, inst, "certprop_quorum")
 
-    bits = [0] * ctx.n
-    for proposer in props.keys():
-        idx = ctx.id_to_index.get(proposer)
-        if idx is not None:
-            bits[idx] = 1
+    # certified_props only holds proposals whose certificate went through ctx.verifier
+    # (vcbc_cert.on_certproposal) or my own, so every one of them can be vouched for
+    idxs = (ctx.id_to_index.get(proposer) for proposer in props)
+    bits = Bitmask.from_indices(ctx.n, (idx for idx in idxs if idx is not None))
 
     bitstr = bitvec_to_str(bits)
-    print(f"[{ctx.node_id}] 📦 bitvec(inst={inst})={bitstr}", flush=True)
-    print(f"[{ctx.node_id}] 📣 broadcasting BITVEC inst={inst} bits={bitstr} (certprops={cnt} q={ctx.q})", flush=True)
+    print(f"[{ctx.node_id}] 📦 bitvec(inst={inst})={bits}", flush=True)
+    print(f"[{ctx.node_id}] 📣 broadcasting BITVEC inst={inst} bits={bits} (certprops={cnt} q={ctx.q})", flush=True)
 
-    # store own bitvec locally too
-    ctx.bitvecs.setdefault(inst, {})[ctx.node_id] = bits
+    # store own bitvec locally too; it may be the q-th one, so it can make the support set ready
+    on_bitvec(ctx, ctx.node_id, inst, bitstr)
 
     # broadcast to peers via Propose(type="BITVEC")
     req = helloworld_pb2.PRORequest(
@@ -47,13 +46,7 @@ def on_certproposal_maybe_broadcast_bitvec(ctx, inst: int):
         proof="",
         value=bitstr,
     )
-    for port in Constants.PORTLIST[: ctx.n]:
-        if port == ctx.port:
-            continue
-        try:
-            transport.get_stub(ctx, port).Propose(req, timeout=2.0)
-        except Exception as e:
-            print(f"[{ctx.node_id}] BITVEC send failed to {port}: {e}", flush=True)
+    transport.broadcast(ctx, "Propose", req)
 
 def maybe_aggregate_support(ctx, inst: int):
     """
@@ -67,16 +60,14 @@ def maybe_aggregate_support(ctx, inst: int):
     if inst in ctx.support_set:
         return ctx.support_set[inst]
 
-    agg = [0] * ctx.n
+    agg = Bitmask(ctx.n)
     for bits in bv_map.values():
-        for j in range(ctx.n):
-            if bits[j] == 1:
-                agg[j] = 1
+        agg |= bits
 
     ctx.support_set[inst] = agg
     return agg
 
-def on_bitvec(ctx, sender: str, inst: int, bitstr: str, abba_start_cb=None):
+def on_bitvec(ctx, sender: str, inst: int, bitstr: str):
     bits = str_to_bitvec(bitstr, ctx.n)
     if bits is None:
         print(f"[{ctx.node_id}] ⚠️ invalid BITVEC from={sender} inst={inst} value={bitstr!r}", flush=True)
@@ -84,7 +75,7 @@ def on_bitvec(ctx, sender: str, inst: int, bitstr: str, abba_start_cb=None):
 
     ctx.bitvecs.setdefault(inst, {})[sender] = bits
     got = len(ctx.bitvecs[inst])
-    print(f"[{ctx.node_id}] ✅ received BITVEC inst={inst} from={sender} bits={bitstr} (got={got}/{ctx.q})", flush=True)
+    print(f"[{ctx.node_id}] ✅ received BITVEC inst={inst} from={sender} bits={bits} (got={got}/{ctx.q})", flush=True)
 
     if inst in ctx.support_ready:
         return
@@ -94,8 +85,9 @@ def on_bitvec(ctx, sender: str, inst: int, bitstr: str, abba_start_cb=None):
         return
 
     ctx.support_ready.add(inst)
-    Sstr = bitvec_to_str(S)
-    print(f"[{ctx.node_id}] ✅ SUPPORT ready inst={inst} S={Sstr} (from {got} BITVECs)", flush=True)
-    
-    if abba_start_cb is not None:
-        abba_start_cb(inst, S)
\ No newline at end of file
+    metrics.mark(ctx, inst, "support")
+    print(f"[{ctx.node_id}] ✅ SUPPORT ready inst={inst} S={S} (from {got} BITVECs)", flush=True)
+
+    # MVBA sits above this module (mvba -> vcbc_cert -> bitvec): reach it through the ctx hook
+    if ctx.mvba_on_support is not None:
+        ctx.mvba_on_support(inst, S)
@@ -0,0 +1,82 @@
+# src/catchup.py
+"""
+Catch-up for a node that fell behind (partitioned, restarted, slow).
+
+Peers prune an instance once q nodes report it decided and then drop its
+traffic as stale, so a node that missed it cannot run it any more. It asks
+instead: when its oldest undelivered instance made no progress for
+CATCHUP_AFTER_S (tick), it broadcasts CATCHUP for the window starting
+there, and every peer that still has those results in its decided log
+(the last DECIDED_LOG MVBA outputs, kept past pruning) answers DECIDED.
+f+1 identical answers include an honest node's, so the result is adopted
+as this node's MVBA output (mvba.adopt) and delivery resumes in order.
+
+Limitation: an instance that has left every peer's decided log cannot be
+recovered this way; a node that far behind needs a state snapshot, which
+is not implemented.
+"""
+import json
+from config import constants as Constants
+from . import transport
+from . import mvba
+from . import pruning
+
+MAX_PER_REQUEST = 64    # instances one CATCHUP may ask for
+
+def wire(result) -> str:
+    return json.dumps(result, sort_keys=True, separators=(",", ":"))
+
+def tick(ctx, after_s: float = None):
+    """Periodic check (Greeter watchdog, or the simulator's clock): ask peers if delivery is stuck."""
+    after_s = getattr(Constants, "CATCHUP_AFTER_S", 2.0) if after_s is None else after_s
+    if after_s <= 0 or ctx.pipeline is None:
+        return
+    inst = ctx.pipeline.stalled(after_s)
+    if inst is None:
+        return
+    count = min(ctx.pipeline.window, MAX_PER_REQUEST)
+    print(f"[{ctx.node_id}] 🆘 CATCHUP stuck at inst={inst}, asking peers for {inst}..{inst + count - 1}", flush=True)
+    transport.broadcast_catchup(ctx, inst=inst, count=count)
+
+def on_catchup(ctx, requester: str, inst: int, count: str):
+    """A peer is stuck at inst: send it every result from inst on that the decided log still has."""
+    if requester not in ctx.id_to_index or requester == ctx.node_id:
+        return
+    try:
+        count = max(0, min(int(count), MAX_PER_REQUEST))
+    except ValueError:
+        return
+    with ctx.gc_lock:
+        found = [(k, ctx.decided_log[k]) for k in range(inst, inst + count) if k in ctx.decided_log]
+    for k, result in found:
+        transport.send_decided(ctx, to=requester, inst=k, wire=wire(result))
+
+def _parse(w: str):
+    """DECIDED payload -> (ok, result): None (no value) or {proposer, value, proof}."""
+    try:
+        result = json.loads(w)
+    except (TypeError, ValueError):
+        return False, None
+    if result is None:
+        return True, None
+    if not isinstance(result, dict) or set(result) != {"proposer", "value", "proof"}:
+        return False, None
+    return all(isinstance(v, str) for v in result.values()), result
+
+def on_decided(ctx, sender: str, inst: int, w: str):
+    """Actor turn of inst: a peer's logged result; adopted once f+1 peers sent the same one."""
+    if inst in ctx.mvba_done or pruning.is_stale(ctx, inst) or sender not in ctx.id_to_index:
+        return
+    ok, result = _parse(w)
+    if not ok:
+        print(f"[{ctx.node_id}] ⚠️ bad DECIDED inst={inst} from={sender}", flush=True)
+        return
+    votes = ctx.catchup_votes.setdefault(inst, {})
+    if sender in votes:
+        return
+    votes[sender] = wire(result)
+    same = sum(1 for v in votes.values() if v == votes[sender])
+    if same < ctx.f + 1:
+        return
+    print(f"[{ctx.node_id}] 📥 CATCHUP inst={inst} adopted from {same} peers", flush=True)
+    mvba.adopt(ctx, inst, result)
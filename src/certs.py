@@ -0,0 +1,289 @@
+# src/certs.py
+"""
+Certificate backends for VCBC quorum certificates.
+
+A backend signs a share over a message, batch-verifies shares, combines q of
+them into a certificate and verifies a certificate. Certificates travel as
+the tail of the QC proof string ("...|signers=a,b,c|sigs=..."):
+
+  "sim"      no real crypto; SShare/VShare/CShare/VTHShare are charged through cost.charge
+  "schnorr"  q-of-n Schnorr multi-signature over secp256k1 (src/schnorr.py);
+             certificate = signer ids + their signatures, checked with one batch verification;
+             keys per node from the dealer files in Constants.KEY_DIR (src/keys.py)
+"""
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from config import constants as Constants
+from . import cost
+from . import keys
+from . import schnorr
+
+def cert_message(proposer: str, inst: int, d: str) -> bytes:
+    return f"VCBC|{proposer}|{inst}|{d}".encode()
+
+def parse_proof(proof: str) -> dict:
+    fields = {}
+    for part in proof.split("|")[1:]:
+        k, _, v = part.partition("=")
+        fields[k] = v
+    return fields
+
+class SimBackend:
+    name = "sim"
+
+    def sign(self, node_id: str, msg: bytes) -> str:
+        cost.charge("SShare")
+        return ""
+
+    def verify_shares(self, items):
+        cost.charge("VShare", len(items))
+        return [True] * len(items)
+
+    def combine(self, msg: bytes, shares: dict) -> str:
+        cost.charge("CShare")
+        return "signers=" + ",".join(sorted(shares))
+
+    def verify_cert(self, msg: bytes, proof: str, q: int) -> bool:
+        cost.charge("VTHShare")
+        signers = [s for s in parse_proof(proof).get("signers", "").split(",") if s]
+        return len(set(signers)) >= q
+
+class SchnorrBackend:
+    name = "schnorr"
+
+    def sign(self, node_id: str, msg: bytes) -> str:
+        return schnorr.sign(keys.schnorr_secret(node_id), msg, keys.schnorr_public(node_id))
+
+    def verify_shares(self, items):
+        """items: [(signer, msg, share)] -> [ok]; one batch check, per-share only if it fails."""
+        keyed = [(keys.schnorr_public(signer), msg, share) for signer, msg, share in items]
+        if None not in (pk for pk, _, _ in keyed) and schnorr.batch_verify(keyed):
+            return [True] * len(items)
+        return [pk is not None and schnorr.verify(pk, msg, share) for pk, msg, share in keyed]
+
+    def combine(self, msg: bytes, shares: dict) -> str:
+        signers = sorted(shares)
+        return "signers=" + ",".join(signers) + "|sigs=" + ",".join(shares[s] for s in signers)
+
+    def verify_cert(self, msg: bytes, proof: str, q: int) -> bool:
+        fields = parse_proof(proof)
+        signers = [s for s in fields.get("signers", "").split(",") if s]
+        sigs = [s for s in fields.get("sigs", "").split(",") if s]
+        if len(set(signers)) < q or len(signers) != len(sigs):
+            return False
+        pks = [keys.schnorr_public(s) for s in signers]
+        if None in pks:
+            return False
+        return schnorr.batch_verify([(pk, msg, sig) for pk, sig in zip(pks, sigs)])
+
+BACKENDS = {"sim": SimBackend, "schnorr": SchnorrBackend}
+
+_backends = {}
+
+def backend(name: str = None):
+    name = name or getattr(Constants, "CERT_BACKEND", "sim")
+    if name not in _backends:
+        _backends[name] = BACKENDS[name]()
+    return _backends[name]
+
+# module-level so they pickle into the worker processes
+def _init_worker(settings: dict):
+    # spawned workers re-import the defaults: apply the parent's runtime overrides
+    for k, v in settings.items():
+        setattr(Constants, k, v)
+
+def _verify_shares_job(name: str, items):
+    return backend(name).verify_shares(items)
+
+def _verify_each(name: str, items):
+    """Fallback when a batch raised: check every share on its own; one that raises fails."""
+    oks = []
+    for item in items:
+        try:
+            oks.append(bool(backend(name).verify_shares([item])[0]))
+        except Exception:
+            oks.append(False)
+    return oks
+
+def _verify_cert_job(name: str, msg: bytes, proof: str, q: int):
+    return backend(name).verify_cert(msg, proof, q)
+
+class CertCache:
+    """
+    Bounded LRU of things already verified (certificates and signature
+    shares), keyed by a sha256 over what was checked. Only successful
+    verifications are cached. Thread-safe: hit from the actor, filled from
+    pool callbacks.
+    """
+
+    def __init__(self, max_entries: int = None):
+        self.max_entries = max_entries or getattr(Constants, "CERT_CACHE_SIZE", 4096)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(*parts) -> bytes:
+        h = hashlib.sha256()
+        for p in parts:
+            p = p if isinstance(p, bytes) else str(p).encode()
+            h.update(len(p).to_bytes(4, "big") + p)
+        return h.digest()
+
+    def __contains__(self, key: bytes) -> bool:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, key: bytes):
+        with self._lock:
+            self._entries[key] = True
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+class Verifier:
+    """
+    Runs share/certificate verification off the protocol actor.
+
+    Shares queue up and are flushed as one job per VERIFY_BATCH of them; the
+    flush itself is an actor step, so everything that arrived in the same
+    burst is verified together. With VERIFY_WORKERS > 0 jobs run on a
+    ProcessPoolExecutor, otherwise inline. Results always come back through
+    ctx.actor on the instance's shard. Anything already in `cache` is
+    answered without being verified again. A job that raises (a crashed
+    worker, a malformed input) never loses its callbacks: the items it
+    covered are reported as failed, or rechecked one by one when inline.
+
+    The "sim" backend only sleeps for its modelled costs: while those sleeps
+    are real (cost.blocking()), its jobs and offload()ed signing/combining
+    run on CHARGE_THREADS threads instead of inline on the actor.
+    """
+
+    def __init__(self, ctx, workers: int = None, batch: int = None):
+        self.ctx = ctx
+        self.backend = backend()
+        self.batch = batch or getattr(Constants, "VERIFY_BATCH", 64)
+        workers = getattr(Constants, "VERIFY_WORKERS", 0) if workers is None else workers
+        # spawn, not fork: the parent already runs gRPC threads
+        settings = {k: getattr(Constants, k) for k in ("CERT_BACKEND", "KEY_DIR", "KEY_SEED", "COIN_BACKEND") if hasattr(Constants, k)}
+        self.pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=_init_worker, initargs=(settings,)) if workers else None
+        self.cache = CertCache()
+        self._pending = []   # (inst, item, on_result)
+        self._lock = threading.Lock()
+        self._charger = None # ThreadPoolExecutor for sleeping charges, built on first use
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        if self._charger is not None:
+            self._charger.shutdown(wait=False, cancel_futures=True)
+
+    def _charge_pool(self):
+        with self._lock:
+            if self._charger is None:
+                self._charger = ThreadPoolExecutor(getattr(Constants, "CHARGE_THREADS", 4), thread_name_prefix="charge")
+            return self._charger
+
+    def offload(self, inst: int, fn, args, on_result):
+        """
+        on_result(fn(*args)) for work whose cost is only a cost.charge: on a
+        charge thread, back on the actor, while charges really sleep; inline
+        otherwise (the simulator charges virtual time, and stays deterministic).
+        """
+        if not cost.blocking():
+            on_result(fn(*args))
+            return
+        self._charge_pool().submit(fn, *args).add_done_callback(
+            lambda fut: self.ctx.actor.submit(inst, on_result, fut.result()))
+
+    def _failed(self, fn, e, fallback: str):
+        print(f"[{self.ctx.node_id}] ⚠️ verification job {fn.__name__} raised {e!r} -> {fallback}", flush=True)
+
+    def _run(self, fn, args, on_done, failed, retry=None):
+        """
+        on_done(fn(*args)). If the job raises: on_done(failed) from a worker,
+        on_done(retry()) inline when a retry is given.
+        """
+        pool = self.pool
+        if pool is None and self.backend.name == "sim" and cost.blocking():
+            pool = self._charge_pool()
+        if pool is None:
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self._failed(fn, e, "rechecking one by one" if retry else "failed")
+                result = retry() if retry else failed
+            on_done(result)
+            return
+
+        def finished(fut):
+            try:
+                result = fut.result()
+            except Exception as e:
+                self._failed(fn, e, "failed")
+                result = failed
+            on_done(result)
+
+        try:
+            pool.submit(fn, *args).add_done_callback(finished)
+        except Exception as e:   # pool already broken / shut down
+            self._failed(fn, e, "failed")
+            on_done(failed)
+
+    def submit(self, inst: int, fn, args, on_result, failed=None):
+        """Run a picklable verification job fn(*args); on_result(result, or `failed` if it raised) comes back on the actor."""
+        self._run(fn, args, lambda result: self.ctx.actor.submit(inst, on_result, result), failed)
+
+    def verify_share(self, inst: int, signer: str, msg: bytes, share: str, on_result):
+        if self.cache.key("share", signer, msg, share) in self.cache:
+            self.ctx.actor.submit(inst, on_result, True)
+            return
+        with self._lock:
+            self._pending.append((inst, (signer, msg, share), on_result))
+            first = len(self._pending) == 1
+        if first:
+            self.ctx.actor.submit(inst, self.flush)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for i in range(0, len(pending), self.batch):
+            chunk = pending[i:i + self.batch]
+
+            def done(oks, chunk=chunk):
+                for (inst, item, on_result), ok in zip(chunk, oks):
+                    if ok:
+                        self.cache.add(self.cache.key("share", *item))
+                    self.ctx.actor.submit(inst, on_result, ok)
+
+            items = [item for _, item, _ in chunk]
+            self._run(_verify_shares_job, (self.backend.name, items), done, [False] * len(items),
+                      retry=lambda items=items: _verify_each(self.backend.name, items))
+
+    def verify_cert(self, inst: int, msg: bytes, proof: str, on_result):
+        key = self.cache.key("cert", msg, proof)
+        if key in self.cache:
+            self.ctx.actor.submit(inst, on_result, True)
+            return
+
+        def done(ok):
+            if ok:
+                self.cache.add(key)
+            self.ctx.actor.submit(inst, on_result, ok)
+
+        self._run(_verify_cert_job, (self.backend.name, msg, proof, self.ctx.q), done, False)
@@ -3,15 +3,16 @@ import os, sys
 sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
 
 import argparse
+from concurrent import futures
 import grpc
 from proto import helloworld_pb2
 from proto import helloworld_pb2_grpc
 from config import constants as Constants
 
-def send_one(host: str, port: int, inst: int, value: str, timeout_s: float = 2.0):
+def send_one(host: str, port: int, inst: int, value: str, timeout_s: float = 2.0, rtype: str = ""):
     with grpc.insecure_channel(f"{host}:{port}") as ch:
         stub = helloworld_pb2_grpc.GreeterStub(ch)
-        req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=value)
+        req = helloworld_pb2.PRORequest(id="client", type=rtype, instance=inst, proof="", value=value)
         return stub.Propose(req, timeout=timeout_s)
 
 def main():
@@ -21,22 +22,30 @@ def main():
     ap.add_argument("--broadcast", action="store_true")
     ap.add_argument("--instance", type=int, default=1)
     ap.add_argument("--value", default="1")
+    ap.add_argument("--submit", action="store_true", help="wait for the decided value (in instance order)")
+    ap.add_argument("--tx", action="store_true", help="send --value as a transaction to the node mempools; waits for <inst>:<index>")
     args = ap.parse_args()
 
+    rtype = "TX" if args.tx else "SUBMIT" if args.submit else ""
+    timeout_s = getattr(Constants, "SUBMIT_TIMEOUT_S", 30.0) if rtype else 2.0
+
     ports = Constants.PORTLIST[: getattr(Constants, "N", len(Constants.PORTLIST))]
 
     if not args.broadcast:
-        rep = send_one(args.host, args.port, args.instance, args.value)
+        rep = send_one(args.host, args.port, args.instance, args.value, timeout_s, rtype)
         print(f"Propose reply from {args.port}: {rep}", flush=True)
         return
 
     print(f"Broadcasting Propose() to {len(ports)} nodes: {ports}", flush=True)
-    for p in ports:
-        try:
-            rep = send_one(args.host, p, args.instance, args.value)
-            print(f"Propose reply from {p}: {rep}", flush=True)
-        except Exception as e:
-            print(f"Propose FAILED to {p}: {e}", flush=True)
+    # concurrently: a SUBMIT only returns once enough nodes have their input
+    with futures.ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        futs = {p: pool.submit(send_one, args.host, p, args.instance, args.value, timeout_s, rtype) for p in ports}
+        for p, fut in futs.items():
+            try:
+                rep = fut.result()
+                print(f"Propose reply from {p}: {rep}", flush=True)
+            except Exception as e:
+                print(f"Propose FAILED to {p}: {e}", flush=True)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,32 +1,161 @@
 # src/coin.py
 import hashlib
+from config import constants as Constants
+from . import cost
+from . import keys
+from . import tcoin
 
-def make_share(node_id: str, inst: int, rnd: int) -> int:
-    s = f"{node_id}|{inst}|{rnd}".encode()
+# Constants.COIN_BACKEND:
+#   "hash"       XOR of sha256 low bits (predictable, nothing to verify; ABBA*Share costs are charged via cost.charge)
+#   "threshold"  CKS threshold coin (src/tcoin.py); shares batch-verified via ctx.verifier
+_threshold = None   # (n, t, id_to_index, [VK_i]) once setup() picked the threshold coin
+
+def setup(ctx):
+    global _threshold
+    if getattr(Constants, "COIN_BACKEND", "hash") == "threshold":
+        t = ctx.f + 1
+        _threshold = (ctx.n, t, dict(ctx.id_to_index), keys.tcoin_public(ctx.n, t))
+    else:
+        _threshold = None
+
+def _name(aid, rnd: int) -> bytes:
+    return f"coin|inst={aid[0]}|idx={aid[1]}|r={rnd}".encode()
+
+def make_share(node_id: str, aid, rnd: int):
+    if _threshold is not None:
+        n, t, index, vks = _threshold
+        i = index[node_id]
+        return tcoin.make_share(keys.tcoin_secret(node_id, i, n, t), vks[i], i, _name(aid, rnd))
+    cost.charge("ABBASShare")
+    s = f"{node_id}|{aid[0]}|{aid[1]}|{rnd}".encode()
     h = hashlib.sha256(s).digest()
     return h[0] & 1
 
-def combine(shares: list[int]) -> int:
+def encode_share(share) -> str:
+    return str(share)
+
+def decode_share(s: str):
+    return s if _threshold is not None else int(s) & 1
+
+def my_share(ctx, aid, rnd: int):
+    """This node's share for (aid, rnd), from the precomputed cache when available."""
+    key = (aid, rnd)
+    if key not in ctx.coin_own:
+        ctx.coin_own[key] = make_share(ctx.node_id, aid, rnd)
+    return ctx.coin_own[key]
+
+def precompute(ctx, aid, from_rnd: int, lookahead: int = None):
+    """
+    Compute my shares for the next COIN_LOOKAHEAD rounds while waiting on the
+    network. Hash coin shares cost only a charge: ctx.verifier.offload keeps
+    that off the actor on a live node.
+    """
+    lookahead = getattr(Constants, "COIN_LOOKAHEAD", 2) if lookahead is None else lookahead
+    for rnd in range(from_rnd, from_rnd + lookahead):
+        key = (aid, rnd)
+        if key in ctx.coin_own or key in ctx.coin_computing:
+            continue
+        if _threshold is not None or ctx.verifier is None:
+            my_share(ctx, aid, rnd)
+            continue
+        ctx.coin_computing.add(key)
+        ctx.verifier.offload(aid[0], make_share, (ctx.node_id, aid, rnd),
+                             lambda share, key=key: _precomputed(ctx, key, share))
+
+def _precomputed(ctx, key, share):
+    ctx.coin_computing.discard(key)
+    ctx.coin_own.setdefault(key, share)
+
+def piggyback(share) -> str:
+    # rides in messageABBA.sign of my MAINVOTE(rnd)
+    return f"coin={encode_share(share)}"
+
+def unpiggyback(sign: str):
+    if sign and sign.startswith("coin="):
+        return decode_share(sign[len("coin="):])
+    return None
+
+def _hash_coin(shares: list, got: int) -> int:
+    cost.charge("ABBAVShare", got)
+    return combine(shares)
+
+def combine(shares: list) -> int:
+    if _threshold is not None:
+        return tcoin.combine(_threshold[1], shares)
+    cost.charge("ABBACShare")
     x = 0
     for b in shares:
         x ^= (int(b) & 1)
     return x
 
-def on_coin_share(ctx, inst: int, rnd: int, sender: str, share_bit: int):
-    inst_map = ctx.coin_shares.setdefault(inst, {})
+# module-level so it pickles into the verifier's worker processes
+def _verify_job(vks, name: bytes, items):
+    return tcoin.verify_shares(vks, name, items)
+
+def on_coin_share(ctx, aid, rnd: int, sender: str, share, on_ready=None):
+    """
+    Store a share; at q shares combine. Hash coin: returns the coin bit right
+    away, or on a live node with a verifier hands the charged combine to
+    ctx.verifier.offload. Threshold coin: the q shares are batch-verified off
+    the actor first. Whenever the bit is not returned (None), on_ready(coin_bit)
+    is called once the coin is known.
+    """
+    inst_map = ctx.coin_shares.setdefault(aid, {})
     rnd_map = inst_map.setdefault(rnd, {})
 
     if sender in rnd_map:
         return None
 
-    rnd_map[sender] = int(share_bit) & 1
+    rnd_map[sender] = share
     got = len(rnd_map)
-    print(f"[{ctx.node_id}] 🪙 COIN share recv inst={inst} r={rnd} from={sender} share={share_bit} (got={got}/{ctx.q})", flush=True)
+    shown = share if _threshold is None else share[:12]
+    print(f"[{ctx.node_id}] 🪙 COIN share recv inst={aid[0]} idx={aid[1]} r={rnd} from={sender} share={shown} (got={got}/{ctx.q})", flush=True)
+
+    if got < ctx.q or (aid, rnd) in ctx.coin_ready or (aid, rnd) in ctx.coin_verifying:
+        return None
+
+    if _threshold is None:
+        ctx.coin_ready.add((aid, rnd))
+        shares = list(rnd_map.values())
+
+        def combined(coin_bit):
+            print(f"[{ctx.node_id}] 🪙 COIN READY inst={aid[0]} idx={aid[1]} r={rnd} coin={coin_bit}", flush=True)
+            return coin_bit
+
+        if ctx.verifier is None or not cost.blocking():
+            return combined(_hash_coin(shares, got))
+
+        def offloaded(coin_bit):
+            combined(coin_bit)
+            if on_ready is not None:
+                on_ready(coin_bit)
+
+        ctx.verifier.offload(aid[0], _hash_coin, (shares, got), offloaded)
+        return None
+
+    ctx.coin_verifying.add((aid, rnd))
+    senders = list(rnd_map)
+    n, t, index, vks = _threshold
+    items = [(index.get(s, n), rnd_map[s]) for s in senders]
 
-    if got >= ctx.q and (inst, rnd) not in ctx.coin_ready:
-        ctx.coin_ready.add((inst, rnd))
-        coin_bit = combine(list(rnd_map.values()))
-        print(f"[{ctx.node_id}] 🪙 COIN READY inst={inst} r={rnd} coin={coin_bit}", flush=True)
-        return coin_bit
+    def verified(oks):
+        ctx.coin_verifying.discard((aid, rnd))
+        for s, ok in zip(senders, oks):
+            if not ok:
+                print(f"[{ctx.node_id}] ⚠️ invalid COIN share inst={aid[0]} idx={aid[1]} r={rnd} from={s}", flush=True)
+                rnd_map.pop(s, None)
+        valid = [rnd_map[s] for s, ok in zip(senders, oks) if ok]
+        if len(valid) < t or (aid, rnd) in ctx.coin_ready:
+            return   # wait for more shares; the next one re-triggers verification
+        ctx.coin_ready.add((aid, rnd))
+        coin_bit = combine(valid)
+        print(f"[{ctx.node_id}] 🪙 COIN READY inst={aid[0]} idx={aid[1]} r={rnd} coin={coin_bit} (verified {len(valid)} shares)", flush=True)
+        if on_ready is not None:
+            on_ready(coin_bit)
 
-    return None
\ No newline at end of file
+    args = (vks, _name(aid, rnd), items)
+    if ctx.verifier is not None:
+        ctx.verifier.submit(aid[0], _verify_job, args, verified, failed=[False] * len(items))
+    else:
+        verified(_verify_job(*args))
+    return None
@@ -13,14 +13,38 @@ class NodeContext:
     f: int = 0
     q: int = 0  # quorum = 2f+1
 
+    # asyncio loop when running under grpc.aio (None = threaded server)
+    loop: object = None
+    # protocol actor: the only executor allowed to touch the state below
+    actor: object = None                                    # ActorPool / LoopActor
+
     # stub cache
+    channels: dict = field(default_factory=dict)            # port -> grpc.Channel
     stubs: dict = field(default_factory=dict)
+    node_stubs: dict = field(default_factory=dict)          # port -> bft.NodeStub
+    outboxes: dict = field(default_factory=dict)            # port -> PeerOutbox
+    streams: dict = field(default_factory=dict)             # port -> PeerStream
     stub_lock: threading.Lock = field(default_factory=threading.Lock)
+    loopback: object = None                                 # loopback.LoopbackNetwork: in-process cluster, no gRPC
+
+    # broadcast engine counters (updated from gRPC completion callbacks)
+    send_ok: dict = field(default_factory=dict)             # port -> completed sends
+    send_failures: dict = field(default_factory=dict)       # port -> failed sends
+    batches_sent: dict = field(default_factory=dict)        # port -> SendBatch RPCs
+    send_stats_lock: threading.Lock = field(default_factory=threading.Lock)
 
     # protocol state
     proposeMessage: dict = field(default_factory=dict)      # "instance<k>" -> {value,...}
     certs: dict = field(default_factory=dict)               # (inst,tag,step,value)->set(sender_ids)
     my_cert_sent: set = field(default_factory=set)          # inst set
+    vcbc_echoed: set = field(default_factory=set)           # (inst, proposer) we already echoed
+    cert_shares: dict = field(default_factory=dict)         # (inst, digest) -> {signer: signature share} on my proposal
+    verifier: object = None                                 # certs.Verifier (share/cert checks off the actor)
+    payloads: dict = field(default_factory=dict)            # (inst, digest) -> full VCBC value
+    payload_requested: set = field(default_factory=set)     # (inst, digest) already fetched
+    fragments: dict = field(default_factory=dict)           # (inst, root) -> my dispersed fragment (wire form)
+    fragments_recv: dict = field(default_factory=dict)      # (inst, root) -> {index: fragment} during retrieval
+    bad_dispersals: set = field(default_factory=set)        # (inst, root) whose fragments are not one codeword
     certified_props: dict = field(default_factory=dict)     # inst -> proposer -> {"value","proof"}
 
     # BITVEC / SUPPORT / ABBA hooks
@@ -28,33 +52,58 @@ class NodeContext:
     certprop_counted: set = field(default_factory=set)    # (inst, proposer) dedup
 
     bitvec_sent: set = field(default_factory=set)         # inst
-    bitvecs: dict = field(default_factory=dict)           # inst -> sender -> [0/1]*n
-    support_set: dict = field(default_factory=dict)       # inst -> [0/1]*n
+    bitvecs: dict = field(default_factory=dict)           # inst -> sender -> Bitmask
+    support_set: dict = field(default_factory=dict)       # inst -> Bitmask
     support_ready: set = field(default_factory=set)       # inst
 
-    abba_started: set = field(default_factory=set)        # inst
+    abba_started: set = field(default_factory=set)        # (inst, idx): one ABBA per permutation index
 
     abba_messages: dict = field(default_factory=dict)
     abba_sent: set = field(default_factory=set)
-    abba_decided: dict = field(default_factory=dict) # inst -> decided bit
+    abba_decided: dict = field(default_factory=dict) # (inst, idx) -> decided bit
+    abba_votes: object = None                        # abba_vec.VoteArrays when ABBA_ENGINE='numpy'
 
     # MVBA fields
     node_ids: list = field(default_factory=list)            # ['id1','id2',...]
-    mvba_started: set = field(default_factory=set)          # inst.mvba_perm: dict = field(default_factory=dict)           # inst -> [ids]
-    mvba_pivot: dict = field(default_factory=dict)          # inst -> pivot id
+    mvba_started: set = field(default_factory=set)          # inst
+    mvba_perm: dict = field(default_factory=dict)           # inst -> [ids]
+    mvba_index: dict = field(default_factory=dict)          # inst -> permutation index whose ABBA runs now
     mvba_decided: dict = field(default_factory=dict)        # inst -> {proposer,value,proof}
-    mvba_on_aba_decide: object = None                       # callable(inst, decided_bit)
+    mvba_on_support: object = None                          # callable(inst, support set), once support is ready
+    mvba_on_aba_decide: object = None                       # callable((inst, idx), decided_bit)
+    mvba_waiting: dict = field(default_factory=dict)        # inst -> idx decided 1, cert/payload still being fetched
+    mvba_done: set = field(default_factory=set)             # inst whose MVBA output is final (value or None)
+    certprop_requested: set = field(default_factory=set)    # (inst, proposer) CERTFETCH already sent
+    mvba_on_decide: object = None                           # callable(inst, result or None), once final
+    catchup_votes: dict = field(default_factory=dict)       # inst -> {peer: DECIDED result wire} (see catchup.py)
+    pipeline: object = None                                 # Pipeline (in-flight window, ordered delivery)
+    mempool: object = None                                  # Mempool (client txs -> batched VCBC values)
 
-    abba_round: dict = field(default_factory=dict)      # inst -> current round (int)
+    abba_round: dict = field(default_factory=dict)      # (inst, idx) -> highest round entered (int)
+    future: object = None                               # FutureBuffer: early ABBA votes / BITVEC / CERTPROPOSAL, replayed on entry
     abba_est: dict = field(default_factory=dict)        # inst -> current estimate bit
     abba_coin: dict = field(default_factory=dict)       # (inst, round) -> coin bit
-    abba_sent: set = field(default_factory=set)         # (inst, round, type) dedup sends
+    abba_sent: set = field(default_factory=set)         # ((inst, idx), round, type) dedup sends
+
+    # coin (see coin.py for the hash / threshold backends)
+    coin_shares: dict = field(default_factory=dict)   # (inst, idx) -> rnd -> sender -> share
+    coin_ready: set = field(default_factory=set)      # ((inst, idx), rnd)
+    coin_sent: set = field(default_factory=set)       # ((inst, idx), rnd)
+    coins: dict = field(default_factory=dict)         # ((inst, idx), rnd) -> coin bit 0/1 (cached)
+    coin_own: dict = field(default_factory=dict)      # ((inst, idx), rnd) -> my precomputed share
+    coin_verifying: set = field(default_factory=set)  # ((inst, idx), rnd) with a share batch being verified
+    coin_computing: set = field(default_factory=set)  # ((inst, idx), rnd) my share being computed off the actor
+
+    # garbage collection (see pruning.py)
+    low_watermark: int = 0                            # state for inst < low_watermark is gone
+    decided_upto: int = 0                             # highest inst with 1..inst all decided locally
+    peer_decided: dict = field(default_factory=dict)  # node_id -> highest inst with 1..inst all reported decided
+    peer_ahead: dict = field(default_factory=dict)    # node_id -> {inst reported decided above that point}
+    decided_log: dict = field(default_factory=dict)   # inst -> MVBA output, last DECIDED_LOG of them (see catchup.py)
+    gc_lock: threading.Lock = field(default_factory=threading.Lock)  # the five above: every actor shard reports decisions
 
-    # coin (simulated)
-    coin_shares: dict = field(default_factory=dict)   # inst -> rnd -> sender -> 0/1
-    coin_ready: set = field(default_factory=set)      # (inst, rnd)
-    coin_sent: set = field(default_factory=set)       # (inst, rnd)
-    coins: dict = field(default_factory=dict)         # (inst, rnd) -> coin bit 0/1 (cached)
+    # observability (see metrics.py)
+    metrics: object = None                            # metrics.Metrics: phase timestamps -> histograms
 
     def init_quorum(self):
         # derive f safely from n (BFT expects n >= 3f+1)
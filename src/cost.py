@@ -0,0 +1,29 @@
+# src/cost.py
+"""
+Modelled CPU cost of crypto we do not really perform: the SShare/VShare/
+CShare/VTHShare constants (sim certificates) and ABBASShare/ABBAVShare/
+ABBACShare (hash coin). A real node sleeps for them; the discrete-event
+simulator install()s a hook that advances its virtual clock instead. While
+charges really sleep (blocking()), callers run the charged work off the
+actor (certs.Verifier.offload), so a sleep never stalls an actor shard.
+"""
+import time
+
+from config import constants as Constants
+
+_spend = time.sleep
+
+def charge(name: str, times: int = 1):
+    seconds = getattr(Constants, name, 0.0) * times
+    if seconds > 0:
+        _spend(seconds)
+
+def blocking() -> bool:
+    """True when a charge sleeps the calling thread, False under the simulator's clock."""
+    return _spend is time.sleep
+
+def install(spend):
+    """Route charges to spend(seconds); -> the previous hook."""
+    global _spend
+    previous, _spend = _spend, spend
+    return previous
@@ -0,0 +1,78 @@
+# src/erasure.py
+import struct
+
+# GF(2^8) with the AES/Rijndael-compatible polynomial x^8+x^4+x^3+x+1 (0x11b), generator 3
+_EXP = [0] * 512
+_LOG = [0] * 256
+_x = 1
+for _i in range(255):
+    _EXP[_i] = _x
+    _LOG[_x] = _i
+    _x ^= (_x << 1) ^ (0x11b if _x & 0x80 else 0)
+    _x &= 0xff
+for _i in range(255, 512):
+    _EXP[_i] = _EXP[_i - 255]
+
+def _mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return _EXP[_LOG[a] + _LOG[b]]
+
+def _inv(a: int) -> int:
+    return _EXP[255 - _LOG[a]]
+
+# one 256-byte translate table per constant: c * row is then a single bytes.translate()
+_MUL_TABLES = [bytes(_mul(c, b) for b in range(256)) for c in range(256)]
+
+def _lagrange(xs, x: int):
+    """Coefficients L_m(x) of the Lagrange basis over points xs (all in GF(2^8), distinct)."""
+    coeffs = []
+    for m, xm in enumerate(xs):
+        num, den = 1, 1
+        for j, xj in enumerate(xs):
+            if j != m:
+                num = _mul(num, x ^ xj)
+                den = _mul(den, xm ^ xj)
+        coeffs.append(_mul(num, _inv(den)))
+    return coeffs
+
+def _combine(coeffs, rows, size: int) -> bytes:
+    # sum_m coeffs[m] * rows[m], XOR done on big ints rather than per byte
+    acc = 0
+    for c, row in zip(coeffs, rows):
+        if c:
+            acc ^= int.from_bytes(row.translate(_MUL_TABLES[c]), "little")
+    return acc.to_bytes(size, "little")
+
+def encode(data: bytes, n: int, k: int):
+    """
+    Systematic Reed-Solomon: split the length-prefixed data into k rows and
+    return n fragments; any k of them rebuild the data. Fragment i is the
+    polynomial through the k rows evaluated at x = i + 1 (so the first k are
+    the data rows themselves).
+    """
+    if not 1 <= k <= n <= 255:
+        raise ValueError(f"need 1 <= k <= n <= 255, got k={k} n={n}")
+    data = struct.pack(">I", len(data)) + data
+    size = -(-len(data) // k)
+    data = data.ljust(size * k, b"\0")
+    rows = [data[i * size:(i + 1) * size] for i in range(k)]
+    xs = list(range(1, k + 1))
+    return rows + [_combine(_lagrange(xs, i + 1), rows, size) for i in range(k, n)]
+
+def decode(fragments: dict, k: int) -> bytes:
+    """{fragment index -> fragment} with at least k entries -> original data."""
+    if len(fragments) < k:
+        raise ValueError(f"need {k} fragments, got {len(fragments)}")
+    idx = sorted(fragments)[:k]
+    rows_in = [fragments[i] for i in idx]
+    size = len(rows_in[0])
+    if any(len(r) != size for r in rows_in):
+        raise ValueError("fragments differ in size")
+    xs = [i + 1 for i in idx]
+    rows = [fragments[i] if i in fragments else _combine(_lagrange(xs, i + 1), rows_in, size) for i in range(k)]
+    data = b"".join(rows)
+    (length,) = struct.unpack(">I", data[:4])
+    if length > len(data) - 4:
+        raise ValueError("bad length prefix")
+    return data[4:4 + length]
@@ -0,0 +1,51 @@
+# src/future_buffer.py
+import threading
+
+from config import constants as Constants
+
+class FutureBuffer:
+    """
+    Messages that arrived before this node reached the phase they belong to,
+    keyed by phase, e.g. ("ABBA", inst, idx, rnd) or ("BITVEC", inst). The owner
+    take()s and replays them on entering that phase, so progress never waits
+    for a retransmit.
+
+    Each sender may have at most max_per_sender messages buffered in total:
+    a Byzantine node flooding far-future rounds or instances costs bounded
+    memory, and its excess is dropped (and counted).
+    """
+
+    def __init__(self, max_per_sender: int = None):
+        self.max_per_sender = max_per_sender or getattr(Constants, "FUTURE_MAX_PER_SENDER", 1024)
+        self.dropped = 0
+        self._held = {}              # key -> [(sender, msg)]
+        self._per_sender = {}        # sender -> buffered count
+        self._lock = threading.Lock()
+
+    def hold(self, key, sender: str, msg) -> bool:
+        with self._lock:
+            if self._per_sender.get(sender, 0) >= self.max_per_sender:
+                self.dropped += 1
+                return False
+            self._per_sender[sender] = self._per_sender.get(sender, 0) + 1
+            self._held.setdefault(key, []).append((sender, msg))
+            return True
+
+    def _release(self, entries):
+        for sender, _ in entries:
+            self._per_sender[sender] -= 1
+        return [msg for _, msg in entries]
+
+    def take(self, key):
+        with self._lock:
+            return self._release(self._held.pop(key, []))
+
+    def forget_below(self, inst: int):
+        """Drop phases of pruned instances (key[1] is the instance)."""
+        with self._lock:
+            for key in [k for k in self._held if k[1] < inst]:
+                self._release(self._held.pop(key))
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(v) for v in self._held.values())
@@ -25,11 +25,8 @@ import time;
 import threading
 
 import Constants
+from keyed_waiters import KeyedWaiters
 
-      
-
-
-    
 
 class Greeter(helloworld_pb2_grpc.GreeterServicer):
 
@@ -38,7 +35,7 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
 
         This refactor keeps your existing RPC handlers, but:
         - allows running multiple nodes via CLI args (node_id/port)
-        - replaces busy-wait loops with a Condition variable
+        - replaces busy-wait loops with per-key waiters (KeyedWaiters)
         - adds a gRPC stub cache so nodes can talk to peers
         """
         # Allow runtime override instead of editing Constants.py per node
@@ -64,33 +61,29 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
         # instance -> decided value (or None)
         self.decided = {}  
 
-        # Concurrency primitives (replace busy-wait loops)
-        self._cv = threading.Condition()
-
-
         self.my_cert_sent = set()        # (instance) or (instance,value)
         self.certified_props = {}        # inst -> { proposer_id -> {"value":..., "proof":...} }
 
         # gRPC client cache for peer-to-peer sends
         self._stubs = {}
 
-        # Node-local mutable state (avoid class-level dicts)
-        self.preProcessMessage = {}
-        self.preVoteMessage = {}
-        self.mainVoteMessage = {}
-        self.proposeMessage = {}
-        self.outputMessage = {}
-        self.coinMessage = {}
-        self.classicPreProcessMessage = {}
-        self.classicPreVoteMessage = {}
-        self.classicMainVoteMessage = {}
-        self.classicProposeMessage = {}
-        self.classicCommitMessage = {}
-        self.classicOutputMessage = {}
-        self.classicCoinMessage = {}
-        self.recommedationMessage = {}
+        # Node-local mutable state (avoid class-level dicts); RPCs block on keys of these
+        self.preProcessMessage = KeyedWaiters()
+        self.preVoteMessage = KeyedWaiters()
+        self.mainVoteMessage = KeyedWaiters()
+        self.proposeMessage = KeyedWaiters()
+        self.outputMessage = KeyedWaiters()
+        self.coinMessage = KeyedWaiters()
+        self.classicPreProcessMessage = KeyedWaiters()
+        self.classicPreVoteMessage = KeyedWaiters()
+        self.classicMainVoteMessage = KeyedWaiters()
+        self.classicProposeMessage = KeyedWaiters()
+        self.classicCommitMessage = KeyedWaiters()
+        self.classicOutputMessage = KeyedWaiters()
+        self.classicCoinMessage = KeyedWaiters()
+        self.recommedationMessage = KeyedWaiters()
         self.VABASignatures = {}
-        self.ECoinShare = {}
+        self.ECoinShare = KeyedWaiters()
 
         # Derive f safely (your Constants.FAULTY_NODES was sometimes larger than (n-1)//3)
         n = len(Constants.PORTLIST)
@@ -109,15 +102,8 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
              self._stubs[port] = helloworld_pb2_grpc.GreeterStub(channel)
           return self._stubs[port]
 
-    def _notify(self):
-        with self._cv:
-            self._cv.notify_all()
-
-    def _wait_for_key(self, dct, key: str):
-        with self._cv:
-            while key not in dct:
-                self._cv.wait(timeout=1.0)
-            return dct[key]
+    def _wait_for_key(self, dct: KeyedWaiters, key: str):
+        return dct.wait(key)
 
     def SayHello(self, request, context):
         print("Hello " + request.name)
@@ -130,7 +116,6 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
            key = Constants.INSTANCE+str(request.view)
            if key not in self.ECoinShare:
                self.ECoinShare[key] = {"CShare":request.cshare}
-               self._notify()
                return helloworld_pb2.ELeaderReply(id=Constants.ID, view = request.view, cshare=request.cshare)
 
         key = Constants.INSTANCE + str(request.view)
@@ -200,15 +185,11 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
          
 
 
-        while True:
-                key = Constants.INSTANCE+str(request.instance)
-                
-                if key in self.classicProposeMessage:
-                    proposeElement = self.classicProposeMessage[key] 
-                   
+        key = Constants.INSTANCE+str(request.instance)
+        proposeElement = self._wait_for_key(self.classicProposeMessage, key)
 
-                    #message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ClassicPROReply(id=Constants.ID, type="Propose", instance=proposeElement[Constants.INSTANCE], proof=proposeElement[Constants.PROOF],value=proposeElement[Constants.VALUE])  
+        #message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+        return helloworld_pb2.ClassicPROReply(id=Constants.ID, type="Propose", instance=proposeElement[Constants.INSTANCE], proof=proposeElement[Constants.PROOF],value=proposeElement[Constants.VALUE])  
        
     def ClassicCommit(self, request, context):
        
@@ -225,15 +206,11 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
          
 
 
-        while True:
-                key = Constants.INSTANCE+str(request.instance)
-                
-                if key in self.classicCommitMessage:
-                    commitElement = self.classicCommitMessage[key] 
-                   
+        key = Constants.INSTANCE+str(request.instance)
+        commitElement = self._wait_for_key(self.classicCommitMessage, key)
 
-                    #message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement["sign"], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ClassicCommitReply(id=Constants.ID, type=Constants.COMMIT, instance=commitElement[Constants.INSTANCE], list=commitElement["list"])  
+        #message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement["sign"], type = request.message.type, id=Constants.ID)
+        return helloworld_pb2.ClassicCommitReply(id=Constants.ID, type=Constants.COMMIT, instance=commitElement[Constants.INSTANCE], list=commitElement["list"])  
      
     
     def _broadcast_certproposal(self, inst: int, proposer: str, value: str, proof: str):
@@ -361,7 +338,6 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
            key = Constants.INSTANCE+str(request.instance)
            if key not in self.recommedationMessage:
                self.recommedationMessage[key] = {Constants.ID:request.id,"recomID":request.recomID,Constants.PROOF:request.proof,Constants.VALUE:request.value}
-               self._notify()
                return helloworld_pb2.RECOReply(id=Constants.ID, type="Recommend", instance=request.instance,recomID=request.recomID,proof= request.proof,value=request.value)
 
         #self.recommendationCount += 1
@@ -411,12 +387,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                  
 
 
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.classicPreProcessMessage:
-                    preProcessElement = self.classicPreProcessMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preProcessElement[Constants.VALUE], justification = preProcessElement[Constants.JUSTIFICATION],  sign = preProcessElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)
+            key = Constants.INSTANCE+str(request.message.instance)
+            preProcessElement = self._wait_for_key(self.classicPreProcessMessage, key)
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preProcessElement[Constants.VALUE], justification = preProcessElement[Constants.JUSTIFICATION],  sign = preProcessElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
 
             
            
@@ -431,12 +405,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                     return helloworld_pb2.ABBAReply(message=message)
                 
             
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.classicPreVoteMessage:
-                    preVoteElement = self.classicPreVoteMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)  
+            key = Constants.INSTANCE+str(request.message.instance)
+            preVoteElement = self._wait_for_key(self.classicPreVoteMessage, key)
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
                 
 
         if request.message.type == Constants.MAINVOTE:
@@ -450,12 +422,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
 
             
 
-             while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.classicMainVoteMessage:
-                    mainVoteElement = self.classicMainVoteMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = mainVoteElement[Constants.VALUE], justification = mainVoteElement[Constants.JUSTIFICATION],  sign = mainVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)   
+             key = Constants.INSTANCE+str(request.message.instance)
+             mainVoteElement = self._wait_for_key(self.classicMainVoteMessage, key)
+             message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = mainVoteElement[Constants.VALUE], justification = mainVoteElement[Constants.JUSTIFICATION],  sign = mainVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+             return helloworld_pb2.ABBAReply(message=message)
                 
         if request.message.type == Constants.DECISION:
 
@@ -479,12 +449,11 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                      return helloworld_pb2.ABBAReply(message=message)
                  
 
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.classicCoinMessage:
-                    self.classicCoinMessage[key] = {Constants.JUSTIFICATION:request.message.justification,Constants.TYPE:request.message.type}
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = request.message.value, justification = self.classicCoinMessage[key][Constants.JUSTIFICATION],  sign = "sg", type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)
+            key = Constants.INSTANCE+str(request.message.instance)
+            self._wait_for_key(self.classicCoinMessage, key)
+            self.classicCoinMessage[key] = {Constants.JUSTIFICATION:request.message.justification,Constants.TYPE:request.message.type}
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = request.message.value, justification = self.classicCoinMessage[key][Constants.JUSTIFICATION],  sign = "sg", type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
 
       
 
@@ -519,12 +488,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                  
 
 
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.preProcessMessage:
-                    preProcessElement = self.preProcessMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preProcessElement[Constants.VALUE], justification = preProcessElement[Constants.JUSTIFICATION],  sign = preProcessElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)
+            key = Constants.INSTANCE+str(request.message.instance)
+            preProcessElement = self._wait_for_key(self.preProcessMessage, key)
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preProcessElement[Constants.VALUE], justification = preProcessElement[Constants.JUSTIFICATION],  sign = preProcessElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
 
             
            
@@ -539,12 +506,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                     return helloworld_pb2.ABBAReply(message=message)
                 
             
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.preVoteMessage:
-                    preVoteElement = self.preVoteMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)  
+            key = Constants.INSTANCE+str(request.message.instance)
+            preVoteElement = self._wait_for_key(self.preVoteMessage, key)
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = preVoteElement[Constants.VALUE], justification = preVoteElement[Constants.JUSTIFICATION],  sign = preVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
                 
 
         if request.message.type == Constants.MAINVOTE:
@@ -558,12 +523,10 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
 
             
 
-             while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.mainVoteMessage:
-                    mainVoteElement = self.mainVoteMessage[key] 
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = mainVoteElement[Constants.VALUE], justification = mainVoteElement[Constants.JUSTIFICATION],  sign = mainVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)   
+             key = Constants.INSTANCE+str(request.message.instance)
+             mainVoteElement = self._wait_for_key(self.mainVoteMessage, key)
+             message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = mainVoteElement[Constants.VALUE], justification = mainVoteElement[Constants.JUSTIFICATION],  sign = mainVoteElement[Constants.SIGN], type = request.message.type, id=Constants.ID)
+             return helloworld_pb2.ABBAReply(message=message)
                 
         if request.message.type == Constants.DECISION:
 
@@ -587,12 +550,11 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
                      return helloworld_pb2.ABBAReply(message=message)
                  
 
-            while True:
-                key = Constants.INSTANCE+str(request.message.instance)
-                if key in self.coinMessage:
-                    self.coinMessage[key] = {Constants.JUSTIFICATION:request.message.justification,Constants.TYPE:request.message.type}
-                    message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = request.message.value, justification = self.coinMessage[key][Constants.JUSTIFICATION],  sign = "sg", type = request.message.type, id=Constants.ID)
-                    return helloworld_pb2.ABBAReply(message=message)
+            key = Constants.INSTANCE+str(request.message.instance)
+            self._wait_for_key(self.coinMessage, key)
+            self.coinMessage[key] = {Constants.JUSTIFICATION:request.message.justification,Constants.TYPE:request.message.type}
+            message = helloworld_pb2.messageABBA(instance=request.message.instance, round = request.message.round, value = request.message.value, justification = self.coinMessage[key][Constants.JUSTIFICATION],  sign = "sg", type = request.message.type, id=Constants.ID)
+            return helloworld_pb2.ABBAReply(message=message)
 
             
 
@@ -609,8 +571,9 @@ def serve():
 
 async def serve() -> None:
     port = str(Constants.PORT)
-    server = grpc.aio.server()
-    helloworld_pb2_grpc.add_GreeterServicer_to_server(Greeter(), server)
+    # handlers are sync and may block in KeyedWaiters.wait(): run them on threads, not the loop
+    server = grpc.aio.server(migration_thread_pool=futures.ThreadPoolExecutor(max_workers=64))
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(Greeter(node_id=Constants.ID, port=Constants.PORT), server)
     #listen_addr = "[::]:50053"
     server.add_insecure_port("[::]:" + port)
     #server.add_insecure_port(listen_addr)
@@ -0,0 +1,41 @@
+# src/keyed_waiters.py
+import threading
+
+class KeyedWaiters:
+    """
+    A dict whose readers can block until a key is written. Each waiter parks
+    on its key's threading.Event and is woken only by the write of that key,
+    so waiting costs no CPU and no polling timeout. greeter_server_refactored's
+    aio serve() runs its sync handlers on a migration thread pool, so blocking
+    threads is all it needs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._events = {}        # key -> threading.Event
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._values
+
+    def __getitem__(self, key):
+        with self._lock:
+            return self._values[key]
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._values[key] = value
+            event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+    def wait(self, key, timeout=None):
+        """Block the calling thread until key is written; -> value (None on timeout)."""
+        with self._lock:
+            if key in self._values:
+                return self._values[key]
+            event = self._events.setdefault(key, threading.Event())
+        event.wait(timeout)
+        with self._lock:
+            return self._values.get(key)
@@ -0,0 +1,115 @@
+# src/keys.py
+"""
+Per-node key material: Schnorr keys for the "schnorr" certificate backend
+and threshold-coin key shares for COIN_BACKEND="threshold".
+
+With Constants.KEY_DIR set, keys come from files a trusted dealer wrote
+once, before the nodes start:
+
+  python -m src.keys --n 4 --out keys
+
+  keys/public.json      every node's public keys (give to all nodes)
+  keys/<node_id>.json   that node's secret keys (give only to that node)
+
+With KEY_DIR empty, every key is derived from the public Constants.KEY_SEED,
+so anyone can recompute every secret: an insecure setup for local clusters,
+tests and benchmarks only.
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
+
+import argparse
+import functools
+import json
+import secrets
+
+from config import constants as Constants
+from . import schnorr
+from . import tcoin
+
+def _key_dir() -> str:
+    return getattr(Constants, "KEY_DIR", "")
+
+def _seed() -> str:
+    return getattr(Constants, "KEY_SEED", "async-bft-suite")
+
+@functools.lru_cache(maxsize=None)
+def _load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+def _public(key_dir: str) -> dict:
+    return _load(os.path.join(key_dir, "public.json"))
+
+def _secret(key_dir: str, node_id: str) -> dict:
+    return _load(os.path.join(key_dir, f"{node_id}.json"))
+
+def schnorr_secret(node_id: str) -> int:
+    key_dir = _key_dir()
+    if not key_dir:
+        return schnorr.secret_key(_seed(), node_id)
+    return int(_secret(key_dir, node_id)["schnorr"], 16)
+
+@functools.lru_cache(maxsize=None)
+def _schnorr_public(key_dir: str, seed: str, node_id: str):
+    if not key_dir:
+        return schnorr.public_key(seed, node_id)
+    pk = _public(key_dir)["schnorr"].get(node_id)
+    return schnorr.decode_point(bytes.fromhex(pk)) if pk else None
+
+def schnorr_public(node_id: str):
+    """Public key of node_id, None if the dealer issued it none."""
+    return _schnorr_public(_key_dir(), _seed(), node_id)
+
+def tcoin_secret(node_id: str, index: int, n: int, t: int) -> int:
+    """Threshold-coin key share x_i of node_id (Shamir index `index`)."""
+    key_dir = _key_dir()
+    if not key_dir:
+        return tcoin.keyring(_seed(), n, t)[0][index]
+    return int(_secret(key_dir, node_id)["tcoin"], 16)
+
+@functools.lru_cache(maxsize=None)
+def _tcoin_public(key_dir: str, seed: str, n: int, t: int):
+    if not key_dir:
+        return tcoin.keyring(seed, n, t)[1]
+    dealt = _public(key_dir)["tcoin"]
+    if dealt["t"] != t or len(dealt["vk"]) != n:
+        raise ValueError(f"{key_dir}: threshold coin dealt for n={len(dealt['vk'])} t={dealt['t']}, need n={n} t={t}")
+    return [schnorr.decode_point(bytes.fromhex(vk)) for vk in dealt["vk"]]
+
+def tcoin_public(n: int, t: int):
+    """[VK_i] of the threshold coin, by Shamir index."""
+    return _tcoin_public(_key_dir(), _seed(), n, t)
+
+def _write(path: str, data: dict, private: bool = False):
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600 if private else 0o644)
+    with os.fdopen(fd, "w") as f:
+        json.dump(data, f, indent=1)
+
+def deal(node_ids, out: str, t: int):
+    """
+    Trusted dealer: fresh random keys for node_ids (in Shamir index order),
+    written to out/; the threshold coin needs t shares.
+    """
+    os.makedirs(out, exist_ok=True)
+    sks = {nid: 1 + secrets.randbelow(schnorr.N - 1) for nid in node_ids}
+    xs, vks = tcoin.deal(len(node_ids), t)
+    public = {
+        "schnorr": {nid: schnorr.encode_point(schnorr.mul(sk)).hex() for nid, sk in sks.items()},
+        "tcoin": {"t": t, "vk": [schnorr.encode_point(vk).hex() for vk in vks]},
+    }
+    _write(os.path.join(out, "public.json"), public)
+    for (nid, sk), x in zip(sks.items(), xs):
+        _write(os.path.join(out, f"{nid}.json"), {"schnorr": f"{sk:064x}", "tcoin": f"{x:064x}"}, private=True)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=getattr(Constants, "N", len(Constants.PORTLIST)))
+    ap.add_argument("--out", default="keys")
+    args = ap.parse_args()
+    f = min(getattr(Constants, "FAULTY_NODES", 1), (args.n - 1) // 3)
+    deal([f"id{i}" for i in range(1, args.n + 1)], args.out, f + 1)
+    print(f"wrote {args.out}/public.json and {args.n} secret key files (id1..id{args.n})", flush=True)
+
+if __name__ == "__main__":
+    main()
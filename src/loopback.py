@@ -0,0 +1,251 @@
+# src/loopback.py
+"""
+In-process cluster: N NodeContext + Greeter pairs that talk through a
+LoopbackNetwork instead of gRPC, with configurable delay, jitter
+(reordering) and drop. The protocol code is unchanged: transport.get_stub
+hands out LoopbackStubs and transport.send skips the outboxes whenever
+ctx.loopback is set.
+
+  python -m src.loopback --n 4 --instances 500 --delay 0.0005 --jitter 0.001 --quiet
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
+
+import argparse
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import Future
+
+from proto import helloworld_pb2
+from config import constants as Constants
+
+from .context import NodeContext
+from . import server
+
+class _Method:
+    def __init__(self, net, src: int, port: int, method: str):
+        self.net, self.src, self.port, self.method = net, src, port, method
+
+    def future(self, req, timeout=None):
+        return self.net.send(self.src, self.port, self.method, req)
+
+    def __call__(self, req, timeout=None):
+        return self.future(req).result(timeout)
+
+class LoopbackStub:
+    """Stands in for a GreeterStub: stub.ABBA(req) blocks, stub.ABBA.future(req) does not."""
+
+    def __init__(self, net, src: int, port: int):
+        self.net, self.src, self.port = net, src, port
+
+    def __getattr__(self, method: str):
+        return _Method(self.net, self.src, self.port, method)
+
+class LoopbackNetwork:
+    """
+    Delivers requests to the Greeter attached at the destination port after
+    delay_s + uniform(0, jitter_s). With fifo=True every (src, dst) link keeps
+    send order however large the jitter; otherwise jitter reorders. A message
+    to another node is lost with probability `drop` (its future fails, as a
+    gRPC deadline would). Requests are serialized and parsed on the way, so
+    receivers never share objects with the sender and wire cost is paid.
+
+    One scheduler thread delivers everything that is due; the ABBA votes among
+    them go to each node's actor as one batch, like Node.SendBatch.
+    """
+
+    def __init__(self, delay_s: float = 0.0, jitter_s: float = 0.0, drop: float = 0.0,
+                 fifo: bool = False, seed: int = None):
+        self.delay_s = delay_s
+        self.jitter_s = jitter_s
+        self.drop = drop
+        self.fifo = fifo
+        self.greeters = {}           # port -> Greeter
+        self.sent = 0
+        self.dropped = 0
+        self.delivered = 0
+
+        self._rng = random.Random(seed)
+        self._heap = []              # (due, seq, port, method, req, future)
+        self._seq = itertools.count()
+        self._last = {}              # (src, port) -> last due time (fifo links)
+        self._closed = False
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="loopback", daemon=True)
+        self._thread.start()
+
+    def attach(self, port: int, greeter):
+        self.greeters[port] = greeter
+
+    def stub(self, src: int, port: int) -> LoopbackStub:
+        return LoopbackStub(self, src, port)
+
+    def send(self, src: int, port: int, method: str, req) -> Future:
+        fut = Future()
+        req = type(req).FromString(req.SerializeToString())
+        with self._cv:
+            self.sent += 1
+            lost = src != port and self.drop > 0 and self._rng.random() < self.drop
+            if lost:
+                self.dropped += 1
+            else:
+                due = time.monotonic() + self.delay_s + (self._rng.uniform(0, self.jitter_s) if self.jitter_s else 0.0)
+                if self.fifo:
+                    due = max(due, self._last.get((src, port), 0.0))
+                    self._last[(src, port)] = due
+                heapq.heappush(self._heap, (due, next(self._seq), port, method, req, fut))
+                self._cv.notify()
+        if lost:
+            fut.set_exception(ConnectionError(f"loopback: {method} to {port} dropped"))
+        return fut
+
+    def close(self):
+        """Stop the scheduler thread; messages still in flight are never delivered."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while True:
+                    now = time.monotonic()
+                    if self._closed:
+                        return
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._cv.wait(self._heap[0][0] - now if self._heap else None)
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+                self.delivered += len(due)
+            self._deliver(due)
+
+    def _deliver(self, due):
+        votes = {}                   # port -> [vote]
+        for _, _, port, method, req, fut in due:
+            greeter = self.greeters.get(port)
+            try:
+                if greeter is None:
+                    raise ConnectionError(f"loopback: nothing attached at {port}")
+                if method == "ABBA":
+                    votes.setdefault(port, []).append(greeter._abba_vote(req.message))
+                    reply = helloworld_pb2.ABBAReply(message=req.message)
+                else:
+                    reply = getattr(greeter, method)(req, None)
+            except Exception as e:
+                fut.set_exception(e)
+                continue
+            fut.set_result(reply)
+        for port, group in votes.items():
+            self.greeters[port].submit_abba(group)
+
+class Cluster:
+    """
+    n nodes in this process on one LoopbackNetwork. Ports are only addresses
+    here, so Constants.PORTLIST is extended when n exceeds it; close() stops
+    every node's threads and puts Constants.N and PORTLIST back.
+    """
+
+    def __init__(self, n: int = None, network: LoopbackNetwork = None, **net_kwargs):
+        self._saved = {k: getattr(Constants, k) for k in ("N", "PORTLIST") if hasattr(Constants, k)}
+        n = n or getattr(Constants, "N", len(Constants.PORTLIST))
+        if n > len(Constants.PORTLIST):
+            Constants.PORTLIST = [Constants.PORTLIST[0] + i for i in range(n)]
+        Constants.N = n
+        self._own_net = network is None
+        self.net = network or LoopbackNetwork(**net_kwargs)
+        self.delivered = {}          # inst -> {node_id: value}
+        self._cv = threading.Condition()
+
+        self.greeters = []
+        for i, port in enumerate(Constants.PORTLIST[:n]):
+            ctx = NodeContext(node_id=f"id{i + 1}", port=port, n=n)
+            ctx.init_quorum()
+            ctx.loopback = self.net
+            greeter = server.Greeter(ctx)
+            ctx.pipeline.deliver = self._tap(ctx, ctx.pipeline.deliver)
+            self.net.attach(port, greeter)
+            self.greeters.append(greeter)
+
+    def _tap(self, ctx, deliver):
+        def on_deliver(inst, result):
+            deliver(inst, result)
+            with self._cv:
+                self.delivered.setdefault(inst, {})[ctx.node_id] = result["value"] if result else None
+                self._cv.notify_all()
+        return on_deliver
+
+    def propose(self, inst: int, value):
+        """
+        Client input for inst at every node (blocks while a node's pipeline
+        window is full, retrying when admission times out). value is one
+        string for all nodes, or a callable node_id -> that node's own proposal.
+        """
+        for greeter in self.greeters:
+            v = value(greeter.ctx.node_id) if callable(value) else value
+            req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=v)
+            while greeter.Propose(req, None).yes == "busy":
+                pass
+
+    def wait_delivered(self, inst: int, timeout: float = None) -> bool:
+        """True once every node delivered inst."""
+        with self._cv:
+            return self._cv.wait_for(lambda: len(self.delivered.get(inst, ())) == len(self.greeters), timeout)
+
+    def disagreements(self) -> dict:
+        """inst -> {node_id: value} for every instance where nodes delivered different values."""
+        with self._cv:
+            return {k: dict(v) for k, v in self.delivered.items() if len(set(v.values())) > 1}
+
+    def close(self):
+        for greeter in self.greeters:
+            greeter.close()
+        if self._own_net:
+            self.net.close()
+        for k, v in self._saved.items():
+            setattr(Constants, k, v)
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=getattr(Constants, "N", 4))
+    ap.add_argument("--instances", type=int, default=100)
+    ap.add_argument("--delay", type=float, default=0.0, help="one-way delay (s)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra uniform delay (s); reorders unless --fifo")
+    ap.add_argument("--drop", type=float, default=0.0, help="message loss probability")
+    ap.add_argument("--fifo", action="store_true", help="keep per-link order")
+    ap.add_argument("--seed", type=int)
+    ap.add_argument("--timeout", type=float, default=60.0)
+    ap.add_argument("--quiet", action="store_true", help="silence per-message node logs")
+    args = ap.parse_args()
+
+    out = sys.stdout
+    if args.quiet:
+        sys.stdout = open(os.devnull, "w")
+
+    cluster = Cluster(args.n, delay_s=args.delay, jitter_s=args.jitter, drop=args.drop, fifo=args.fifo, seed=args.seed)
+    t0 = time.perf_counter()
+    # every node proposes its own value, so agreement is actually exercised;
+    # proposing blocks on full pipeline windows; with drops an instance may never finish
+    feed = lambda: [cluster.propose(k, lambda node, k=k: f"v{k}-{node}") for k in range(1, args.instances + 1)]
+    threading.Thread(target=feed, name="client", daemon=True).start()
+    ok = cluster.wait_delivered(args.instances, timeout=args.timeout)
+    dt = time.perf_counter() - t0
+
+    done = sum(len(v) == args.n for v in cluster.delivered.values())
+    # instances where two nodes delivered different values: an agreement violation
+    disagree = cluster.disagreements()
+    print(f"n={args.n} delivered={done}/{args.instances} disagree={len(disagree)} in {dt:.2f}s "
+          f"({done / dt:.0f} inst/s) msgs sent={cluster.net.sent} dropped={cluster.net.dropped}"
+          + ("" if ok else " TIMEOUT"), file=out, flush=True)
+    for inst in sorted(disagree)[:5]:
+        print(f"  inst={inst} DISAGREE {disagree[inst]}", file=out, flush=True)
+    cluster.close()
+    sys.exit(0 if ok and not disagree else 1)
+
+if __name__ == "__main__":
+    main()
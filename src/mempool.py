@@ -0,0 +1,148 @@
+# src/mempool.py
+import json
+import threading
+
+from config import constants as Constants
+from . import pruning
+
+def encode_batch(txs) -> str:
+    return json.dumps(txs, separators=(",", ":"))
+
+def decode_batch(value: str):
+    """Decided VCBC value -> list of txs ([] for plain, non-batch proposals)."""
+    try:
+        txs = json.loads(value)
+    except (TypeError, ValueError):
+        return []
+    return txs if isinstance(txs, list) else []
+
+def is_batch(value: str) -> bool:
+    try:
+        return isinstance(json.loads(value), list)
+    except (TypeError, ValueError):
+        return False
+
+class Mempool:
+    """
+    Node-local transaction pool in front of MVBA.
+
+    Client transactions accumulate until BATCH_SIZE of them are pending or
+    BATCH_TIMEOUT_S passes; the cut batch becomes this node's VCBC value for
+    the next free instance (admitted through ctx.pipeline, so a full window
+    backs up into the mempool, and MEMPOOL_MAX bounds that). When an instance
+    is delivered its batch is unpacked into per-tx results (inst, index);
+    our own txs that lost to another proposer's batch are re-queued.
+    A transaction is identified by its content.
+
+    Once active (Constants.MEMPOOL, or from the first TX or peer batch on) the node also
+    joins every instance a peer starts, with an empty batch if it has no
+    txs: an instance needs q proposals, so a TX sent to a single node
+    commits all the same. Whether an instance is still free is decided in
+    that instance's actor turn (_claim), where client proposals land too.
+    """
+
+    def __init__(self, ctx, propose, batch_size: int = None, timeout_s: float = None, max_pending: int = None):
+        self.ctx = ctx
+        self.propose = propose                # callable(inst, value)
+        self.batch_size = batch_size or getattr(Constants, "BATCH_SIZE", 1000)
+        self.timeout_s = timeout_s or getattr(Constants, "BATCH_TIMEOUT_S", 0.05)
+        self.max_pending = max_pending or getattr(Constants, "MEMPOOL_MAX", 100000)
+
+        self.next_inst = 1
+        self.active = getattr(Constants, "MEMPOOL", False)  # else stays out of the way until the first TX arrives
+        self.committed = {}                   # tx -> (inst, index)
+        self._pending = []                    # txs waiting for a batch
+        self._known = set()                   # pending or proposed, not yet committed
+        self._proposed = {}                   # inst -> txs we proposed there
+        self._joining = set()                 # insts peers started that we have no batch in yet
+        self._closed = False
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="batcher", daemon=True)
+        self._thread.start()
+
+    def add(self, tx: str) -> bool:
+        with self._cv:
+            if tx in self.committed or tx in self._known:
+                return True
+            if len(self._pending) >= self.max_pending:
+                return False
+            self._pending.append(tx)
+            self._known.add(tx)
+            self.active = True
+            if len(self._pending) >= self.batch_size:
+                self._cv.notify_all()
+            return True
+
+    def wait_committed(self, tx: str, timeout: float = None):
+        with self._cv:
+            self._cv.wait_for(lambda: tx in self.committed, timeout)
+            return self.committed.get(tx)
+
+    def on_peer_proposal(self, inst: int, value: str = None):
+        """A peer's VCBC for inst arrived (actor turn of inst); value is None when dispersed."""
+        with self._cv:
+            if not self.active and value is not None and is_batch(value):
+                self.active = True
+            if not self.active or inst < self.next_inst:
+                return
+            self._joining.add(inst)
+            self._cv.notify_all()
+
+    def _cut(self):
+        with self._cv:
+            self._cv.wait_for(lambda: len(self._pending) >= self.batch_size or self._joining or self._closed, self.timeout_s)
+            if self._closed:
+                return None, None
+            # drop re-queued txs that meanwhile got committed through another proposer
+            self._pending = [tx for tx in self._pending if tx not in self.committed]
+            inst = max(self.next_inst, self.ctx.low_watermark)
+            self._joining = {i for i in self._joining if i >= inst}
+            # an empty batch is only worth proposing if peers already started that instance (or a later one)
+            if not self._pending and not self._joining:
+                return None, None
+            txs = self._pending[: self.batch_size]
+            del self._pending[: self.batch_size]
+            self._proposed[inst] = txs
+            self.next_inst = inst + 1
+            return inst, txs
+
+    def close(self):
+        """Stop the batcher thread (pending txs are not proposed any more)."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        while not self._closed:
+            inst, txs = self._cut()
+            if inst is None:
+                continue
+            self.ctx.pipeline.admit(inst)
+            self.ctx.actor.submit(inst, self._claim, inst, txs)
+
+    def _claim(self, inst: int, txs):
+        """Actor turn of inst: propose txs there, unless a client proposal already took it (or it was pruned)."""
+        if Constants.INSTANCE + str(inst) in self.ctx.proposeMessage or pruning.is_stale(self.ctx, inst):
+            with self._cv:
+                self._proposed.pop(inst, None)
+                self._pending[:0] = txs
+                self._cv.notify_all()
+            return
+        print(f"[{self.ctx.node_id}] 📦 batch inst={inst} txs={len(txs)}", flush=True)
+        self.propose(inst, encode_batch(txs))
+
+    def on_deliver(self, inst: int, value):
+        txs = decode_batch(value) if value is not None else []
+        with self._cv:
+            for i, tx in enumerate(txs):
+                self.committed.setdefault(tx, (inst, i))
+                self._known.discard(tx)
+            lost = [tx for tx in self._proposed.pop(inst, []) if tx not in self.committed]
+            self._pending[:0] = lost
+            self._cv.notify_all()
+
+    def forget_below(self, inst: int):
+        with self._cv:
+            for tx in [tx for tx, (k, _) in self.committed.items() if k < inst]:
+                del self.committed[tx]
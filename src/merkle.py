@@ -0,0 +1,38 @@
+# src/merkle.py
+import hashlib
+
+def _h(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+def _levels(leaves):
+    level = [_h(b"\0" + leaf) for leaf in leaves]
+    levels = [level]
+    while len(level) > 1:
+        if len(level) % 2:
+            level = level + [level[-1]]
+        level = [_h(b"\1" + level[i] + level[i + 1]) for i in range(0, len(level), 2)]
+        levels.append(level)
+    return levels
+
+def root(leaves) -> str:
+    return _levels(leaves)[-1][0].hex()
+
+def tree(leaves):
+    """-> (root hex, [branch for leaf i]); each branch lists sibling hashes bottom-up."""
+    levels = _levels(leaves)
+    branches = []
+    for i in range(len(leaves)):
+        branch, j = [], i
+        for level in levels[:-1]:
+            sib = j ^ 1
+            branch.append(level[sib] if sib < len(level) else level[j])
+            j //= 2
+        branches.append(branch)
+    return levels[-1][0].hex(), branches
+
+def verify(root_hex: str, index: int, leaf: bytes, branch) -> bool:
+    node, j = _h(b"\0" + leaf), index
+    for sib in branch:
+        node = _h(b"\1" + node + sib) if j % 2 == 0 else _h(b"\1" + sib + node)
+        j //= 2
+    return node.hex() == root_hex
@@ -0,0 +1,207 @@
+# src/metrics.py
+"""
+Per-instance phase timestamps aggregated into histograms.
+
+Every instance passes (some of) these phases, marked where they happen:
+
+  propose          local input stored                    (server._start_instance)
+  vcbc_cert        my VCBC certificate formed, broadcast (vcbc_cert)
+  certprop_quorum  q CERTPROPOSALs, BITVEC broadcast     (bitvec)
+  support          q BITVECs, support set ready          (bitvec)
+  abba_start       MVBA runs its first ABBA              (mvba.try_start_mvba)
+  abba_decide      ABBA settled the proposer index       (mvba)
+  mvba_decide      MVBA value final                      (mvba)
+
+bft_phase_seconds{phase=X} observes the time from the latest earlier phase
+this node marked to X; bft_instance_seconds observes first mark ->
+mvba_decide. ABBA rounds to decide and coin waits (coin needed after a
+non-unanimous MAINVOTE quorum -> coin known; 0 when a piggybacked coin was
+already there) get their own histograms.
+
+Exposed as Prometheus text (GET /metrics) and JSON (GET /metrics.json) by
+serve_http(), or written to a file every interval by start_dump().
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PHASES = ("propose", "vcbc_cert", "certprop_quorum", "support", "abba_start", "abba_decide", "mvba_decide")
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+ROUND_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10, 15, 20)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)   # last slot: above the largest bucket
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float):
+        i = 0
+        while i < len(self.buckets) and v > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.sum += v
+        self.count += 1
+
+    def prometheus(self, name: str, labels: str) -> list:
+        lines, acc = [], 0
+        for le, c in zip(self.buckets, self.counts):
+            acc += c
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {acc}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+    def to_dict(self) -> dict:
+        return {"buckets": dict(zip([str(b) for b in self.buckets] + ["+Inf"], self.counts)),
+                "sum": self.sum, "count": self.count}
+
+class Metrics:
+    """Thread-safe: marks come from every actor shard. `clock` is virtual time under the simulator."""
+
+    def __init__(self, node_id: str, clock=time.monotonic):
+        self.node_id = node_id
+        self.clock = clock
+        self.marks = {}                # inst -> {phase: t}
+        self.phase = {p: Histogram(LATENCY_BUCKETS) for p in PHASES[1:]}
+        self.instance = Histogram(LATENCY_BUCKETS)
+        self.rounds = Histogram(ROUND_BUCKETS)
+        self.coin_wait = Histogram(LATENCY_BUCKETS)
+        self._coin = {}                # ((inst, idx), rnd) -> {"needed": t, "ready": t}
+        self._lock = threading.Lock()
+
+    def mark(self, inst: int, phase: str):
+        with self._lock:
+            seen = self.marks.setdefault(inst, {})
+            if phase in seen:
+                return
+            now = self.clock()
+            earlier = [seen[p] for p in PHASES[: PHASES.index(phase)] if p in seen]
+            seen[phase] = now
+            if earlier and phase in self.phase:
+                self.phase[phase].observe(now - max(earlier))
+            if phase == "mvba_decide":
+                self.instance.observe(now - min(seen.values()))
+
+    def decided_in(self, rnd: int):
+        with self._lock:
+            self.rounds.observe(rnd)
+
+    def _coin_event(self, aid, rnd: int, what: str):
+        with self._lock:
+            ev = self._coin.setdefault((aid, rnd), {})
+            if what in ev:
+                return
+            ev[what] = self.clock()
+            if len(ev) == 2:
+                self.coin_wait.observe(max(0.0, ev["ready"] - ev["needed"]))
+
+    def coin_needed(self, aid, rnd: int):
+        self._coin_event(aid, rnd, "needed")
+
+    def coin_ready(self, aid, rnd: int):
+        self._coin_event(aid, rnd, "ready")
+
+    def forget_below(self, inst: int):
+        with self._lock:
+            for k in [k for k in self.marks if k < inst]:
+                del self.marks[k]
+            for k in [k for k in self._coin if k[0][0] < inst]:
+                del self._coin[k]
+
+    def prometheus(self) -> str:
+        node = f'node="{self.node_id}"'
+        with self._lock:
+            out = ["# HELP bft_phase_seconds Time from the previous phase to this one, per instance",
+                   "# TYPE bft_phase_seconds histogram"]
+            for p, h in self.phase.items():
+                out += h.prometheus("bft_phase_seconds", f'{node},phase="{p}"')
+            out += ["# HELP bft_instance_seconds First phase to MVBA decide, per instance",
+                    "# TYPE bft_instance_seconds histogram"]
+            out += self.instance.prometheus("bft_instance_seconds", node)
+            out += ["# HELP bft_abba_rounds ABBA rounds to decide",
+                    "# TYPE bft_abba_rounds histogram"]
+            out += self.rounds.prometheus("bft_abba_rounds", node)
+            out += ["# HELP bft_coin_wait_seconds Coin needed -> coin known",
+                    "# TYPE bft_coin_wait_seconds histogram"]
+            out += self.coin_wait.prometheus("bft_coin_wait_seconds", node)
+            out += ["# HELP bft_instances_tracked Instances with phase timestamps held",
+                    "# TYPE bft_instances_tracked gauge",
+                    f"bft_instances_tracked{{{node}}} {len(self.marks)}"]
+        return "\n".join(out) + "\n"
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "node": self.node_id,
+                "phase_seconds": {p: h.to_dict() for p, h in self.phase.items()},
+                "instance_seconds": self.instance.to_dict(),
+                "abba_rounds": self.rounds.to_dict(),
+                "coin_wait_seconds": self.coin_wait.to_dict(),
+                "instances_tracked": len(self.marks),
+            }
+
+# ---- call sites: no-ops for contexts without metrics
+
+def mark(ctx, inst: int, phase: str):
+    if ctx.metrics is not None:
+        ctx.metrics.mark(inst, phase)
+
+def decided_in(ctx, rnd: int):
+    if ctx.metrics is not None:
+        ctx.metrics.decided_in(rnd)
+
+def coin_needed(ctx, aid, rnd: int):
+    if ctx.metrics is not None:
+        ctx.metrics.coin_needed(aid, rnd)
+
+def coin_ready(ctx, aid, rnd: int):
+    if ctx.metrics is not None:
+        ctx.metrics.coin_ready(aid, rnd)
+
+# ---- exporters
+
+def serve_http(ctx, port: int, host: str = "127.0.0.1"):
+    """GET /metrics (Prometheus text) and /metrics.json on a background thread."""
+    m = ctx.metrics
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, ctype = m.prometheus().encode(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, ctype = json.dumps(m.snapshot()).encode(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[{ctx.node_id}] 📈 metrics on http://{host}:{port}/metrics", flush=True)
+    return httpd
+
+def start_dump(ctx, path: str, interval_s: float):
+    """Rewrite `path` with the JSON snapshot every interval_s."""
+    def loop():
+        while True:
+            time.sleep(interval_s)
+            with open(path + ".tmp", "w") as fh:
+                json.dump(ctx.metrics.snapshot(), fh)
+            os.replace(path + ".tmp", path)
+
+    t = threading.Thread(target=loop, name="metrics-dump", daemon=True)
+    t.start()
+    return t
@@ -0,0 +1,263 @@
+# src/microbench.py
+"""
+Microbenchmarks of protocol hot paths, pyperf style: every benchmark builds
+fresh state (a NodeContext on a NullNetwork), then feeds a synthetic message
+stream through the real handler and reports time per operation. Several
+repeats are taken and min / median are kept.
+
+Results can be saved as a baseline and later runs compared against it.
+Baselines are keyed by machine (host + python) because absolute numbers only
+compare on the same box:
+
+  python -m src.microbench --save                 # record bench/baselines/microbench.json
+  python -m src.microbench --compare              # exit 1 if a median regressed > --tolerance
+  python -m src.microbench -k abba --n 4 64
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
+
+import argparse
+import contextlib
+import json
+import platform
+import random
+import statistics
+import time
+from concurrent.futures import Future
+
+from proto import helloworld_pb2
+from config import constants as Constants
+
+from .context import NodeContext
+from .bitmask import Bitmask
+from .future_buffer import FutureBuffer
+from .loopback import LoopbackStub
+from . import abba
+from . import bitvec
+from . import coin
+from . import cost
+from . import mvba
+from . import vcbc_cert
+
+BASELINE = os.path.join("bench", "baselines", "microbench.json")
+
+class NullNetwork:
+    """ctx.loopback that swallows every send (each one completes at once with no reply)."""
+
+    def __init__(self):
+        self.sent = 0
+
+    def stub(self, src: int, port: int) -> LoopbackStub:
+        return LoopbackStub(self, src, port)
+
+    def send(self, src: int, port: int, method: str, req) -> Future:
+        self.sent += 1
+        fut = Future()
+        fut.set_result(None)
+        return fut
+
+class InlineActor:
+    shards = 1
+
+    def shard(self, inst: int) -> int:
+        return 0
+
+    def submit(self, inst: int, fn, /, *args, **kwargs):
+        fn(*args, **kwargs)
+
+    def close(self):
+        pass
+
+def make_ctx(n: int) -> NodeContext:
+    if len(Constants.PORTLIST) < n:
+        Constants.PORTLIST = [Constants.PORTLIST[0] + i for i in range(n)]
+    ctx = NodeContext(node_id="id1", port=Constants.PORTLIST[0], n=n)
+    ctx.init_quorum()
+    ctx.loopback = NullNetwork()
+    ctx.actor = InlineActor()
+    ctx.future = FutureBuffer()
+    coin.setup(ctx)
+    return ctx
+
+# ---- benchmarks: setup(n, loops) -> state; run(state) -> number of operations
+
+def _get_stub(ctx):
+    from . import transport
+    return lambda port: transport.get_stub(ctx, port)
+
+def abba_setup(n, loops):
+    ctx = make_ctx(n)
+    get_stub = _get_stub(ctx)
+    for inst in range(1, loops + 1):
+        abba.start(ctx, (inst, 0), input_bit=1, get_stub=get_stub)
+    # one round of unanimous votes from every node, per instance
+    stream = [dict(inst=inst, rnd=1, mtype=mtype, sender=pid, bit=1)
+              for inst in range(1, loops + 1)
+              for mtype in (Constants.PREPROCESS, Constants.PREVOTE, Constants.MAINVOTE)
+              for pid in ctx.node_ids]
+    return ctx, get_stub, stream
+
+def abba_run(state):
+    ctx, get_stub, stream = state
+    for m in stream:
+        abba.on_abba_message(ctx, get_stub, **m)
+    return len(stream)
+
+def support_setup(n, loops):
+    ctx = make_ctx(n)
+    rng = random.Random(n)
+    for inst in range(1, loops + 1):
+        ctx.bitvecs[inst] = {pid: Bitmask.from_indices(n, rng.sample(range(n), ctx.q))
+                             for pid in ctx.node_ids[: ctx.q]}
+    return ctx, loops
+
+def support_run(state):
+    ctx, loops = state
+    for inst in range(1, loops + 1):
+        bitvec.maybe_aggregate_support(ctx, inst)
+    return loops
+
+def cert_add_setup(n, loops):
+    return make_ctx(n), loops
+
+def cert_add_run(state):
+    ctx, loops = state
+    for inst in range(1, loops + 1):
+        for pid in ctx.node_ids:
+            vcbc_cert._cert_add(ctx, inst, "VCBC", vcbc_cert.VCBC_SEND, "d", pid)
+    return loops * ctx.n
+
+def coin_setup(n, loops):
+    ctx = make_ctx(n)
+    return ctx, [((inst, 0), pid, coin.make_share(pid, (inst, 0), 1)) for inst in range(1, loops + 1) for pid in ctx.node_ids]
+
+def coin_run(state):
+    ctx, shares = state
+    for aid, pid, share in shares:
+        coin.on_coin_share(ctx, aid, 1, pid, share)
+    return len(shares)
+
+def perm_run(state):
+    ctx, loops = state
+    for inst in range(1, loops + 1):
+        mvba.common_perm(ctx, inst)
+    return loops
+
+def _abba_msg(n):
+    return helloworld_pb2.ABBARequest(message=helloworld_pb2.messageABBA(
+        instance=123456, round=3, value=1, justification="proposer=id3", sign="coin=1", index=2,
+        type=Constants.MAINVOTE, id=f"id{n}"))
+
+def _pro_msg(n):
+    return helloworld_pb2.PRORequest(id=f"id{n}", type="CERTPROPOSAL", instance=123456,
+                                     proof="QC|signers=" + ",".join(f"id{i}" for i in range(1, n + 1)), value="ab" * 32)
+
+def pb_setup(make):
+    return lambda n, loops: (make(n), loops)
+
+def pb_encode_run(state):
+    msg, loops = state
+    for _ in range(loops):
+        msg.SerializeToString()
+    return loops
+
+def pb_decode_setup(make):
+    return lambda n, loops: (type(make(n)), make(n).SerializeToString(), loops)
+
+def pb_decode_run(state):
+    cls, wire, loops = state
+    for _ in range(loops):
+        cls.FromString(wire)
+    return loops
+
+# name -> (setup(n, loops), run(state)); names are what -k matches
+BENCHMARKS = {
+    "abba.on_abba_message": (abba_setup, abba_run),
+    "bitvec.maybe_aggregate_support": (support_setup, support_run),
+    "vcbc_cert._cert_add": (cert_add_setup, cert_add_run),
+    "coin.on_coin_share": (coin_setup, coin_run),
+    "mvba.common_perm": (cert_add_setup, perm_run),
+    "pb.messageABBA.encode": (pb_setup(_abba_msg), pb_encode_run),
+    "pb.messageABBA.decode": (pb_decode_setup(_abba_msg), pb_decode_run),
+    "pb.PRORequest.encode": (pb_setup(_pro_msg), pb_encode_run),
+    "pb.PRORequest.decode": (pb_decode_setup(_pro_msg), pb_decode_run),
+}
+
+def measure(setup, run, n: int, loops: int, repeat: int) -> dict:
+    per_op = []
+    for _ in range(repeat):
+        state = setup(n, loops)
+        t0 = time.perf_counter()
+        ops = run(state)
+        per_op.append((time.perf_counter() - t0) / ops)
+    return {"min_us": min(per_op) * 1e6, "median_us": statistics.median(per_op) * 1e6}
+
+def machine() -> str:
+    return f"{platform.node()}|{platform.python_implementation()}-{platform.python_version()}"
+
+def run_all(names, sizes, loops: int, repeat: int) -> dict:
+    results = {}
+    previous = cost.install(lambda seconds: None)   # modelled crypto costs are not hot-path work
+    try:
+        with open(os.devnull, "w") as null, contextlib.redirect_stdout(null):
+            for name in names:
+                setup, run = BENCHMARKS[name]
+                for n in sizes:
+                    results[f"{name}[n={n}]"] = measure(setup, run, n, loops, repeat)
+    finally:
+        cost.install(previous)
+    return results
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    ok = True
+    for key, res in results.items():
+        old = baseline.get(key)
+        if old is None:
+            print(f"{key:45s} {res['median_us']:10.2f} us   (no baseline)")
+            continue
+        change = res["median_us"] / old["median_us"] - 1
+        flag = "REGRESSION" if change > tolerance else ""
+        ok = ok and not flag
+        print(f"{key:45s} {res['median_us']:10.2f} us   {old['median_us']:10.2f} us   {change:+7.1%} {flag}")
+    return ok
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-k", default="", help="only benchmarks whose name contains this")
+    ap.add_argument("--n", type=int, nargs="+", default=[4, 16, 64], help="cluster sizes")
+    ap.add_argument("--loops", type=int, default=200, help="instances (or messages) per repeat")
+    ap.add_argument("--repeat", type=int, default=7)
+    ap.add_argument("--baseline", default=BASELINE, help="baseline file (keyed by machine)")
+    ap.add_argument("--save", action="store_true", help="store these results as this machine's baseline")
+    ap.add_argument("--compare", action="store_true", help="compare medians with this machine's baseline")
+    ap.add_argument("--tolerance", type=float, default=0.20, help="allowed relative slowdown of a median")
+    args = ap.parse_args()
+
+    names = [name for name in BENCHMARKS if args.k in name]
+    results = run_all(names, args.n, args.loops, args.repeat)
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as fh:
+            stored = json.load(fh)
+
+    ok = True
+    if args.compare:
+        base = stored.get(machine())
+        if base is None:
+            print(f"no baseline for {machine()} in {args.baseline}; run with --save first")
+        ok = compare(results, base or {}, args.tolerance)
+    else:
+        for key, res in results.items():
+            print(f"{key:45s} {res['median_us']:10.2f} us  (min {res['min_us']:.2f})")
+
+    if args.save:
+        stored[machine()] = results
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as fh:
+            json.dump(stored, fh, indent=1, sort_keys=True)
+        print(f"saved baseline for {machine()} to {args.baseline}")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,30 @@
 # src/mvba.py
+"""
+MVBA: agree on one certified proposal per instance.
+
+The nodes walk the instance's common permutation perm (common_perm) one
+index at a time and run ABBA (inst, idx) on "is perm[idx] the output?".
+A node's input is 1 only if it holds perm[idx]'s verified certificate.
+The first index decided 1 is the output; if all decide 0 the output is
+None. Which proposer wins therefore depends only on decided ABBA bits
+and the permutation, which every honest node shares.
+
+Picking the proposer from each node's own support set instead (the
+first version did) is not safe: when proposals differ, support sets
+built from different q-subsets of BITVECs differ too, and nodes deliver
+different values. A node that falls behind catches up from f+1 matching
+ABBA DECISIONs (abba._on_decision); a node that adopts a proposer whose
+certificate or payload it lacks fetches it (CERTFETCH / FETCH, resumed
+in vcbc_cert._resume_mvba). A node so far behind that peers pruned the
+instance adopts their logged output instead (catchup).
+"""
 import hashlib, random
 from config import constants as Constants
 from . import abba
 from . import transport
+from . import vcbc_cert
+from . import metrics
+from . import pruning
 
 def common_perm(ctx, inst: int):
     # shared deterministic permutation
@@ -14,15 +36,10 @@ def common_perm(ctx, inst: int):
     rng.shuffle(node_ids)
     return node_ids
 
-def _pivot_bit(ctx, inst: int, perm):
-    S = ctx.support_set.get(inst)
-    if S is None:
-        return None, None
-    pivot = perm[0]
-    idx = ctx.id_to_index.get(pivot)
-    if idx is None:
-        return None, None
-    return int(S[idx]), pivot
+def _input_bit(ctx, inst: int, pid: str) -> int:
+    # vote 1 only for a proposer whose certified proposal I hold: a 1 decision
+    # then always has an honest holder to fetch the certificate from
+    return int(pid in ctx.certified_props.get(inst, {}))
 
 def try_start_mvba(ctx, inst: int, get_stub):
     if inst in ctx.mvba_started:
@@ -30,47 +47,101 @@ def try_start_mvba(ctx, inst: int, get_stub):
     if inst not in ctx.support_ready:
         return
 
-    perm = common_perm(ctx, inst)
-    bit, pivot = _pivot_bit(ctx, inst, perm)
-    if bit is None:
-        print(f"[{ctx.node_id}] ⚠️ MVBA start blocked inst={inst}: missing S/pivot mapping", flush=True)
+    ctx.mvba_started.add(inst)
+    ctx.mvba_perm[inst] = common_perm(ctx, inst)
+    print(f"[{ctx.node_id}] 🚀 MVBA START inst={inst} perm={ctx.mvba_perm[inst]}", flush=True)
+    # marked here, not in abba.start: index 0 may already be decided by f+1 DECISIONs and never started
+    metrics.mark(ctx, inst, "abba_start")
+    _run_index(ctx, inst, 0)
+
+def _run_index(ctx, inst: int, idx: int):
+    """
+    One ABBA per position of the common permutation, in order: ABBA (inst, idx)
+    decides whether perm[idx] is the output. The choice rests on decided bits
+    and the permutation only, so every node adopts the same proposer.
+    """
+    perm = ctx.mvba_perm[inst]
+    if idx >= len(perm):
+        print(f"[{ctx.node_id}] ⚠️ MVBA inst={inst}: every proposer decided 0 -> no value", flush=True)
+        metrics.mark(ctx, inst, "abba_decide")
+        _finish(ctx, inst)
         return
 
-    ctx.mvba_started.add(inst)
-    ctx.mvba_perm[inst] = perm
-    ctx.mvba_pivot[inst] = pivot
+    ctx.mvba_index[inst] = idx
+    aid = (inst, idx)
+    if aid in ctx.abba_decided:
+        # learned from f+1 DECISIONs before this node got here
+        _on_index_decided(ctx, inst, idx, ctx.abba_decided[aid])
+        return
 
+    pid = perm[idx]
+    bit = _input_bit(ctx, inst, pid)
     get_stub = lambda port: transport.get_stub(ctx, port)
+    print(f"[{ctx.node_id}] 🚀 MVBA->ABA START inst={inst} idx={idx} proposer={pid} input_bit={bit}", flush=True)
+    abba.start(ctx, aid, input_bit=bit, get_stub=get_stub, justification=f"proposer={pid}")
 
-    print(f"[{ctx.node_id}] 🚀 MVBA->ABA START inst={inst} perm={perm} pivot={pivot} input_bit={bit}", flush=True)
-    abba.start(ctx, inst=inst, input_bit=bit, get_stub=get_stub, justification=f"pivot={pivot}")
-
-def _select_proposer(ctx, inst: int, decided_bit: int):
-    perm = ctx.mvba_perm.get(inst)
-    S = ctx.support_set.get(inst)
-    if perm is None or S is None:
-        return None
-
-    for pid in perm:
-        idx = ctx.id_to_index.get(pid)
-        if idx is None:
-            continue
-        if int(S[idx]) == int(decided_bit):
-            return pid
-    return None
-
-def on_aba_decide(ctx, inst: int, decided_bit: int):
-    proposer = _select_proposer(ctx, inst, decided_bit)
-    if proposer is None:
-        print(f"[{ctx.node_id}] ⚠️ MVBA finalize failed inst={inst}: no proposer matches bit={decided_bit}", flush=True)
+def on_aba_decide(ctx, aid, decided_bit: int):
+    inst, idx = aid
+    if inst in ctx.mvba_done or ctx.mvba_index.get(inst) != idx:
+        # not reached yet (_run_index picks the bit up from abba_decided) or already past it
         return
+    _on_index_decided(ctx, inst, idx, decided_bit)
 
-    chosen = ctx.certified_props.get(inst, {}).get(proposer)
-    print(f"[{ctx.node_id}] ✅ MVBA SELECT inst={inst} bit={decided_bit} proposer={proposer}", flush=True)
+def _on_index_decided(ctx, inst: int, idx: int, decided_bit: int):
+    if decided_bit:
+        metrics.mark(ctx, inst, "abba_decide")
+        _adopt(ctx, inst, idx)
+    else:
+        _run_index(ctx, inst, idx + 1)
+
+def _adopt(ctx, inst: int, idx: int):
+    proposer = ctx.mvba_perm[inst][idx]
+    print(f"[{ctx.node_id}] ✅ MVBA SELECT inst={inst} idx={idx} proposer={proposer}", flush=True)
 
+    # certified_props only holds proposals whose certificate verified
+    chosen = ctx.certified_props.get(inst, {}).get(proposer)
     if chosen is None:
-        print(f"[{ctx.node_id}] ⚠️ MVBA missing CERTPROPOSAL for proposer={proposer} inst={inst}", flush=True)
+        # an honest node voted 1, so it holds the certificate: fetch it and resume in vcbc_cert
+        ctx.mvba_waiting[inst] = idx
+        vcbc_cert.request_certproposal(ctx, inst, proposer)
+        return
+
+    if (inst, chosen["digest"]) in ctx.bad_dispersals:
+        # every honest node rebuilds the same non-codeword, so all of them move on from this index
+        print(f"[{ctx.node_id}] ❌ MVBA inst={inst} idx={idx} proposer={proposer}: inconsistent dispersal, trying the next proposer", flush=True)
+        ctx.mvba_waiting.pop(inst, None)
+        _run_index(ctx, inst, idx + 1)
+        return
+
+    if chosen["value"] is None:
+        # certified by digest only; q echoers hold the payload, so fetch it and finish in vcbc_cert.on_payload
+        chosen["value"] = ctx.payloads.get((inst, chosen["digest"]))
+    if chosen["value"] is None:
+        ctx.mvba_waiting[inst] = idx
+        vcbc_cert.request_payload(ctx, inst, chosen["digest"])
+        return
+
+    print(f"[{ctx.node_id}] 🏁 MVBA DECIDE inst={inst} value={chosen['value']} proposer={proposer}", flush=True)
+    _finish(ctx, inst, {"proposer": proposer, "value": chosen["value"], "proof": chosen["proof"]})
+
+def adopt(ctx, inst: int, result):
+    """Output learned from f+1 peers' decided logs (catchup): finish without running the ABBAs."""
+    if inst in ctx.mvba_done:
         return
+    metrics.mark(ctx, inst, "abba_decide")
+    _finish(ctx, inst, result)
 
-    ctx.mvba_decided[inst] = {"proposer": proposer, "value": chosen["value"], "proof": chosen["proof"]}
-    print(f"[{ctx.node_id}] 🏁 MVBA DECIDE inst={inst} value={chosen['value']} proposer={proposer}", flush=True)
\ No newline at end of file
+def _finish(ctx, inst: int, result=None):
+    ctx.mvba_waiting.pop(inst, None)
+    ctx.mvba_done.add(inst)
+    if result is not None:
+        ctx.mvba_decided[inst] = result
+    with ctx.gc_lock:
+        # outlives pruning, for peers that fall behind (catchup)
+        ctx.decided_log[inst] = result
+        while len(ctx.decided_log) > getattr(Constants, "DECIDED_LOG", 1024):
+            del ctx.decided_log[next(iter(ctx.decided_log))]
+    pruning.note_decided(ctx, ctx.node_id, inst)
+    metrics.mark(ctx, inst, "mvba_decide")
+    if ctx.mvba_on_decide is not None:
+        ctx.mvba_on_decide(inst, result)
@@ -0,0 +1,198 @@
+# src/outbox.py
+import asyncio
+import collections
+import threading
+import time
+
+from proto import bft_pb2
+from proto import helloworld_pb2
+from config import constants as Constants
+
+# Greeter method name -> request type carried in bft.Message.payload
+REQUEST_TYPES = {
+    "VCBC": helloworld_pb2.VCBCRequest,
+    "Propose": helloworld_pb2.PRORequest,
+    "ABBA": helloworld_pb2.ABBARequest,
+}
+
+def _instance_of(method: str, req) -> int:
+    if method == "VCBC":
+        return req.msg.instance
+    if method == "ABBA":
+        return req.message.instance
+    return req.instance
+
+def encode(ctx, method: str, req):
+    return bft_pb2.Message(
+        protocol_id="pmvba",
+        sender_id=ctx.id_to_index.get(ctx.node_id, -1),
+        instance_id=_instance_of(method, req),
+        msg_type=method,
+        payload=req.SerializeToString(),
+    )
+
+def linger(method: str) -> float:
+    """How long a message may wait in the outbox for company (ABBA votes get their own window)."""
+    if method == "ABBA":
+        return getattr(Constants, "ABBA_FLUSH_S", getattr(Constants, "OUTBOX_FLUSH_S", 0.0))
+    return getattr(Constants, "OUTBOX_FLUSH_S", 0.0)
+
+def record_send(ctx, port: int, ok: bool, count: int = 1, batches: int = 0):
+    """Add count messages (carried by batches SendBatch RPCs) to ctx's per-peer send counters."""
+    with ctx.send_stats_lock:
+        counters = ctx.send_ok if ok else ctx.send_failures
+        counters[port] = counters.get(port, 0) + count
+        if ok and batches:
+            ctx.batches_sent[port] = ctx.batches_sent.get(port, 0) + batches
+
+def _overflow(outbox, pending):
+    """Queue is at OUTBOX_MAX_PENDING (peer down or too slow): drop the oldest message."""
+    pending.popleft()
+    outbox.dropped += 1
+    record_send(outbox.ctx, outbox.port, ok=False)
+    if outbox.dropped & (outbox.dropped - 1) == 0:    # 1, 2, 4, ...: don't flood the log
+        print(f"[{outbox.ctx.node_id}] ⚠️ outbox to {outbox.port} full ({outbox.max_pending}), "
+              f"dropped {outbox.dropped} oldest message(s)", flush=True)
+
+def decode(message):
+    """bft.Message -> (method, request) or None for unknown types."""
+    req_type = REQUEST_TYPES.get(message.msg_type)
+    if req_type is None:
+        return None
+    return message.msg_type, req_type.FromString(message.payload)
+
+class PeerOutbox:
+    """
+    Outbound queue for one peer, drained by a background sender thread.
+    Everything pending when the sender wakes up is coalesced into a single
+    bft.MessageBatch, so producers never block on network I/O.
+    """
+
+    def __init__(self, ctx, port: int, send_batch):
+        self.ctx = ctx
+        self.port = port
+        self.send_batch = send_batch          # callable(port, MessageBatch)
+        self.max_batch = getattr(Constants, "OUTBOX_MAX_BATCH", 512)
+        self.max_pending = getattr(Constants, "OUTBOX_MAX_PENDING", 65536)
+        self.dropped = 0
+
+        self._pending = collections.deque()
+        self._deadline = float("inf")         # earliest flush time among pending messages
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"outbox-{port}", daemon=True)
+        self._thread.start()
+
+    def put(self, method: str, req):
+        msg = encode(self.ctx, method, req)
+        with self._cv:
+            if len(self._pending) >= self.max_pending:
+                _overflow(self, self._pending)
+            self._pending.append(msg)
+            self._deadline = min(self._deadline, time.monotonic() + linger(method))
+            self._cv.notify()
+
+    def _take(self):
+        with self._cv:
+            while True:
+                if not self._pending:
+                    self._cv.wait()
+                    continue
+                wait = self._deadline - time.monotonic()
+                if wait <= 0 or len(self._pending) >= self.max_batch:
+                    break
+                self._cv.wait(wait)   # let more messages pile up
+            batch = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+            if not self._pending:
+                self._deadline = float("inf")
+        return batch
+
+    def _run(self):
+        while True:
+            msgs = self._take()
+            try:
+                self.send_batch(self.port, bft_pb2.MessageBatch(messages=msgs))
+            except Exception as e:
+                record_send(self.ctx, self.port, ok=False, count=len(msgs))
+                print(f"[{self.ctx.node_id}] batch send failed to {self.port} ({len(msgs)} msgs): {e}", flush=True)
+                continue
+            record_send(self.ctx, self.port, ok=True, count=len(msgs), batches=1)
+
+def on_loop(loop, fn):
+    """Run fn on loop's thread: right away if this is it, else as soon as the loop gets to it."""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        fn()
+    else:
+        loop.call_soon_threadsafe(fn)
+
+class AioPeerOutbox:
+    """
+    asyncio flavour of PeerOutbox: same coalescing, but drained by a task on
+    ctx.loop and sent with an awaitable send_batch. Construction and put()
+    are safe from any thread (transport.get_outbox also runs on worker
+    threads); everything asyncio is created on the loop.
+    """
+
+    def __init__(self, ctx, port: int, send_batch):
+        self.ctx = ctx
+        self.port = port
+        self.send_batch = send_batch          # async callable(port, MessageBatch)
+        self.max_batch = getattr(Constants, "OUTBOX_MAX_BATCH", 512)
+        self.max_pending = getattr(Constants, "OUTBOX_MAX_PENDING", 65536)
+        self.dropped = 0
+
+        self._pending = collections.deque()
+        self._lock = threading.Lock()         # put() runs on any thread, _run() on the loop
+        self._deadline = float("inf")
+        self._wakeup = None
+        self._task = None
+        on_loop(ctx.loop, self._start)
+
+    def _start(self):
+        # on the loop; call_soon_threadsafe is FIFO, so this runs before any _arm from put()
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = self.ctx.loop.create_task(self._run())
+
+    def put(self, method: str, req):
+        msg = encode(self.ctx, method, req)
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                _overflow(self, self._pending)
+            self._pending.append(msg)
+        deadline = time.monotonic() + linger(method)
+        self.ctx.loop.call_soon_threadsafe(self._arm, deadline)
+
+    def _arm(self, deadline: float):
+        self._start()
+        self._deadline = min(self._deadline, deadline)
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # let more messages pile up until the earliest deadline (re-armed by put)
+            while self._pending and len(self._pending) < self.max_batch:
+                wait = self._deadline - time.monotonic()
+                if wait <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                    self._wakeup.clear()
+                except asyncio.TimeoutError:
+                    break
+            self._deadline = float("inf")
+            while self._pending:
+                with self._lock:
+                    msgs = [self._pending.popleft() for _ in range(min(len(self._pending), self.max_batch))]
+                try:
+                    await self.send_batch(self.port, bft_pb2.MessageBatch(messages=msgs))
+                except Exception as e:
+                    record_send(self.ctx, self.port, ok=False, count=len(msgs))
+                    print(f"[{self.ctx.node_id}] batch send failed to {self.port} ({len(msgs)} msgs): {e}", flush=True)
+                    continue
+                record_send(self.ctx, self.port, ok=True, count=len(msgs), batches=1)
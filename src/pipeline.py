@@ -0,0 +1,93 @@
+# src/pipeline.py
+import threading
+import time
+
+class Pipeline:
+    """
+    Bounded in-flight window over MVBA instances.
+
+    admit() lets a client proposal for inst start only once it falls inside
+    the sliding window [next_deliver, next_deliver + window); the caller
+    blocks until then (backpressure). Because the window is defined by
+    instance number, every node admits the same instances and the oldest
+    undelivered one is always running. complete() records a decision;
+    decisions are handed to `deliver(inst, result)` strictly in instance
+    order, so instance k+1 may finish first but is released only after k.
+    stalled() tells a watchdog when the oldest instance holds everything up.
+    """
+
+    def __init__(self, window: int, first_inst: int = 1, deliver=None, clock=time.monotonic):
+        self.window = window
+        self.next_deliver = first_inst
+        self.deliver = deliver
+        self.clock = clock           # virtual time under the simulator
+
+        self.done = {}               # decided, waiting for earlier instances
+        self.delivered = {}          # inst -> result (for wait_delivered)
+        self.admitting = 0           # callers blocked in admit()
+        self.highest_started = 0     # highest instance this node has input for
+        self.last_progress = clock() # last delivery, or when work arrived at an idle pipeline
+        self._cv = threading.Condition()
+
+    def _busy(self) -> bool:
+        return bool(self.done) or self.admitting > 0 or self.highest_started >= self.next_deliver
+
+    def admit(self, inst: int, timeout: float = None) -> bool:
+        """Wait until inst is inside the window; False if timeout ran out first."""
+        with self._cv:
+            if not self._busy():
+                self.last_progress = self.clock()
+            self.admitting += 1
+            try:
+                return self._cv.wait_for(lambda: inst < self.next_deliver + self.window, timeout)
+            finally:
+                self.admitting -= 1
+
+    def ahead(self, inst: int) -> bool:
+        """inst is past the window: this node will not run it before delivering more."""
+        return inst >= self.next_deliver + self.window
+
+    def started(self, inst: int):
+        """This node has input for inst (its VCBC is out)."""
+        with self._cv:
+            if not self._busy():
+                self.last_progress = self.clock()
+            self.highest_started = max(self.highest_started, inst)
+
+    def stalled(self, after_s: float):
+        """
+        The oldest undelivered instance if nothing was delivered for after_s
+        while work waits on it (instances started or decided here, blocked
+        admits), else None. An idle pipeline is not stalled.
+        """
+        with self._cv:
+            if not self._busy() or self.clock() - self.last_progress < after_s:
+                return None
+            return self.next_deliver
+
+    def complete(self, inst: int, result):
+        with self._cv:
+            if inst < self.next_deliver or inst in self.done:
+                return
+            self.done[inst] = result
+            while self.next_deliver in self.done:
+                k = self.next_deliver
+                res = self.done.pop(k)
+                self.delivered[k] = res
+                self.next_deliver += 1
+                self.last_progress = self.clock()
+                # under the lock so deliveries stay ordered across actor shards
+                if self.deliver is not None:
+                    self.deliver(k, res)
+            self._cv.notify_all()
+
+    def wait_delivered(self, inst: int, timeout: float = None):
+        """-> (delivered?, result)"""
+        with self._cv:
+            ok = self._cv.wait_for(lambda: inst in self.delivered, timeout)
+            return ok, self.delivered.get(inst)
+
+    def forget_below(self, inst: int):
+        with self._cv:
+            for k in [k for k in self.delivered if k < inst]:
+                del self.delivered[k]
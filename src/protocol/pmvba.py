@@ -78,6 +78,16 @@ class PMVBAProtocol:
             self.states[instance] = PmvbaState(instance=instance)
         return self.states[instance]
 
+    def prune_below(self, instance: int) -> int:
+        """
+        Forget every decided instance older than `instance`.
+        Returns how many states were dropped.
+        """
+        old = [i for i, st in self.states.items() if i < instance and st.decided]
+        for i in old:
+            del self.states[i]
+        return len(old)
+
     # ----------------------------
     # Public: start local proposal
     # ----------------------------
@@ -0,0 +1,141 @@
+# src/pruning.py
+import threading
+import time
+
+from config import constants as Constants
+
+# NodeContext containers keyed directly by inst
+INST_KEYED = (
+    "my_cert_sent", "certified_props",
+    "bitvec_sent", "bitvecs", "support_set", "support_ready",
+    "mvba_started", "mvba_perm", "mvba_index", "mvba_decided", "mvba_waiting", "mvba_done",
+    "abba_est", "catchup_votes",
+)
+
+# NodeContext containers keyed by tuples that start with inst, or with an
+# ABBA id (inst, idx)
+TUPLE_KEYED = (
+    "certs", "cert_shares", "vcbc_echoed", "payloads", "payload_requested",
+    "fragments", "fragments_recv", "bad_dispersals", "certprop_counted", "certprop_requested",
+    "abba_started", "abba_messages", "abba_decided", "abba_round", "abba_sent", "abba_coin",
+    "coin_shares", "coin_ready", "coin_sent", "coins", "coin_own", "coin_verifying", "coin_computing",
+)
+
+def _inst_of(key) -> int:
+    while isinstance(key, tuple):
+        key = key[0]
+    return key
+
+def is_stale(ctx, inst: int) -> bool:
+    """Late message for an instance that is already pruned: drop it unprocessed."""
+    return inst < ctx.low_watermark
+
+def note_decided(ctx, node_id: str, inst: int):
+    """
+    node_id decided inst. peer_decided only advances over contiguous
+    reports, so an instance decided out of order never lets the watermark
+    pass one that node has not decided yet.
+    """
+    with ctx.gc_lock:
+        upto = ctx.peer_decided.get(node_id, 0)
+        if inst <= upto:
+            return
+        ahead = ctx.peer_ahead.setdefault(node_id, set())
+        if len(ahead) >= getattr(Constants, "FUTURE_MAX_PER_SENDER", 1024):
+            return   # a node claiming far-ahead decisions costs bounded memory
+        ahead.add(inst)
+        while upto + 1 in ahead:
+            upto += 1
+            ahead.discard(upto)
+        ctx.peer_decided[node_id] = upto
+
+def next_watermark(ctx) -> int:
+    """
+    Keep the last RETAIN_DECIDED instances below the point that both this node
+    (contiguously) and at least q nodes (by their DECISION messages) have
+    decided; everything older can go.
+    """
+    with ctx.gc_lock:
+        while ctx.decided_upto + 1 in ctx.mvba_done:
+            ctx.decided_upto += 1
+
+        reported = sorted(ctx.peer_decided.values(), reverse=True)
+        if len(reported) < ctx.q:
+            return ctx.low_watermark
+
+        agreed = min(ctx.decided_upto, reported[ctx.q - 1])
+        keep = getattr(Constants, "RETAIN_DECIDED", 64)
+        return max(ctx.low_watermark, agreed - keep + 1)
+
+def _drop(container, keys) -> int:
+    for key in keys:
+        if isinstance(container, set):
+            container.discard(key)
+        else:
+            container.pop(key, None)
+    return len(keys)
+
+def prune_below(ctx, wm: int, shard: int = None) -> int:
+    """
+    Drop all per-instance state for inst < wm (only instances owned by actor
+    `shard`, if given). Returns number of entries removed.
+    """
+    mine = (lambda inst: inst < wm) if shard is None else (lambda inst: inst < wm and ctx.actor.shard(inst) == shard)
+    removed = 0
+    for name in INST_KEYED:
+        container = getattr(ctx, name)
+        removed += _drop(container, [k for k in list(container) if mine(k)])
+    for name in TUPLE_KEYED:
+        container = getattr(ctx, name)
+        removed += _drop(container, [k for k in list(container) if mine(_inst_of(k))])
+    prefix = Constants.INSTANCE
+    removed += _drop(ctx.proposeMessage, [k for k in list(ctx.proposeMessage) if mine(int(k[len(prefix):]))])
+    return removed
+
+def _prune_shard(ctx, wm: int, shard: int):
+    removed = prune_below(ctx, wm, shard)
+    if removed:
+        cache = ctx.verifier.cache.stats() if ctx.verifier is not None else {}
+        print(f"[{ctx.node_id}] 🧹 pruned instances < {wm} on shard {shard} ({removed} entries) cert_cache={cache}", flush=True)
+
+def maybe_prune(ctx):
+    """
+    Move the watermark and drop what lies below it. The per-instance dicts
+    belong to whichever actor shard owns the instance, so each shard prunes
+    its own instances in its own turn; the structures shared across
+    instances are thread-safe and are trimmed right here.
+    """
+    wm = next_watermark(ctx)
+    with ctx.gc_lock:
+        if wm <= ctx.low_watermark:
+            return
+        ctx.low_watermark = wm   # handlers start dropping late messages right away
+    for shard in range(ctx.actor.shards):
+        ctx.actor.submit(shard, _prune_shard, ctx, wm, shard)   # inst == shard lands on that shard
+    if ctx.pipeline is not None:
+        ctx.pipeline.forget_below(wm)
+    if ctx.mempool is not None:
+        ctx.mempool.forget_below(wm)
+    if ctx.abba_votes is not None:
+        ctx.abba_votes.forget_below(wm)
+    if ctx.future is not None:
+        ctx.future.forget_below(wm)
+    if ctx.metrics is not None:
+        ctx.metrics.forget_below(wm)
+
+def start_pruner(ctx, interval_s: float = None):
+    """
+    Background timer that runs maybe_prune on actor shard 0 (interval 0 = no
+    timer). Returns a threading.Event that stops the timer once set, or None.
+    """
+    interval_s = getattr(Constants, "PRUNE_INTERVAL_S", 1.0) if interval_s is None else interval_s
+    if interval_s <= 0:
+        return None
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(interval_s):
+            ctx.actor.submit(0, maybe_prune, ctx)
+
+    threading.Thread(target=loop, name="pruner", daemon=True).start()
+    return stop
@@ -0,0 +1,161 @@
+# src/schnorr.py
+import functools
+import hashlib
+import secrets
+
+try:  # optional C path: field arithmetic on GMP integers
+    import gmpy2
+    _field = gmpy2.mpz
+    _invert = gmpy2.invert
+except ImportError:
+    gmpy2 = None
+    _field = int
+    _invert = lambda z, p: pow(z, -1, p)
+
+# secp256k1: y^2 = x^3 + 7 over F_P, group order N
+P = _field(2**256 - 2**32 - 977)
+N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+G = (_field(0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798),
+     _field(0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8))
+
+# ---- point arithmetic in Jacobian coordinates (None = point at infinity)
+
+def _jac(pt):
+    return None if pt is None else (pt[0], pt[1], 1)
+
+def _affine(pt):
+    if pt is None:
+        return None
+    x, y, z = pt
+    zi = _invert(z, P)
+    zi2 = zi * zi % P
+    return (x * zi2 % P, y * zi2 * zi % P)
+
+def _double(pt):
+    if pt is None:
+        return None
+    x, y, z = pt
+    if y == 0:
+        return None
+    yy = y * y % P
+    s = 4 * x * yy % P
+    m = 3 * x * x % P
+    x3 = (m * m - 2 * s) % P
+    return (x3, (m * (s - x3) - 8 * yy * yy) % P, 2 * y * z % P)
+
+def _add(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    x1, y1, z1 = a
+    x2, y2, z2 = b
+    z1z1, z2z2 = z1 * z1 % P, z2 * z2 % P
+    u1, u2 = x1 * z2z2 % P, x2 * z1z1 % P
+    s1, s2 = y1 * z2 * z2z2 % P, y2 * z1 * z1z1 % P
+    if u1 == u2:
+        return _double(a) if s1 == s2 else None
+    h, r = (u2 - u1) % P, (s2 - s1) % P
+    hh = h * h % P
+    hhh = h * hh % P
+    v = u1 * hh % P
+    x3 = (r * r - hhh - 2 * v) % P
+    return (x3, (r * (v - x3) - s1 * hhh) % P, h * z1 * z2 % P)
+
+def _multi_mul(pairs):
+    """sum k_i * P_i (Straus: one shared doubling chain for all terms)."""
+    pairs = [(k % N, _jac(pt)) for k, pt in pairs if k % N and pt is not None]
+    acc = None
+    for bit in reversed(range(max((k.bit_length() for k, _ in pairs), default=0))):
+        acc = _double(acc)
+        for k, pt in pairs:
+            if (k >> bit) & 1:
+                acc = _add(acc, pt)
+    return acc
+
+def mul(k: int, pt=G):
+    return _affine(_multi_mul([(k, pt)]))
+
+# ---- encodings
+
+def encode_point(pt) -> bytes:
+    x, y = pt
+    return bytes([2 + int(y & 1)]) + int(x).to_bytes(32, "big")
+
+def decode_point(data: bytes):
+    if len(data) != 33 or data[0] not in (2, 3):
+        return None
+    x = _field(int.from_bytes(data[1:], "big"))
+    if x >= P:
+        return None
+    y = pow((x * x * x + 7) % P, (P + 1) // 4, P)
+    if (y * y - x * x * x - 7) % P:
+        return None
+    if (y & 1) != (data[0] & 1):
+        y = P - y
+    return (x, y)
+
+def _h(*parts: bytes) -> int:
+    return int.from_bytes(hashlib.sha256(b"".join(parts)).digest(), "big") % N
+
+# ---- keys derived from a shared public seed: anyone can recompute them, so this is
+# for tests and benchmarks only (src/keys.py loads real per-node keys from KEY_DIR)
+
+def secret_key(seed: str, node_id: str) -> int:
+    return _h(b"sk|", seed.encode(), b"|", node_id.encode()) or 1
+
+@functools.lru_cache(maxsize=None)
+def public_key(seed: str, node_id: str):
+    return mul(secret_key(seed, node_id))
+
+# ---- signatures: (R, s) with s*G = R + H(R|P|m)*P, serialized as 33 + 32 bytes hex
+
+def sign(sk: int, msg: bytes, pk=None) -> str:
+    pk = pk or mul(sk)
+    k = _h(b"nonce|", sk.to_bytes(32, "big"), msg) or 1
+    R = mul(k)
+    e = _h(encode_point(R), encode_point(pk), msg)
+    s = (k + e * sk) % N
+    return (encode_point(R) + s.to_bytes(32, "big")).hex()
+
+def _parse(sig: str):
+    try:
+        raw = bytes.fromhex(sig)
+    except ValueError:
+        return None
+    if len(raw) != 65:
+        return None
+    R = decode_point(raw[:33])
+    s = int.from_bytes(raw[33:], "big")
+    if R is None or s >= N:
+        return None
+    return R, s
+
+def verify(pk, msg: bytes, sig: str) -> bool:
+    parsed = _parse(sig)
+    if parsed is None:
+        return False
+    R, s = parsed
+    e = _h(encode_point(R), encode_point(pk), msg)
+    # s*G - e*P - R == O
+    return _multi_mul([(s, G), (-e, pk), (-1, R)]) is None
+
+def batch_verify(items) -> bool:
+    """
+    items: [(pk, msg, sig)]. One random linear combination
+    sum a_i*(s_i*G - e_i*P_i - R_i) == O checks all of them at once; a single
+    bad signature makes it fail (except with probability ~2^-128).
+    """
+    pairs, s_sum = [], 0
+    for i, (pk, msg, sig) in enumerate(items):
+        parsed = _parse(sig)
+        if parsed is None:
+            return False
+        R, s = parsed
+        e = _h(encode_point(R), encode_point(pk), msg)
+        a = 1 if i == 0 else secrets.randbits(128)
+        s_sum += a * s
+        pairs.append((-a * e, pk))
+        pairs.append((-a, R))
+    pairs.append((s_sum, G))
+    return _multi_mul(pairs) is None
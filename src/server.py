@@ -4,12 +4,15 @@ sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports fro
 
 from concurrent import futures
 import argparse
+import threading
 import time
 import calendar
 import grpc
 
 from proto import helloworld_pb2
 from proto import helloworld_pb2_grpc
+from proto import bft_pb2
+from proto import bft_pb2_grpc
 from config import constants as Constants
 
 
@@ -17,15 +20,141 @@ from .context import NodeContext
 from . import transport
 from . import vcbc_cert
 from . import bitvec
-from . import abba_start
 from . import abba
 from . import mvba
+from . import outbox
+from . import actor
+from . import pruning
+from . import pipeline
+from . import mempool
+from . import catchup
+from . import certs
+from . import coin
+from . import abba_vec
+from . import future_buffer
+from . import metrics
+
+EARLY_KINDS = ("BITVEC", "CERTPROPOSAL")   # held in ctx.future while past the pipeline window
+
+def _refuse(context, code, details: str, yes: str):
+    """Refuse a client request: gRPC status on a real call, PROReply(yes) for in-process callers (context None)."""
+    if context is not None:
+        context.abort(code, details)
+    return helloworld_pb2.PROReply(yes=yes)
 
 class Greeter(helloworld_pb2_grpc.GreeterServicer):
     def __init__(self, ctx: NodeContext):
         self.ctx = ctx
-        ctx.mvba_on_aba_decide = lambda inst, b: mvba.on_aba_decide(ctx, inst, b)
-        
+        ctx.mvba_on_support = lambda inst, S: mvba.try_start_mvba(ctx, inst, get_stub=self._get_stub)
+        ctx.mvba_on_aba_decide = lambda aid, bit: mvba.on_aba_decide(ctx, aid, bit)
+        ctx.mvba_on_decide = self._on_mvba_decide
+        if ctx.actor is None:
+            ctx.actor = actor.ActorPool(shards=getattr(Constants, "ACTOR_SHARDS", 1))
+        if ctx.pipeline is None:
+            ctx.pipeline = pipeline.Pipeline(window=getattr(Constants, "PIPELINE_WINDOW", 8), deliver=self._deliver)
+        if ctx.mempool is None:
+            ctx.mempool = mempool.Mempool(ctx, propose=self._propose_batch)
+        if ctx.verifier is None:
+            ctx.verifier = certs.Verifier(ctx)
+        coin.setup(ctx)
+        if ctx.future is None:
+            ctx.future = future_buffer.FutureBuffer()
+        if ctx.metrics is None:
+            ctx.metrics = metrics.Metrics(ctx.node_id)
+        if ctx.abba_votes is None and getattr(Constants, "ABBA_ENGINE", "dict") == "numpy":
+            ctx.abba_votes = abba_vec.VoteArrays(ctx.n)
+        self._pruner = pruning.start_pruner(ctx)
+        self._watchdog = self._start_watchdog()
+        # client Proposes that park a server thread (TX / SUBMIT / admission waits)
+        self._waiters = threading.BoundedSemaphore(getattr(Constants, "CLIENT_WAITERS", 32))
+
+        # all protocol state changes are handed to ctx.actor; handlers only decode + ack
+        self._get_stub = lambda port: transport.get_stub(ctx, port)
+
+    def close(self):
+        """Stop the background services this node started (pruner, batcher, verifier pool, actors)."""
+        ctx = self.ctx
+        if self._pruner is not None:
+            self._pruner.set()
+        if self._watchdog is not None:
+            self._watchdog.set()
+        ctx.mempool.close()
+        ctx.verifier.close()
+        ctx.actor.close()
+
+    def _start_watchdog(self):
+        """
+        Timer for a stuck pipeline: after CATCHUP_AFTER_S ask peers for the
+        decided results (catchup.tick), after STALL_SKIP_S stop waiting for
+        local input (skip).
+        """
+        skip_s = getattr(Constants, "STALL_SKIP_S", 10.0)
+        catchup_s = getattr(Constants, "CATCHUP_AFTER_S", 2.0)
+        periods = [s for s in (skip_s, catchup_s) if s > 0]
+        if not periods:
+            return None
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(min(periods) / 2):
+                catchup.tick(self.ctx, catchup_s)
+                inst = self.ctx.pipeline.stalled(skip_s) if skip_s > 0 else None
+                if inst is not None:
+                    self.ctx.actor.submit(inst, self.skip, inst)
+
+        threading.Thread(target=loop, name="stall-watchdog", daemon=True).start()
+        return stop
+
+    def skip(self, inst):
+        """
+        Abandon waiting for client input on inst: propose an empty value so
+        its MVBA runs and decides (possibly another node's proposal), and the
+        instances behind it can be delivered. Runs in inst's actor turn; a
+        no-op once this node has input for inst.
+        """
+        key = Constants.INSTANCE + str(inst)
+        if key in self.ctx.proposeMessage or inst in self.ctx.mvba_done or pruning.is_stale(self.ctx, inst):
+            return
+        print(f"[{self.ctx.node_id}] ⏭️ SKIP inst={inst}: no input here, proposing an empty value", flush=True)
+        self._start_instance(helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=""))
+
+    def _on_mvba_decide(self, inst, result):
+        self.ctx.pipeline.complete(inst, result)
+
+    def _deliver(self, inst, result):
+        value = result["value"] if result else None
+        print(f"[{self.ctx.node_id}] 📤 DELIVER inst={inst} value={value}", flush=True)
+        self.ctx.mempool.on_deliver(inst, value)
+        # the window slid by one: inst + window is this node's now
+        self._replay(inst + self.ctx.pipeline.window)
+
+    # BITVEC and CERTPROPOSAL only fill per-instance maps and re-check their
+    # quorum, so inside the window they are handled whenever they arrive. Past
+    # the window they wait in ctx.future (bounded per sender, so a Byzantine
+    # node cannot grow state for arbitrary far-off instances) and are replayed
+    # once the window reaches them.
+    def _submit_or_hold(self, kind, sender, fn, /, **kwargs):
+        inst = kwargs["inst"]
+        if self.ctx.future is None or not self.ctx.pipeline.ahead(inst):
+            self.ctx.actor.submit(inst, fn, self.ctx, **kwargs)
+            return
+        self.ctx.future.hold((kind, inst), sender, (fn, kwargs))
+        if not self.ctx.pipeline.ahead(inst):
+            self._replay(inst)   # the window moved while holding: _deliver may have missed it
+
+    def _replay(self, inst):
+        if self.ctx.future is None:
+            return
+        held = [m for kind in EARLY_KINDS for m in self.ctx.future.take((kind, inst))]
+        if held:
+            print(f"[{self.ctx.node_id}] ⏪ replaying {len(held)} buffered BITVEC/CERTPROPOSAL inst={inst}", flush=True)
+        for fn, kwargs in held:
+            self.ctx.actor.submit(inst, fn, self.ctx, **kwargs)
+
+    def _propose_batch(self, inst, value):
+        # runs in inst's actor turn (Mempool._claim)
+        req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=value)
+        self._start_instance(req)
 
     def SayHello(self, request, context):
         return helloworld_pb2.HelloReply(message=f"Hello, {request.name}!")
@@ -33,65 +162,174 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
     def Propose(self, request, context):
         rtype = (getattr(request, "type", "") or "").strip()
 
+        # client transaction: batched by the mempool, reply once committed as "<inst>:<index>"
+        if rtype == "TX":
+            return self._client_wait(context, self._tx, request)
+
+        # catch-up for a node that fell behind (catchup.py): answered for pruned instances too
+        if rtype == "CATCHUP":
+            catchup.on_catchup(self.ctx, requester=request.id, inst=request.instance, count=request.value)
+            return helloworld_pb2.PROReply(yes="ack_catchup")
+        if rtype == "DECIDED":
+            self.ctx.actor.submit(request.instance, catchup.on_decided, self.ctx,
+                                  sender=request.id, inst=request.instance, w=request.value)
+            return helloworld_pb2.PROReply(yes="ack_decided")
+
+        if pruning.is_stale(self.ctx, request.instance):
+            return helloworld_pb2.PROReply(yes="stale")
+
         if rtype == "BITVEC":
-           get_stub = lambda port: transport.get_stub(self.ctx, port)
-
-           bitvec.on_bitvec(
-              self.ctx,
-              sender=request.id,
-              inst=request.instance,
-              bitstr=request.value,
-              abba_start_cb=lambda inst, S: abba_start.start_abba_if_ready(
-              self.ctx, inst, S, get_stub=lambda port: transport.get_stub(self.ctx, port)
+            self._submit_or_hold(
+                "BITVEC", request.id, bitvec.on_bitvec,
+                sender=request.id,
+                inst=request.instance,
+                bitstr=request.value,
             )
-)
-           return helloworld_pb2.PROReply(yes="ack_bitvec")
-
+            return helloworld_pb2.PROReply(yes="ack_bitvec")
 
         # node-to-node CERTPROPOSAL receive
         if rtype == "CERTPROPOSAL":
-            vcbc_cert.on_certproposal(
-                self.ctx,
+            self._submit_or_hold(
+                "CERTPROPOSAL", request.id, vcbc_cert.on_certproposal,
                 proposer=request.id,
                 inst=request.instance,
-                value=request.value,
+                digest=request.value,
                 proof=request.proof,
             )
             return helloworld_pb2.PROReply(yes="ack_certproposal")
 
-        # client start path
-        if rtype == "":
+        # certificate fetch for a proposer MVBA selected (value=proposer)
+        if rtype == "CERTFETCH":
+            self.ctx.actor.submit(
+                request.instance, vcbc_cert.on_certfetch, self.ctx,
+                requester=request.id,
+                inst=request.instance,
+                proposer=request.value,
+            )
+            return helloworld_pb2.PROReply(yes="ack_certfetch")
+
+        # payload fetch for a value we only know by digest (value=digest)
+        if rtype == "FETCH":
+            self.ctx.actor.submit(
+                request.instance, vcbc_cert.on_fetch, self.ctx,
+                requester=request.id,
+                inst=request.instance,
+                d=request.value,
+            )
+            return helloworld_pb2.PROReply(yes="ack_fetch")
+
+        # fetched payload (proof=digest, value=payload)
+        if rtype == "PAYLOAD":
+            self.ctx.actor.submit(
+                request.instance, vcbc_cert.on_payload, self.ctx,
+                inst=request.instance,
+                d=request.proof,
+                value=request.value,
+            )
+            return helloworld_pb2.PROReply(yes="ack_payload")
+
+        # retrieval of a dispersed value (proof=Merkle root, value=fragment wire)
+        if rtype == "FRAGMENT":
+            self.ctx.actor.submit(
+                request.instance, vcbc_cert.on_fragment, self.ctx,
+                inst=request.instance,
+                root=request.proof,
+                wire=request.value,
+            )
+            return helloworld_pb2.PROReply(yes="ack_fragment")
+
+        # client start path ("" = fire and forget, SUBMIT = reply with the ordered decision,
+        # SKIP = give up on input for a stuck instance)
+        if rtype in ("", "SUBMIT", "SKIP"):
             if request.id != "client":
                 print(f"[{self.ctx.node_id}] ⚠️ ignoring non-client Propose empty type from={request.id}", flush=True)
                 return helloworld_pb2.PROReply(yes="ignored")
 
-            inst = request.instance
-            value = request.value
-            print(f"[{self.ctx.node_id}] Propose trigger inst={inst} value={value} (from=client)", flush=True)
+            if rtype == "SKIP":
+                self.ctx.actor.submit(request.instance, self.skip, request.instance)
+                return helloworld_pb2.PROReply(yes="yes")
+            return self._client_wait(context, self._client_propose, request, context, rtype)
 
-            # store local input
-            key = Constants.INSTANCE + str(inst)
-            self.ctx.proposeMessage[key] = {
-                Constants.FROM: request.id,
-                Constants.PROOF: getattr(request, "proof", ""),
-                Constants.VALUE: value,
-            }
+        print(f"[{self.ctx.node_id}] Propose recv type={rtype!r} ignored in upto-cert mode", flush=True)
+        return helloworld_pb2.PROReply(yes="ignored")
 
-            # IMPORTANT: if QC formed before input arrived, broadcast now (late fix)
-            vcbc_cert.try_broadcast_my_cert_if_ready(self.ctx, inst, step=1, value=value)
+    def _client_wait(self, context, fn, *args):
+        """Run a client path that blocks this server thread, unless CLIENT_WAITERS already do."""
+        if not self._waiters.acquire(blocking=False):
+            return _refuse(context, grpc.StatusCode.RESOURCE_EXHAUSTED, "too many client requests waiting", "busy")
+        try:
+            return fn(*args)
+        finally:
+            self._waiters.release()
+
+    def _tx(self, request):
+        if not self.ctx.mempool.add(request.value):
+            return helloworld_pb2.PROReply(yes="full")
+        where = self.ctx.mempool.wait_committed(request.value, timeout=getattr(Constants, "SUBMIT_TIMEOUT_S", 30.0))
+        if where is None:
+            return helloworld_pb2.PROReply(yes="timeout")
+        return helloworld_pb2.PROReply(yes=f"{where[0]}:{where[1]}")
+
+    def _client_propose(self, request, context, rtype):
+        inst = request.instance
+        if Constants.INSTANCE + str(inst) in self.ctx.proposeMessage:
+            # this node already has input there (the mempool's batch, or an earlier client)
+            return helloworld_pb2.PROReply(yes="taken")
+
+        # backpressure: hold the client until the in-flight window has room, but not forever
+        if not self.ctx.pipeline.admit(inst, timeout=getattr(Constants, "ADMIT_TIMEOUT_S", 10.0)):
+            return _refuse(context, grpc.StatusCode.RESOURCE_EXHAUSTED,
+                           f"inst={inst} is beyond the in-flight window (next to deliver: {self.ctx.pipeline.next_deliver})",
+                           "busy")
+
+        print(f"[{self.ctx.node_id}] Propose trigger inst={inst} value={request.value} (from=client)", flush=True)
+        self.ctx.actor.submit(inst, self._start_instance, request)
+        if rtype == "":
+            return helloworld_pb2.PROReply(yes="yes")
 
-            # broadcast VCBC
+        ok, result = self.ctx.pipeline.wait_delivered(inst, timeout=getattr(Constants, "SUBMIT_TIMEOUT_S", 30.0))
+        if not ok:
+            return helloworld_pb2.PROReply(yes="timeout")
+        return helloworld_pb2.PROReply(yes=result["value"] if result else "")
+
+    def _start_instance(self, request):
+        inst = request.instance
+        key = Constants.INSTANCE + str(inst)
+        if key in self.ctx.proposeMessage:
+            # one input per instance: a second VCBC from this node would be equivocation
+            print(f"[{self.ctx.node_id}] ⚠️ inst={inst} already has this node's proposal, dropping value={request.value[:32]!r}", flush=True)
+            return
+        value = request.value
+        metrics.mark(self.ctx, inst, "propose")
+        self.ctx.pipeline.started(inst)
+
+        # dispersal mode commits to a Merkle root over fragments instead of the value digest
+        dispersal = getattr(Constants, "DISPERSAL", False)
+        if dispersal:
+            d, wires = vcbc_cert.disperse(self.ctx, inst, value)
+        else:
+            d = vcbc_cert.digest(value)
+
+        # store local input
+        self.ctx.proposeMessage[key] = {
+            Constants.FROM: request.id,
+            Constants.PROOF: getattr(request, "proof", ""),
+            Constants.VALUE: value,
+            Constants.DIGEST: d,
+        }
+
+        # IMPORTANT: if QC formed before input arrived, broadcast now (late fix)
+        vcbc_cert.try_broadcast_my_cert_if_ready(self.ctx, inst, step=1, d=d)
+
+        # broadcast VCBC (or one fragment per node)
+        if dispersal:
+            my_msg = transport.send_vcbc_fragments(self.ctx, inst=inst, step=vcbc_cert.VCBC_DISPERSE, wires=wires)
+        else:
             my_msg = transport.broadcast_vcbc(self.ctx, inst=inst, step=1, value=value)
 
-            # self-delivery
-            vcbc_cert.on_vcbc(self.ctx, sender=self.ctx.node_id, msg=my_msg)
-
-            return helloworld_pb2.PROReply(yes="yes")
-
-        print(f"[{self.ctx.node_id}] Propose recv type={rtype!r} ignored in upto-cert mode", flush=True)
-        return helloworld_pb2.PROReply(yes="ignored")
+        # self-delivery
+        vcbc_cert.on_vcbc(self.ctx, sender=self.ctx.node_id, msg=my_msg)
 
-    
     def ABBA(self, request, context):
        msg = request.message
        inst = msg.instance
@@ -99,10 +337,13 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
        mtype = msg.type
        sender = msg.id
        bit = msg.value
+       if pruning.is_stale(self.ctx, inst):
+          return helloworld_pb2.ABBAReply(message=msg)
 
        print(
          f"[{self.ctx.node_id}] 📨 ABBA "
          f"| inst={inst} "
+         f"| idx={msg.index} "
          f"| r={rnd} "
          f"| type={mtype} "
          f"| from={sender} "
@@ -115,56 +356,161 @@ class Greeter(helloworld_pb2_grpc.GreeterServicer):
        if mtype == Constants.PREPROCESS:
           print(f"[{self.ctx.node_id}] ✅ PREPROCESS RECEIVED inst={inst} r={rnd} from={sender} bit={bit}", flush=True)
 
+       self.submit_abba([self._abba_vote(msg)])
+       return helloworld_pb2.ABBAReply(message=msg)
+
+    def _abba_vote(self, msg):
+        return dict(
+            inst=msg.instance,
+            rnd=msg.round,
+            mtype=msg.type,
+            sender=msg.id,
+            bit=int(msg.value),
+            sign=msg.sign,
+            idx=msg.index,
+        )
 
-       get_stub = lambda port: transport.get_stub(self.ctx, port)
+    def submit_abba(self, votes):
+        """Hand ABBA votes to the protocol: one actor turn per shard, however many votes."""
+        handler = abba_vec.on_abba_batch if self.ctx.abba_votes is not None else abba.on_abba_batch
+        by_shard = {}
+        for vote in votes:
+            by_shard.setdefault(self.ctx.actor.shard(vote["inst"]), []).append(vote)
+        for group in by_shard.values():
+            self.ctx.actor.submit(group[0]["inst"], handler, self.ctx, self._get_stub, group)
 
-       abba.on_abba_message(
-          ctx=self.ctx,
-          get_stub=get_stub,
-          inst=msg.instance,
-          rnd=msg.round,
-          mtype=msg.type,
-          sender=msg.id,
-          bit=int(msg.value),
-        )
-       return helloworld_pb2.ABBAReply(message=msg)    
-    
     def VCBC(self, request, context):
-        print(f"[{self.ctx.node_id}] VCBC recv from {request.msg.id} inst={request.msg.instance} step={request.msg.step} value={request.msg.value}", flush=True)
+        if pruning.is_stale(self.ctx, request.msg.instance):
+            return helloworld_pb2.VCBCReply()
+        print(f"[{self.ctx.node_id}] VCBC recv from {request.msg.id} inst={request.msg.instance} step={request.msg.step} bytes={len(request.msg.value)}", flush=True)
 
         # deliver
-        vcbc_cert.on_vcbc(self.ctx, sender=request.msg.id, msg=request.msg)
-
-        # reply
+        self.ctx.actor.submit(request.msg.instance, vcbc_cert.on_vcbc, self.ctx, sender=request.msg.id, msg=request.msg)
+
+        # reply (the echo share is signed, and charged, in vcbc_cert._echo)
+        if request.msg.step == vcbc_cert.VCBC_SEND:
+            value = vcbc_cert.digest(request.msg.value)
+        elif request.msg.step == vcbc_cert.VCBC_DISPERSE:
+            value = ""
+        else:
+            value = request.msg.value
         gmt = time.gmtime()
-        time.sleep(getattr(Constants, "SShare", 0.0))
         reply = helloworld_pb2.mDict(
             instance=request.msg.instance,
             id=self.ctx.node_id,
             step=request.msg.step,
             ts=str(calendar.timegm(gmt)),
-            value=request.msg.value
+            value=value,
         )
         return helloworld_pb2.VCBCReply(msg=reply)
 
+class Node(bft_pb2_grpc.NodeServicer):
+    """Receives coalesced peer traffic and replays it through the Greeter handlers."""
+
+    def __init__(self, greeter: Greeter):
+        self.greeter = greeter
+        self._applied = {}                # (sender index, stream session) -> highest seq applied
+        self._applied_lock = threading.Lock()
+
+    def _first_delivery(self, batch) -> bool:
+        """A stream replays unacked batches after a reconnect: apply each (sender, session, seq) once."""
+        key = (batch.sender_id, batch.session)
+        with self._applied_lock:
+            if batch.seq <= self._applied.get(key, 0):
+                return False
+            self._applied[key] = batch.seq
+            return True
+
+    def SendBatch(self, request, context):
+        if request.seq and not self._first_delivery(request):
+            return bft_pb2.Ack(ok=True, status=bft_pb2.ACCEPTED, reason="duplicate")
+        votes = []
+        for message in request.messages:
+            if pruning.is_stale(self.greeter.ctx, message.instance_id):
+                continue   # cheap drop: payload never decoded
+            decoded = outbox.decode(message)
+            if decoded is None:
+                print(f"[{self.greeter.ctx.node_id}] ⚠️ unknown batched msg_type={message.msg_type!r}", flush=True)
+                continue
+            method, req = decoded
+            if method == "ABBA":
+                votes.append(self.greeter._abba_vote(req.message))   # ABBA votes go to the actor together
+                continue
+            getattr(self.greeter, method)(req, context)
+        if votes:
+            print(f"[{self.greeter.ctx.node_id}] 📨 ABBA batch of {len(votes)} votes", flush=True)
+            self.greeter.submit_abba(votes)
+        return bft_pb2.Ack(ok=True, status=bft_pb2.ACCEPTED)
+
+    def Stream(self, request_iterator, context):
+        for batch in request_iterator:
+            yield self.SendBatch(batch, context)
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--id", required=True)
     ap.add_argument("--port", type=int, required=True)
     ap.add_argument("--max_workers", type=int, default=64)
+    ap.add_argument("--aio", action="store_true", help="run on grpc.aio / asyncio instead of a thread pool")
+    ap.add_argument("--certs", choices=sorted(certs.BACKENDS), help="certificate backend (see Constants.CERT_BACKEND)")
+    ap.add_argument("--abba_engine", choices=["dict", "numpy"], help="ABBA vote storage (see Constants.ABBA_ENGINE)")
+    ap.add_argument("--coin", choices=["hash", "threshold"], help="common coin backend (see Constants.COIN_BACKEND)")
+    ap.add_argument("--key_dir", help="dealer-written key files (see Constants.KEY_DIR)")
+    ap.add_argument("--verify_workers", type=int, help="verification processes (see Constants.VERIFY_WORKERS)")
+    ap.add_argument("--dispersal", action="store_true", help="erasure-code VCBC values (see Constants.DISPERSAL)")
+    ap.add_argument("--mempool", action="store_true", help="TX-driven instances from the start (see Constants.MEMPOOL)")
+    ap.add_argument("--metrics_port", type=int, help="serve /metrics and /metrics.json (see Constants.METRICS_PORT)")
+    ap.add_argument("--metrics_dump", help="periodic JSON metrics file (see Constants.METRICS_DUMP)")
     args = ap.parse_args()
 
     # runtime override
     Constants.ID = args.id
     Constants.PORT = args.port
+    if args.dispersal:
+        Constants.DISPERSAL = True
+    if args.mempool:
+        Constants.MEMPOOL = True
+    if args.certs:
+        Constants.CERT_BACKEND = args.certs
+    if args.coin:
+        Constants.COIN_BACKEND = args.coin
+    if args.key_dir:
+        Constants.KEY_DIR = args.key_dir
+    if args.abba_engine:
+        Constants.ABBA_ENGINE = args.abba_engine
+    if args.verify_workers is not None:
+        Constants.VERIFY_WORKERS = args.verify_workers
+    if args.metrics_port is not None:
+        Constants.METRICS_PORT = args.metrics_port
+    if args.metrics_dump:
+        Constants.METRICS_DUMP = args.metrics_dump
 
     ctx = NodeContext(node_id=args.id, port=args.port)
     ctx.init_quorum()
 
     print(f"[{ctx.node_id}] config: n={ctx.n} f={ctx.f} q2f1={ctx.q} ports={Constants.PORTLIST[:ctx.n]}", flush=True)
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=args.max_workers))
-    helloworld_pb2_grpc.add_GreeterServicer_to_server(Greeter(ctx), server)
+    # created here (not in Greeter) so the exporters run for threaded and aio servers alike
+    ctx.metrics = metrics.Metrics(ctx.node_id)
+    if getattr(Constants, "METRICS_PORT", 0):
+        metrics.serve_http(ctx, Constants.METRICS_PORT)
+    if getattr(Constants, "METRICS_DUMP", ""):
+        metrics.start_dump(ctx, Constants.METRICS_DUMP, getattr(Constants, "METRICS_DUMP_S", 10.0))
+
+    if args.aio:
+        import asyncio
+        from . import aio_server
+        asyncio.run(aio_server.serve(ctx))
+        return
+
+    # every inbound peer stream and every waiting client holds a worker for as long as it lasts
+    workers = max(args.max_workers, (ctx.n - 1) + getattr(Constants, "CLIENT_WAITERS", 32) + 8)
+    if workers > args.max_workers:
+        print(f"[{ctx.node_id}] ⚠️ max_workers raised to {workers}: {ctx.n - 1} peer streams + client waiters + spare", flush=True)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=workers))
+    greeter = Greeter(ctx)
+    helloworld_pb2_grpc.add_GreeterServicer_to_server(greeter, server)
+    bft_pb2_grpc.add_NodeServicer_to_server(Node(greeter), server)
     server.add_insecure_port(f"[::]:{args.port}")
     server.start()
     print(f"Server started: id={args.id} port={args.port}", flush=True)
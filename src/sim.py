@@ -0,0 +1,285 @@
+# src/sim.py
+"""
+Discrete-event simulation of a whole cluster in virtual time.
+
+One event heap ordered by virtual time drives N unchanged NodeContext +
+Greeter pairs: ctx.actor is a SimActor (protocol steps become events on
+that node), ctx.loopback is the Simulator (sends become delivery events),
+and cost.charge() advances the running node's clock instead of sleeping.
+
+Each node is one CPU: an event starts no earlier than the node is free,
+and the crypto costs it charges keep the node busy. Each directed link
+(src, dst) has a propagation latency (latency_s + uniform(0, spread_s),
+drawn once per link) and serializes messages at `bandwidth` bytes/s.
+
+  python -m src.sim --n 4 16 64 --payload 100 10000 --instances 20
+"""
+import os, sys
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))  # allow imports from repo root
+
+import argparse
+import heapq
+import itertools
+import json
+import random
+import time
+from concurrent.futures import Future
+
+from proto import helloworld_pb2
+from config import constants as Constants
+
+from .context import NodeContext
+from .loopback import LoopbackStub
+from . import cost
+from . import metrics
+from . import pruning
+from . import catchup
+from . import server
+
+HEADER_BYTES = 64    # per-message framing charged on top of the protobuf size
+
+class SimActor:
+    """ctx.actor for a simulated node: a submitted step runs as an event at the node's current time."""
+    shards = 1
+
+    def __init__(self, sim, port: int):
+        self.sim = sim
+        self.port = port
+
+    def shard(self, inst: int) -> int:
+        return 0
+
+    def submit(self, inst: int, fn, /, *args, **kwargs):
+        self.sim.at(self.sim.now, self.port, fn, *args, **kwargs)
+
+    def close(self):
+        pass   # events left in the heap are simply never run
+
+class Simulator:
+    def __init__(self, latency_s: float = 0.05, spread_s: float = 0.0, bandwidth: float = 1.25e8,
+                 event_cost_s: float = 0.0, seed: int = 0):
+        self.latency_s = latency_s
+        self.spread_s = spread_s
+        self.bandwidth = bandwidth        # bytes/s per directed link
+        self.event_cost_s = event_cost_s  # fixed CPU charge per event (message handling, scheduling)
+
+        self.now = 0.0
+        self.greeters = {}                # port -> Greeter
+        self.events = 0
+        self.msgs = 0
+        self.bytes = 0
+
+        self._rng = random.Random(seed)
+        self._heap = []                   # (time, seq, port, fn, args, kwargs)
+        self._seq = itertools.count()
+        self._busy = {}                   # port -> time the node's CPU is free
+        self._link_free = {}              # (src, dst) -> time the link is free
+        self._latency = {}                # (src, dst) -> propagation delay
+        self.crashed = set()              # ports of crashed nodes: they run nothing, send and receive nothing
+        self._periodic = {}               # port -> [(interval_s, fn, args)] from every(), re-armed by recover()
+
+    def attach(self, port: int, greeter):
+        self.greeters[port] = greeter
+
+    def crash(self, port: int):
+        self.crashed.add(port)
+
+    def recover(self, port: int):
+        """The node runs again, with the state it had; everything sent to it meanwhile is lost."""
+        if port not in self.crashed:
+            return
+        self.crashed.discard(port)
+        for interval_s, fn, args in self._periodic.get(port, ()):
+            self._arm(interval_s, port, fn, args)
+
+    def _arm(self, interval_s: float, port: int, fn, args):
+        def tick():
+            fn(*args)
+            self.at(self.now + interval_s, port, tick)
+        self.at(self.now + interval_s, port, tick)
+
+    def at(self, t: float, port: int, fn, /, *args, **kwargs):
+        heapq.heappush(self._heap, (t, next(self._seq), port, fn, args, kwargs))
+
+    def every(self, interval_s: float, port: int, fn, /, *args):
+        """Run fn(*args) on node `port` every interval_s of virtual time (stops while it is crashed)."""
+        self._periodic.setdefault(port, []).append((interval_s, fn, args))
+        self._arm(interval_s, port, fn, args)
+
+    def spend(self, seconds: float):
+        # cost.charge() hook: the running node stays busy that much longer
+        self.now += seconds
+
+    # ---- network: the LoopbackNetwork interface, so transport.get_stub hands out LoopbackStubs
+
+    def stub(self, src: int, port: int) -> LoopbackStub:
+        return LoopbackStub(self, src, port)
+
+    def send(self, src: int, port: int, method: str, req) -> Future:
+        # one request object may go to many peers: handlers only read it
+        fut = Future()
+        if src in self.crashed or port in self.crashed:
+            return fut                    # lost: never completes, like a dead peer
+        size = req.ByteSize() + HEADER_BYTES
+        link = (src, port)
+        if link not in self._latency:
+            self._latency[link] = self.latency_s + (self._rng.uniform(0, self.spread_s) if self.spread_s else 0.0)
+        depart = max(self.now, self._link_free.get(link, 0.0))
+        self._link_free[link] = depart + size / self.bandwidth
+        self.at(self._link_free[link] + self._latency[link], port, self._deliver, port, method, req, fut)
+        self.msgs += 1
+        self.bytes += size
+        return fut
+
+    def _deliver(self, port: int, method: str, req, fut: Future):
+        fut.set_result(getattr(self.greeters[port], method)(req, None))
+
+    # ---- main loop
+
+    def run(self, until: float = None, stop=None):
+        """Process events in virtual-time order until none are left, `until` passes or stop() is true."""
+        while self._heap:
+            t, _, port, fn, args, kwargs = heapq.heappop(self._heap)
+            if until is not None and t > until:
+                heapq.heappush(self._heap, (t, next(self._seq), port, fn, args, kwargs))
+                break
+            if port in self.crashed:
+                continue
+            free = self._busy.get(port, 0.0)
+            if free > t:
+                # node still busy: the event waits for its CPU
+                heapq.heappush(self._heap, (free, next(self._seq), port, fn, args, kwargs))
+                continue
+            self.now = t + self.event_cost_s
+            fn(*args, **kwargs)
+            self._busy[port] = self.now
+            self.events += 1
+            if stop is not None and stop():
+                break
+
+# Constants a SimCluster overrides for its run; close() restores them
+_OVERRIDDEN = ("N", "FAULTY_NODES", "PORTLIST", "VERIFY_WORKERS", "PRUNE_INTERVAL_S", "STALL_SKIP_S", "CATCHUP_AFTER_S")
+
+class SimCluster:
+    """
+    n simulated nodes; Constants are set for the run (ports are only
+    addresses here) until close(), which also stops the nodes' threads.
+    """
+
+    def __init__(self, n: int, f: int = None, sim: Simulator = None, prune_interval_s: float = 1.0):
+        self._saved = {k: getattr(Constants, k) for k in _OVERRIDDEN if hasattr(Constants, k)}
+        Constants.N = n
+        Constants.FAULTY_NODES = (n - 1) // 3 if f is None else f
+        Constants.PORTLIST = [50054 + i for i in range(n)]
+        Constants.VERIFY_WORKERS = 0      # verification runs inline, inside the node's events
+        Constants.PRUNE_INTERVAL_S = 0    # no wall-clock pruner thread; pruning is scheduled below
+        Constants.STALL_SKIP_S = 0        # nor a wall-clock stall watchdog; catch-up is scheduled below
+        Constants.CATCHUP_AFTER_S = 0
+        catchup_s = self._saved.get("CATCHUP_AFTER_S", 2.0)
+        self.sim = sim or Simulator()
+        self.delivered = {}               # inst -> {node_id: (virtual time, value)}
+        self.started = {}                 # inst -> virtual time of client input
+
+        self.greeters = []
+        for i, port in enumerate(Constants.PORTLIST):
+            ctx = NodeContext(node_id=f"id{i + 1}", port=port, n=n)
+            ctx.init_quorum()
+            ctx.actor = SimActor(self.sim, port)
+            ctx.loopback = self.sim
+            ctx.metrics = metrics.Metrics(ctx.node_id, clock=lambda: self.sim.now)
+            greeter = server.Greeter(ctx)
+            ctx.pipeline.deliver = self._tap(ctx, ctx.pipeline.deliver)
+            ctx.pipeline.clock = lambda: self.sim.now
+            ctx.pipeline.last_progress = self.sim.now
+            self.sim.attach(port, greeter)
+            self.greeters.append(greeter)
+            if prune_interval_s > 0:
+                self.sim.every(prune_interval_s, port, pruning.maybe_prune, ctx)
+            if catchup_s > 0:
+                self.sim.every(catchup_s / 2, port, catchup.tick, ctx, catchup_s)
+
+    def _tap(self, ctx, deliver):
+        def on_deliver(inst, result):
+            deliver(inst, result)
+            self.delivered.setdefault(inst, {})[ctx.node_id] = (self.sim.now, result["value"] if result else None)
+        return on_deliver
+
+    def propose(self, inst: int, value: str, t: float = 0.0):
+        """Client input for inst at every node at virtual time t."""
+        self.started[inst] = t
+        req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=value)
+        for g in self.greeters:
+            self.sim.at(t, g.ctx.port, g._start_instance, req)
+
+    def all_delivered(self, insts) -> bool:
+        n = len(self.greeters)
+        return all(len(self.delivered.get(k, ())) == n for k in insts)
+
+    def close(self):
+        for g in self.greeters:
+            g.close()   # the mempool batcher is a real thread even here
+        for k in _OVERRIDDEN:
+            if k in self._saved:
+                setattr(Constants, k, self._saved[k])
+            elif hasattr(Constants, k):
+                delattr(Constants, k)
+
+def run_once(n: int, f: int, payload: int, instances: int, interval_s: float, sim_kwargs: dict, horizon_s: float) -> dict:
+    cluster = SimCluster(n, f, Simulator(**sim_kwargs))
+    insts = range(1, instances + 1)
+    for k in insts:
+        cluster.propose(k, f"v{k}|".ljust(payload, "x"), t=(k - 1) * interval_s)
+
+    wall = time.perf_counter()
+    previous = cost.install(cluster.sim.spend)
+    try:
+        # checking all instances after every event is O(n * instances); every 1000 events is plenty
+        cluster.sim.run(until=horizon_s, stop=lambda: cluster.sim.events % 1000 == 0 and cluster.all_delivered(insts))
+    finally:
+        cost.install(previous)
+        cluster.close()
+    wall = time.perf_counter() - wall
+
+    # latency of an instance: client input -> last node delivered it
+    lat = sorted(max(t for t, _ in cluster.delivered[k].values()) - cluster.started[k]
+                 for k in insts if len(cluster.delivered.get(k, ())) == n)
+    makespan = max((t for per_node in cluster.delivered.values() for t, _ in per_node.values()), default=0.0)
+    pct = lambda p: round(lat[min(len(lat) - 1, int(p * len(lat)))], 6) if lat else None
+    return {
+        "n": n, "f": cluster.greeters[0].ctx.f, "payload": payload, "instances": instances,
+        "delivered": len(lat), "makespan_s": round(makespan, 6),
+        "latency_p50_s": pct(0.5), "latency_max_s": round(lat[-1], 6) if lat else None,
+        "msgs": cluster.sim.msgs, "bytes": cluster.sim.bytes, "events": cluster.sim.events,
+        "wall_s": round(wall, 3),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, nargs="+", default=[4], help="cluster sizes to sweep")
+    ap.add_argument("--f", type=int, nargs="+", help="fault thresholds to sweep (default (n-1)//3)")
+    ap.add_argument("--payload", type=int, nargs="+", default=[100], help="proposal sizes in bytes to sweep")
+    ap.add_argument("--instances", type=int, default=10)
+    ap.add_argument("--interval", type=float, default=0.0, help="virtual seconds between client inputs")
+    ap.add_argument("--latency", type=float, default=0.05, help="one-way link latency (s)")
+    ap.add_argument("--spread", type=float, default=0.0, help="extra per-link latency, uniform in [0, spread]")
+    ap.add_argument("--bandwidth", type=float, default=1.25e8, help="per-link bytes/s")
+    ap.add_argument("--event_cost", type=float, default=0.0, help="CPU seconds charged per handled event")
+    ap.add_argument("--horizon", type=float, default=3600.0, help="stop after this much virtual time")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--verbose", action="store_true", help="keep the per-message node logs")
+    args = ap.parse_args()
+
+    out = sys.stdout
+    if not args.verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    sim_kwargs = dict(latency_s=args.latency, spread_s=args.spread, bandwidth=args.bandwidth,
+                      event_cost_s=args.event_cost, seed=args.seed)
+    for n in args.n:
+        for f in (args.f or [None]):
+            for payload in args.payload:
+                res = run_once(n, f, payload, args.instances, args.interval, sim_kwargs, args.horizon)
+                print(json.dumps(res), file=out, flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+# src/stream.py
+import asyncio
+import collections
+import queue
+import random
+import threading
+import time
+import traceback
+
+import grpc
+from config import constants as Constants
+from .outbox import on_loop
+
+def _stamp(ctx, batch, session: int, seq: int):
+    batch.sender_id = ctx.id_to_index.get(ctx.node_id, -1)
+    batch.session = session
+    batch.seq = seq
+
+class PeerStream:
+    """
+    Long-lived Node.Stream to one peer carrying every MessageBatch we send it.
+
+    Flow control: at most `window` batches may be unacknowledged; send()
+    blocks the outbox sender (never a protocol handler) once that is reached.
+    Reconnect: when the stream breaks (or the sender hits any other error)
+    it is reopened with exponential backoff and all unacknowledged batches
+    are replayed in order. A batch whose Ack got lost was applied already,
+    so every batch carries (session, seq) and Node.SendBatch applies each
+    one once.
+    """
+
+    def __init__(self, ctx, port: int, open_stream, window: int = None):
+        self.ctx = ctx
+        self.port = port
+        self.open_stream = open_stream        # callable(request_iterator) -> response iterator
+        self.window = window or getattr(Constants, "STREAM_WINDOW", 64)
+        self.reconnects = 0
+        self.session = random.getrandbits(63) + 1
+        self._seq = 0
+
+        self._credits = threading.Semaphore(self.window)
+        self._unacked = collections.deque()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=f"stream-{port}", daemon=True)
+        self._thread.start()
+
+    def send(self, batch):
+        self._credits.acquire()
+        with self._lock:
+            self._seq += 1
+            _stamp(self.ctx, batch, self.session, self._seq)
+            self._unacked.append(batch)
+            self._queue.put(batch)
+
+    @staticmethod
+    def _requests(q):
+        while True:
+            batch = q.get()
+            if batch is None:
+                return
+            yield batch
+
+    def _run(self):
+        backoff = 0.05
+        while True:
+            # fresh request queue per stream, seeded with whatever the last one lost
+            q = queue.Queue()
+            with self._lock:
+                for batch in self._unacked:
+                    q.put(batch)
+                self._queue = q
+
+            try:
+                for _ack in self.open_stream(self._requests(q)):
+                    with self._lock:
+                        self._unacked.popleft()
+                    self._credits.release()
+                    backoff = 0.05
+            except grpc.RpcError as e:
+                print(f"[{self.ctx.node_id}] stream to {self.port} broken ({e.code()}), reconnecting in {backoff:.2f}s", flush=True)
+            except Exception:
+                # never let the sender die silently: that peer would stop hearing from us
+                print(f"[{self.ctx.node_id}] stream to {self.port} failed, reconnecting in {backoff:.2f}s", flush=True)
+                traceback.print_exc()
+
+            q.put(None)  # terminate the old request iterator
+            self.reconnects += 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 2.0)
+
+class AioPeerStream:
+    """
+    asyncio flavour of PeerStream (grpc.aio call, same window and replay
+    rules). May be constructed on any thread: the semaphore, queue and task
+    are created on ctx.loop.
+    """
+
+    def __init__(self, ctx, port: int, open_stream, window: int = None):
+        self.ctx = ctx
+        self.port = port
+        self.open_stream = open_stream        # callable(async request iterator) -> aio StreamStreamCall
+        self.window = window or getattr(Constants, "STREAM_WINDOW", 64)
+        self.reconnects = 0
+        self.session = random.getrandbits(63) + 1
+        self._seq = 0
+
+        self._unacked = collections.deque()
+        self._credits = None
+        self._queue = None
+        self._task = None
+        on_loop(ctx.loop, self._start)
+
+    def _start(self):
+        if self._task is None:
+            self._credits = asyncio.Semaphore(self.window)
+            self._queue = asyncio.Queue()
+            self._task = self.ctx.loop.create_task(self._run())
+
+    async def send(self, batch):
+        self._start()   # constructed off the loop and not started yet
+        await self._credits.acquire()
+        self._seq += 1
+        _stamp(self.ctx, batch, self.session, self._seq)
+        self._unacked.append(batch)
+        self._queue.put_nowait(batch)
+
+    @staticmethod
+    async def _requests(q):
+        while True:
+            batch = await q.get()
+            if batch is None:
+                return
+            yield batch
+
+    async def _run(self):
+        backoff = 0.05
+        while True:
+            q = asyncio.Queue()
+            for batch in self._unacked:
+                q.put_nowait(batch)
+            self._queue = q
+
+            try:
+                async for _ack in self.open_stream(self._requests(q)):
+                    self._unacked.popleft()
+                    self._credits.release()
+                    backoff = 0.05
+            except grpc.RpcError as e:
+                print(f"[{self.ctx.node_id}] stream to {self.port} broken ({e.code()}), reconnecting in {backoff:.2f}s", flush=True)
+            except Exception:
+                print(f"[{self.ctx.node_id}] stream to {self.port} failed, reconnecting in {backoff:.2f}s", flush=True)
+                traceback.print_exc()
+
+            q.put_nowait(None)
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 2.0)
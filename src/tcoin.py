@@ -0,0 +1,145 @@
+# src/tcoin.py
+"""
+Threshold common coin (Cachin-Kursawe-Shoup) over secp256k1.
+
+A trusted dealer Shamir-shares a secret x with threshold t = f+1; node i
+holds x_i and everyone knows VK_i = x_i*G (src/keys.py loads both; the
+seed-derived keyring() below is for tests only). The coin named C is the low bit
+of H(x*H(C)) where H(C) is a curve point: node i's share is S_i = x_i*H(C)
+plus a DLEQ proof that log_G(VK_i) = log_H(C)(S_i), and any t valid shares
+interpolate x*H(C) in the exponent. Nobody learns the coin before f+1
+nodes released shares, and every t-subset yields the same coin.
+
+Shares are hex strings: index (4 bytes, big-endian) | S_i | A1 | A2 (33 bytes each) | z (32 bytes).
+"""
+import functools
+import hashlib
+import secrets
+
+from . import schnorr as ec
+
+INDEX_BYTES = 4                   # fixed-width signer index, so n is not capped at 256
+
+def _scalar(*parts: bytes) -> int:
+    return int.from_bytes(hashlib.sha256(b"".join(parts)).digest(), "big") % ec.N
+
+def shamir(coeffs, n: int):
+    """Polynomial with these coefficients (degree t-1) -> ([x_i], [VK_i]) for node indices 0..n-1 (Shamir point i+1)."""
+    xs = []
+    for i in range(n):
+        acc = 0
+        for a in reversed(coeffs):
+            acc = (acc * (i + 1) + a) % ec.N
+        xs.append(acc)
+    return xs, [ec.mul(x) for x in xs]
+
+def deal(n: int, t: int):
+    """Trusted dealer: fresh random sharing -> ([x_i], [VK_i])."""
+    return shamir([1 + secrets.randbelow(ec.N - 1) for _ in range(t)], n)
+
+@functools.lru_cache(maxsize=None)
+def keyring(seed: str, n: int, t: int):
+    """
+    Sharing derived from a public seed: anyone can compute every x_i (and
+    the coin ahead of time). Insecure; for tests and benchmarks only.
+    """
+    return shamir([_scalar(b"tcoin|", seed.encode(), b"|", str(j).encode()) for j in range(t)], n)
+
+@functools.lru_cache(maxsize=1024)
+def hash_to_point(name: bytes):
+    # try-and-increment: first x = H(name|ctr) that lands on the curve
+    ctr = 0
+    while True:
+        x = hashlib.sha256(b"tcoin-h2c|" + name + ctr.to_bytes(4, "big")).digest()
+        pt = ec.decode_point(b"\x02" + x)
+        if pt is not None:
+            return pt
+        ctr += 1
+
+def _challenge(Hc, vk, S, A1, A2) -> int:
+    return _scalar(*(ec.encode_point(p) for p in (ec.G, Hc, vk, S, A1, A2)))
+
+def make_share(x_i: int, vk_i, index: int, name: bytes) -> str:
+    """Share of node `index` (secret x_i, VK_i = x_i*G) for the coin named name."""
+    Hc = hash_to_point(name)
+    S = ec.mul(x_i, Hc)
+    r = _scalar(b"tcoin-nonce|", x_i.to_bytes(32, "big"), name) or 1
+    A1, A2 = ec.mul(r), ec.mul(r, Hc)
+    z = (r + _challenge(Hc, vk_i, S, A1, A2) * x_i) % ec.N
+    return (index.to_bytes(INDEX_BYTES, "big") + b"".join(ec.encode_point(p) for p in (S, A1, A2))
+            + z.to_bytes(32, "big")).hex()
+
+def parse_share(share: str):
+    """-> (index, S, A1, A2, z) or None."""
+    try:
+        raw = bytes.fromhex(share)
+    except (TypeError, ValueError):
+        return None
+    if len(raw) != INDEX_BYTES + 3 * 33 + 32:
+        return None
+    at = INDEX_BYTES
+    pts = [ec.decode_point(raw[at + 33 * k: at + 33 * (k + 1)]) for k in range(3)]
+    z = int.from_bytes(raw[at + 3 * 33:], "big")
+    if None in pts or z >= ec.N:
+        return None
+    return (int.from_bytes(raw[:at], "big"), *pts, z)
+
+def _terms(Hc, vk, parsed, a: int, b: int):
+    # a*(z*G - A1 - c*VK) + b*(z*H - A2 - c*S): zero for a valid share
+    _, S, A1, A2, z = parsed
+    c = _challenge(Hc, vk, S, A1, A2)
+    return (a * z, b * z), [(-a, A1), (-a * c, vk), (-b, A2), (-b * c, S)]
+
+def _check(Hc, pairs, gz: int, hz: int) -> bool:
+    return ec._multi_mul(pairs + [(gz, ec.G), (hz, Hc)]) is None
+
+def _valid(Hc, vk, parsed) -> bool:
+    # both DLEQ equations on their own: z*G == A1 + c*VK and z*H == A2 + c*S
+    _, S, A1, A2, z = parsed
+    c = _challenge(Hc, vk, S, A1, A2)
+    return (ec._multi_mul([(z, ec.G), (-1, A1), (-c, vk)]) is None
+            and ec._multi_mul([(z, Hc), (-1, A2), (-c, S)]) is None)
+
+def verify_shares(vks, name: bytes, items):
+    """
+    items: [(expected index, share)] -> [ok], against VK_i = vks[i]. All
+    well-formed shares are checked with one random linear combination (a
+    single multi-scalar multiplication) in which each equation of each share
+    gets its own random coefficient, so errors cannot cancel out; only if
+    that fails are they checked one by one.
+    """
+    n = len(vks)
+    Hc = hash_to_point(name)
+    parsed = []
+    for index, share in items:
+        p = parse_share(share)
+        parsed.append(p if p is not None and p[0] == index and index < n else None)
+
+    pairs, gz, hz = [], 0, 0
+    for p in parsed:
+        if p is None:
+            continue
+        a, b = 1 + secrets.randbits(128), 1 + secrets.randbits(128)
+        (dg, dh), terms = _terms(Hc, vks[p[0]], p, a, b)
+        gz, hz = gz + dg, hz + dh
+        pairs += terms
+    if _check(Hc, pairs, gz, hz):
+        return [p is not None for p in parsed]
+    return [p is not None and _valid(Hc, vks[p[0]], p) for p in parsed]
+
+def combine(t: int, shares) -> int:
+    """Any t verified shares -> coin bit (Lagrange interpolation at 0 in the exponent)."""
+    parsed = [parse_share(s) for s in shares][:t]
+    if len(parsed) < t or None in parsed:
+        raise ValueError(f"need {t} well-formed shares")
+    xs = [p[0] + 1 for p in parsed]
+    pairs = []
+    for m, p in enumerate(parsed):
+        num, den = 1, 1
+        for j, xj in enumerate(xs):
+            if j != m:
+                num = num * xj % ec.N
+                den = den * (xj - xs[m]) % ec.N
+        pairs.append((num * pow(den, -1, ec.N), p[1]))
+    point = ec._affine(ec._multi_mul(pairs))
+    return hashlib.sha256(b"tcoin-out|" + ec.encode_point(point)).digest()[0] & 1
@@ -1,45 +1,181 @@
 # src/transport.py
+import asyncio
 import grpc
 from proto import helloworld_pb2
 from proto import helloworld_pb2_grpc
+from proto import bft_pb2_grpc
 from config import constants as Constants
+from .outbox import PeerOutbox, AioPeerOutbox, record_send
+from .stream import PeerStream, AioPeerStream
+
+def _channel(ctx, port: int):
+    # caller holds ctx.stub_lock; aio nodes (ctx.loop set) get grpc.aio channels
+    if port not in ctx.channels:
+        if ctx.loop is not None:
+            ctx.channels[port] = grpc.aio.insecure_channel(f"localhost:{port}")
+        else:
+            ctx.channels[port] = grpc.insecure_channel(f"localhost:{port}")
+    return ctx.channels[port]
 
 def get_stub(ctx, port: int):
+    if ctx.loopback is not None:
+        return ctx.loopback.stub(ctx.port, port)
     with ctx.stub_lock:
         if port not in ctx.stubs:
-            ch = grpc.insecure_channel(f"localhost:{port}")
-            ctx.stubs[port] = helloworld_pb2_grpc.GreeterStub(ch)
+            ctx.stubs[port] = helloworld_pb2_grpc.GreeterStub(_channel(ctx, port))
         return ctx.stubs[port]
 
+def get_node_stub(ctx, port: int):
+    with ctx.stub_lock:
+        if port not in ctx.node_stubs:
+            ctx.node_stubs[port] = bft_pb2_grpc.NodeStub(_channel(ctx, port))
+        return ctx.node_stubs[port]
+
+def get_stream(ctx, port: int):
+    with ctx.stub_lock:
+        if port not in ctx.streams:
+            open_stream = lambda requests: get_node_stub(ctx, port).Stream(requests, wait_for_ready=True)
+            stream_cls = AioPeerStream if ctx.loop is not None else PeerStream
+            ctx.streams[port] = stream_cls(ctx, port, open_stream)
+        return ctx.streams[port]
+
+def get_outbox(ctx, port: int, timeout_s: float = 2.0):
+    with ctx.stub_lock:
+        if port not in ctx.outboxes:
+            if getattr(Constants, "TRANSPORT", "stream") == "stream":
+                send_batch = lambda p, batch: get_stream(ctx, p).send(batch)
+            else:
+                send_batch = lambda p, batch: get_node_stub(ctx, p).SendBatch(batch, timeout=timeout_s)
+            outbox_cls = AioPeerOutbox if ctx.loop is not None else PeerOutbox
+            ctx.outboxes[port] = outbox_cls(ctx, port, send_batch)
+        return ctx.outboxes[port]
+
+def peer_ports(ctx):
+    return [port for port in Constants.PORTLIST[: ctx.n] if port != ctx.port]
+
+def _on_done(ctx, method: str, port: int, fut, on_reply):
+    try:
+        reply = fut.result()
+    except Exception as e:
+        record_send(ctx, port, ok=False)
+        print(f"[{ctx.node_id}] {method} send failed to {port}: {e}", flush=True)
+        return
+    record_send(ctx, port, ok=True)
+    if on_reply is not None:
+        on_reply(port, reply)
+
+def send(ctx, port: int, method: str, req, timeout_s: float = 2.0, on_reply=None, stub_for=None):
+    """
+    Send req to one peer without blocking the caller.
+
+    With Constants.OUTBOX enabled the request is queued on the peer's
+    outbox and coalesced with whatever else is pending for that peer
+    (no per-message reply; returns None). Otherwise a gRPC future is
+    returned (scheduled on ctx.loop for aio nodes); completion is reported
+    through on_reply(port, reply). Both paths update ctx.send_ok /
+    ctx.send_failures.
+    """
+    if getattr(Constants, "OUTBOX", True) and ctx.loopback is None:
+        get_outbox(ctx, port, timeout_s).put(method, req)
+        return None
+
+    if stub_for is None:
+        stub_for = lambda port: get_stub(ctx, port)
+
+    if ctx.loop is not None:
+        # schedule the call on the node's event loop; never awaited inline
+        async def call():
+            return await getattr(stub_for(port), method)(req, timeout=timeout_s)
+        fut = asyncio.run_coroutine_threadsafe(call(), ctx.loop)
+    else:
+        try:
+            fut = getattr(stub_for(port), method).future(req, timeout=timeout_s)
+        except Exception as e:
+            record_send(ctx, port, ok=False)
+            print(f"[{ctx.node_id}] {method} send failed to {port}: {e}", flush=True)
+            return None
+    fut.add_done_callback(lambda f: _on_done(ctx, method, port, f, on_reply))
+    return fut
+
+def broadcast(ctx, method: str, req, timeout_s: float = 2.0, on_reply=None, stub_for=None):
+    """
+    send() req to every peer concurrently. Returns as soon as all sends are
+    dispatched: {port: future} in direct mode, {} when going through outboxes.
+    """
+    futs = {}
+    for port in peer_ports(ctx):
+        fut = send(ctx, port, method, req, timeout_s, on_reply, stub_for)
+        if fut is not None:
+            futs[port] = fut
+    return futs
+
+def send_vcbc_echo(ctx, proposer: str, inst: int, step: int, value: str):
+    """Unicast my VCBC ECHO for proposer's value back to the proposer."""
+    msg = helloworld_pb2.mDict(instance=inst, step=step, ts="1", value=value, id=ctx.node_id)
+    port = Constants.PORTLIST[ctx.id_to_index[proposer]]
+    send(ctx, port, "VCBC", helloworld_pb2.VCBCRequest(msg=msg))
+    return msg
+
 def broadcast_vcbc(ctx, inst: int, step: int, value: str, timeout_s: float = 2.0):
     msg = helloworld_pb2.mDict(instance=inst, step=step, ts="1", value=value, id=ctx.node_id)
     req = helloworld_pb2.VCBCRequest(msg=msg)
 
-    for port in Constants.PORTLIST[: ctx.n]:
-        if port == ctx.port:
-            continue
-        try:
-            reply = get_stub(ctx, port).VCBC(req, timeout=timeout_s)
-            if reply and reply.msg:
-                print(f"[{ctx.node_id}] 📨 VCBC reply from {reply.msg.id} inst={reply.msg.instance} step={reply.msg.step}", flush=True)
-        except Exception as e:
-            print(f"[{ctx.node_id}] VCBC send failed to {port}: {e}", flush=True)
+    def on_reply(port, reply):
+        if reply and reply.msg:
+            print(f"[{ctx.node_id}] 📨 VCBC reply from {reply.msg.id} inst={reply.msg.instance} step={reply.msg.step}", flush=True)
 
+    broadcast(ctx, "VCBC", req, timeout_s=timeout_s, on_reply=on_reply)
     return msg  # return my own msg for self-delivery
 
-def broadcast_certproposal(ctx, inst: int, proposer: str, value: str, proof: str, timeout_s: float = 2.0):
+def send_vcbc_fragments(ctx, inst: int, step: int, wires: dict):
+    """Unicast fragment i to node i; returns my own fragment msg for self-delivery."""
+    mine = None
+    for i, wire in wires.items():
+        msg = helloworld_pb2.mDict(instance=inst, step=step, ts="1", value=wire, id=ctx.node_id)
+        port = Constants.PORTLIST[i]
+        if port == ctx.port:
+            mine = msg
+        else:
+            send(ctx, port, "VCBC", helloworld_pb2.VCBCRequest(msg=msg))
+    return mine
+
+def broadcast_certproposal(ctx, inst: int, proposer: str, digest: str, proof: str, timeout_s: float = 2.0):
     req = helloworld_pb2.PRORequest(
         id=proposer,
         type="CERTPROPOSAL",
         instance=inst,
         proof=proof,
-        value=value,
+        value=digest,
     )
-    for port in Constants.PORTLIST[: ctx.n]:
-        if port == ctx.port:
-            continue
-        try:
-            get_stub(ctx, port).Propose(req, timeout=timeout_s)
-            print(f"[{ctx.node_id}] -> CERTPROPOSAL sent to {port} inst={inst} proposer={proposer}", flush=True)
-        except Exception as e:
-            print(f"[{ctx.node_id}] CERTPROPOSAL send failed to {port}: {e}", flush=True)
\ No newline at end of file
+    broadcast(
+        ctx, "Propose", req, timeout_s=timeout_s,
+        on_reply=lambda port, reply: print(f"[{ctx.node_id}] -> CERTPROPOSAL sent to {port} inst={inst} proposer={proposer}", flush=True),
+    )
+
+def send_certproposal(ctx, to: str, inst: int, proposer: str, digest: str, proof: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=proposer, type="CERTPROPOSAL", instance=inst, proof=proof, value=digest)
+    send(ctx, Constants.PORTLIST[ctx.id_to_index[to]], "Propose", req, timeout_s=timeout_s)
+
+def broadcast_certfetch(ctx, inst: int, proposer: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="CERTFETCH", instance=inst, proof="", value=proposer)
+    broadcast(ctx, "Propose", req, timeout_s=timeout_s)
+
+def broadcast_fetch(ctx, inst: int, digest: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="FETCH", instance=inst, proof="", value=digest)
+    broadcast(ctx, "Propose", req, timeout_s=timeout_s)
+
+def broadcast_catchup(ctx, inst: int, count: int, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="CATCHUP", instance=inst, proof="", value=str(count))
+    broadcast(ctx, "Propose", req, timeout_s=timeout_s)
+
+def send_decided(ctx, to: str, inst: int, wire: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="DECIDED", instance=inst, proof="", value=wire)
+    send(ctx, Constants.PORTLIST[ctx.id_to_index[to]], "Propose", req, timeout_s=timeout_s)
+
+def send_payload(ctx, to: str, inst: int, digest: str, value: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="PAYLOAD", instance=inst, proof=digest, value=value)
+    send(ctx, Constants.PORTLIST[ctx.id_to_index[to]], "Propose", req, timeout_s=timeout_s)
+
+def send_fragment(ctx, to: str, inst: int, root: str, wire: str, timeout_s: float = 2.0):
+    req = helloworld_pb2.PRORequest(id=ctx.node_id, type="FRAGMENT", instance=inst, proof=root, value=wire)
+    send(ctx, Constants.PORTLIST[ctx.id_to_index[to]], "Propose", req, timeout_s=timeout_s)
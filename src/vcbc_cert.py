@@ -1,7 +1,23 @@
 # src/vcbc_cert.py
+import base64
+import hashlib
+import json
 from config import constants as Constants
 from . import transport
-from . import bitvec  # add at top or inside
+from . import bitvec
+from . import certs
+from . import metrics
+from . import pruning
+from . import erasure
+from . import merkle
+
+VCBC_SEND = 1       # proposer -> all: here is my value
+VCBC_ECHO = 2       # receiver -> proposer: I vouch for it (counts towards the QC)
+VCBC_DISPERSE = 3   # proposer -> node i: fragment i of my value + Merkle branch (DISPERSAL mode)
+
+def digest(value: str) -> str:
+    # fixed-size handle for a payload: ECHO, certs and CERTPROPOSAL only carry this
+    return hashlib.sha256(value.encode()).hexdigest()
 
 def _cert_add(ctx, inst: int, tag: str, step: int, value: str, sender: str) -> bool:
     key = (inst, tag, step, value)
@@ -12,49 +28,239 @@ def _cert_add(ctx, inst: int, tag: str, step: int, value: str, sender: str) -> b
     # fire once at crossing quorum
     return before < ctx.q and after >= ctx.q
 
-def try_broadcast_my_cert_if_ready(ctx, inst: int, step: int, value: str):
+def try_broadcast_my_cert_if_ready(ctx, inst: int, step: int, d: str):
     # need local input first
     pkey = Constants.INSTANCE + str(inst)
     if pkey not in ctx.proposeMessage:
         return
 
-    my_value = ctx.proposeMessage[pkey][Constants.VALUE]
-    if my_value != value:
+    mine = ctx.proposeMessage[pkey]
+    if mine[Constants.DIGEST] != d:
         return
 
     if inst in ctx.my_cert_sent:
         return
 
-    cert_key = (inst, "VCBC", step, value)
+    cert_key = (inst, "VCBC", step, d)
     signers = ctx.certs.get(cert_key, set())
     if len(signers) < ctx.q:
         return
 
     ctx.my_cert_sent.add(inst)
-    proof = f"QC|proposer={ctx.node_id}|inst={inst}|step={step}|signers=" + ",".join(sorted(signers))
+    shares = ctx.cert_shares.get((inst, d), {})
+    ctx.verifier.offload(
+        inst, ctx.verifier.backend.combine,
+        (certs.cert_message(ctx.node_id, inst, d), {s: shares.get(s, "") for s in signers}),
+        lambda cert: _broadcast_my_cert(ctx, inst, step, d, mine, cert),
+    )
+
+def _broadcast_my_cert(ctx, inst: int, step: int, d: str, mine, cert: str):
+    if pruning.is_stale(ctx, inst):
+        return
+    proof = f"QC|proposer={ctx.node_id}|inst={inst}|step={step}|digest={d}|" + cert
+    # my own certificate never needs checking when it comes back via BITVEC/decision
+    ctx.verifier.cache.add(ctx.verifier.cache.key("cert", certs.cert_message(ctx.node_id, inst, d), proof))
 
-    ctx.certified_props.setdefault(inst, {})[ctx.node_id] = {"value": value, "proof": proof}
+    ctx.certified_props.setdefault(inst, {})[ctx.node_id] = {"value": mine[Constants.VALUE], "digest": d, "proof": proof}
 
-    print(f"[{ctx.node_id}] 📣 (late/now) broadcasting CERTPROPOSAL inst={inst} proposer={ctx.node_id} value={value}", flush=True)
-    transport.broadcast_certproposal(ctx, inst=inst, proposer=ctx.node_id, value=value, proof=proof)
+    print(f"[{ctx.node_id}] 📣 (late/now) broadcasting CERTPROPOSAL inst={inst} proposer={ctx.node_id} digest={d[:12]}", flush=True)
+    metrics.mark(ctx, inst, "vcbc_cert")
+    transport.broadcast_certproposal(ctx, inst=inst, proposer=ctx.node_id, digest=d, proof=proof)
 
 def on_vcbc(ctx, sender: str, msg):
-    inst = msg.instance
-    step = msg.step
-    value = msg.value
+    """
+    step VCBC_SEND: `sender` proposes msg.value (the only time the full payload
+    travels) -> keep the payload, echo its digest back to the proposer
+    (once per (inst, proposer); my own proposal echoes locally).
+    step VCBC_ECHO: `sender` vouches for the digest of my proposal with a
+    signature share ("<digest>|<share>") -> verify off-actor, then count towards its QC.
+    """
+    if msg.step == VCBC_ECHO:
+        d, _, share = msg.value.partition("|")
+        cert_msg = certs.cert_message(ctx.node_id, msg.instance, d)
+        ctx.verifier.verify_share(
+            msg.instance, sender, cert_msg, share,
+            lambda ok: _on_echo(ctx, sender, msg.instance, d, share) if ok else
+                print(f"[{ctx.node_id}] ⚠️ bad VCBC share inst={msg.instance} from={sender}", flush=True),
+        )
+        return
+    if msg.step == VCBC_DISPERSE:
+        _on_fragment_send(ctx, sender, msg)
+        return
+
+    key = (msg.instance, sender)
+    if key in ctx.vcbc_echoed:
+        return
+    ctx.vcbc_echoed.add(key)
+
+    d = digest(msg.value)
+    ctx.payloads[(msg.instance, d)] = msg.value
+    _echo(ctx, sender, msg.instance, d)
+    _join(ctx, sender, msg.instance, msg.value)
+
+def _join(ctx, sender: str, inst: int, value: str = None):
+    # a peer started inst: the mempool joins with a batch of its own (empty if need be)
+    if sender != ctx.node_id and ctx.mempool is not None:
+        ctx.mempool.on_peer_proposal(inst, value)
+
+def _echo(ctx, proposer: str, inst: int, d: str):
+    ctx.verifier.offload(
+        inst, ctx.verifier.backend.sign, (ctx.node_id, certs.cert_message(proposer, inst, d)),
+        lambda share: _send_echo(ctx, proposer, inst, d, share),
+    )
 
-    crossed = _cert_add(ctx, inst, "VCBC", step, value, sender)
+def _send_echo(ctx, proposer: str, inst: int, d: str, share: str):
+    if pruning.is_stale(ctx, inst):
+        return
+    if proposer == ctx.node_id:
+        _on_echo(ctx, ctx.node_id, inst, d, share)
+    else:
+        transport.send_vcbc_echo(ctx, proposer=proposer, inst=inst, step=VCBC_ECHO, value=f"{d}|{share}")
+
+def _on_echo(ctx, sender: str, inst: int, d: str, share: str):
+    ctx.cert_shares.setdefault((inst, d), {})[sender] = share
+    crossed = _cert_add(ctx, inst, "VCBC", VCBC_SEND, d, sender)
     if not crossed:
         return
 
-    print(f"[{ctx.node_id}] ✅ VCBC cert ready inst={inst} step={step} value={value} (q={ctx.q})", flush=True)
+    print(f"[{ctx.node_id}] ✅ VCBC cert ready inst={inst} step={VCBC_SEND} digest={d[:12]} (q={ctx.q})", flush=True)
     # whether or not we already have local input, try now
-    try_broadcast_my_cert_if_ready(ctx, inst, step, value)
+    try_broadcast_my_cert_if_ready(ctx, inst, VCBC_SEND, d)
 
-def on_certproposal(ctx, proposer: str, inst: int, value: str, proof: str):
+def on_certproposal(ctx, proposer: str, inst: int, digest: str, proof: str):
+    if proposer in ctx.certified_props.get(inst, {}):
+        return
+    ctx.verifier.verify_cert(
+        inst, certs.cert_message(proposer, inst, digest), proof,
+        lambda ok: _accept_certproposal(ctx, proposer, inst, digest, proof) if ok else
+            print(f"[{ctx.node_id}] ⚠️ invalid CERTPROPOSAL inst={inst} proposer={proposer}", flush=True),
+    )
+
+def _accept_certproposal(ctx, proposer: str, inst: int, digest: str, proof: str):
     props = ctx.certified_props.setdefault(inst, {})
     if proposer not in props:
-        props[proposer] = {"value": value, "proof": proof}
+        # payload usually arrived with the proposer's VCBC SEND; if not it is fetched on decide
+        props[proposer] = {"value": ctx.payloads.get((inst, digest)), "digest": digest, "proof": proof}
     cnt = len(props)
-    print(f"[{ctx.node_id}] ✅ received CERTPROPOSAL inst={inst} proposer={proposer} value={value} (count={cnt})", flush=True)
-    bitvec.on_certproposal_maybe_broadcast_bitvec(ctx, inst)
\ No newline at end of file
+    print(f"[{ctx.node_id}] ✅ received CERTPROPOSAL inst={inst} proposer={proposer} digest={digest[:12]} (count={cnt})", flush=True)
+    bitvec.on_certproposal_maybe_broadcast_bitvec(ctx, inst)
+    _resume_mvba(ctx, inst)
+
+def request_certproposal(ctx, inst: int, proposer: str):
+    """MVBA picked a proposer whose CERTPROPOSAL never reached us: ask every peer for it."""
+    if (inst, proposer) in ctx.certprop_requested:
+        return
+    ctx.certprop_requested.add((inst, proposer))
+    print(f"[{ctx.node_id}] 🔎 FETCH CERTPROPOSAL inst={inst} proposer={proposer}", flush=True)
+    transport.broadcast_certfetch(ctx, inst=inst, proposer=proposer)
+
+def on_certfetch(ctx, requester: str, inst: int, proposer: str):
+    entry = ctx.certified_props.get(inst, {}).get(proposer)
+    if entry is not None:
+        transport.send_certproposal(ctx, to=requester, inst=inst, proposer=proposer, digest=entry["digest"], proof=entry["proof"])
+
+def _resume_mvba(ctx, inst: int):
+    idx = ctx.mvba_waiting.get(inst)
+    if idx is not None:
+        # the MVBA decision was parked on this certificate / payload: finalize now
+        ctx.mvba_on_aba_decide((inst, idx), 1)
+
+def request_payload(ctx, inst: int, d: str):
+    """Ask every peer for a payload we only know by digest (>= f+1 honest echoers hold it)."""
+    if (inst, d) in ctx.payload_requested:
+        return
+    ctx.payload_requested.add((inst, d))
+    print(f"[{ctx.node_id}] 🔎 FETCH payload inst={inst} digest={d[:12]}", flush=True)
+    transport.broadcast_fetch(ctx, inst=inst, digest=d)
+
+def on_fetch(ctx, requester: str, inst: int, d: str):
+    # dispersed value: answer with our fragment, which is all most nodes hold
+    wire = ctx.fragments.get((inst, d))
+    if wire is not None:
+        transport.send_fragment(ctx, to=requester, inst=inst, root=d, wire=wire)
+        return
+    value = ctx.payloads.get((inst, d))
+    if value is not None:
+        transport.send_payload(ctx, to=requester, inst=inst, digest=d, value=value)
+
+def on_payload(ctx, inst: int, d: str, value: str):
+    if (inst, d) in ctx.payloads or digest(value) != d:
+        return
+    _store_payload(ctx, inst, d, value)
+
+def _store_payload(ctx, inst: int, d: str, value: str):
+    ctx.payloads[(inst, d)] = value
+    for entry in ctx.certified_props.get(inst, {}).values():
+        if entry["digest"] == d and entry["value"] is None:
+            entry["value"] = value
+    _resume_mvba(ctx, inst)
+
+# ---- AVID-style dispersal (Constants.DISPERSAL): the cert commits to a Merkle root over fragments
+
+def _k(ctx) -> int:
+    # any f+1 fragments rebuild the value; a QC of q echoers guarantees f+1 honest holders
+    return ctx.f + 1
+
+def _frag_wire(root: str, index: int, frag: bytes, branch) -> str:
+    b64 = lambda b: base64.b64encode(b).decode()
+    return json.dumps({"root": root, "i": index, "frag": b64(frag), "branch": [b64(h) for h in branch]}, separators=(",", ":"))
+
+def _frag_parse(wire: str):
+    """-> (root, index, fragment, branch) if the Merkle branch checks out, else None."""
+    try:
+        m = json.loads(wire)
+        root, index = m["root"], int(m["i"])
+        frag = base64.b64decode(m["frag"])
+        branch = [base64.b64decode(h) for h in m["branch"]]
+    except (TypeError, ValueError, KeyError):
+        return None
+    if not merkle.verify(root, index, frag, branch):
+        return None
+    return root, index, frag, branch
+
+def disperse(ctx, inst: int, value: str):
+    """Erasure-code my value -> (Merkle root, {node index -> VCBC_DISPERSE fragment wire})."""
+    frags = erasure.encode(value.encode(), ctx.n, _k(ctx))
+    root, branches = merkle.tree(frags)
+    ctx.payloads[(inst, root)] = value
+    wires = {i: _frag_wire(root, i, frags[i], branches[i]) for i in range(ctx.n)}
+    print(f"[{ctx.node_id}] 🧩 DISPERSE inst={inst} root={root[:12]} n={ctx.n} k={_k(ctx)} frag_bytes={len(frags[0])}", flush=True)
+    return root, wires
+
+def _on_fragment_send(ctx, sender: str, msg):
+    key = (msg.instance, sender)
+    if key in ctx.vcbc_echoed:
+        return
+    parsed = _frag_parse(msg.value)
+    if parsed is None or parsed[1] != ctx.id_to_index[ctx.node_id]:
+        print(f"[{ctx.node_id}] ⚠️ bad VCBC fragment inst={msg.instance} from={sender}", flush=True)
+        return
+    ctx.vcbc_echoed.add(key)
+
+    root = parsed[0]
+    ctx.fragments[(msg.instance, root)] = msg.value
+    _echo(ctx, sender, msg.instance, root)
+    _join(ctx, sender, msg.instance)
+
+def on_fragment(ctx, inst: int, root: str, wire: str):
+    """Retrieval reply: collect verified fragments for root until k of them rebuild the value."""
+    if (inst, root) in ctx.payloads:
+        return
+    parsed = _frag_parse(wire)
+    if parsed is None or parsed[0] != root:
+        return
+    got = ctx.fragments_recv.setdefault((inst, root), {})
+    got[parsed[1]] = parsed[2]
+    if len(got) < _k(ctx):
+        return
+
+    data = erasure.decode(got, _k(ctx))
+    ctx.fragments_recv.pop((inst, root), None)
+    # re-encode: a proposer that dispersed inconsistent fragments is caught identically by every honest node
+    if merkle.root(erasure.encode(data, ctx.n, _k(ctx))) != root:
+        print(f"[{ctx.node_id}] ❌ inconsistent dispersal inst={inst} root={root[:12]}: certificate rejected", flush=True)
+        ctx.bad_dispersals.add((inst, root))
+        _resume_mvba(ctx, inst)
+        return
+    print(f"[{ctx.node_id}] 🧩 RETRIEVED inst={inst} root={root[:12]} bytes={len(data)}", flush=True)
+    _store_payload(ctx, inst, root, data.decode(errors="replace"))
@@ -0,0 +1,51 @@
+# tests/test_abba.py
+import pytest
+
+from config import constants as Constants
+from src import abba, transport
+from src.microbench import make_ctx
+
+def test_tally_counts_each_sender_once():
+    t = abba.Tally()
+    assert t.add("id1", 1) and t.add("id2", 0) and t.add("id3", abba.ABSTAIN)
+    assert not t.add("id1", 0)                         # a second vote from id1 is ignored
+    assert (t.total(), t.count(0), t.count(1), t.count(abba.ABSTAIN)) == (3, 1, 1, 1)
+    assert t.fire_once("quorum", t.total() >= 3)
+    assert not t.fire_once("quorum", True)              # only the first crossing fires
+    assert not t.fire_once("other", False)
+
+@pytest.fixture
+def ctx(monkeypatch):
+    ctx = make_ctx(4)
+    ctx.abba_started.add((1, 0))
+    ctx.abba_round[(1, 0)] = 1
+    ctx.quorums = []
+    real = abba._on_quorum
+
+    def recording(ctx_, get_stub, aid, rnd, mtype, c0, c1, total):
+        ctx.quorums.append((rnd, mtype, c0, c1, total))
+        return real(ctx_, get_stub, aid, rnd, mtype, c0, c1, total)
+
+    monkeypatch.setattr(abba, "_on_quorum", recording)
+    return ctx
+
+def _vote(ctx, sender, mtype, bit, rnd=1):
+    get_stub = lambda port: transport.get_stub(ctx, port)
+    abba.on_abba_message(ctx, get_stub, inst=1, idx=0, rnd=rnd, mtype=mtype, sender=sender, bit=bit)
+
+def test_quorum_step_runs_once_with_the_counts_at_crossing(ctx):
+    _vote(ctx, "id2", Constants.PREVOTE, 1)
+    _vote(ctx, "id3", Constants.PREVOTE, 0)
+    _vote(ctx, "id3", Constants.PREVOTE, 1)             # duplicate sender
+    assert ctx.quorums == []
+    _vote(ctx, "id4", Constants.PREVOTE, 1)
+    _vote(ctx, "id1", Constants.PREVOTE, 1)             # past the quorum: no second step
+    assert ctx.quorums == [(1, Constants.PREVOTE, 1, 2, 3)]
+    # mixed prevotes -> this node mainvotes ABSTAIN, once
+    assert ((1, 0), 1, Constants.MAINVOTE) in ctx.abba_sent
+
+def test_unanimous_mainvotes_decide(ctx):
+    for sender in ("id2", "id3", "id4"):
+        _vote(ctx, sender, Constants.MAINVOTE, 0)
+    assert ctx.abba_decided[(1, 0)] == 0
+    assert ctx.quorums == [(1, Constants.MAINVOTE, 3, 0, 3)]
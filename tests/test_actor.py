@@ -0,0 +1,44 @@
+# tests/test_actor.py
+import threading
+
+from src.actor import ActorPool, ProtocolActor
+
+def test_steps_run_in_submission_order_and_survive_errors():
+    actor = ProtocolActor()
+    seen = []
+
+    def boom():
+        raise RuntimeError("step failed")
+
+    actor.submit(seen.append, 1)
+    actor.submit(boom)
+    actor.submit(seen.append, 2)
+    actor.close()                     # runs what is queued first
+    assert seen == [1, 2]
+
+def test_an_instance_always_runs_on_the_same_shard():
+    pool = ActorPool(shards=3)
+    threads = {}
+    lock = threading.Lock()
+
+    def note(inst):
+        with lock:
+            threads.setdefault(inst, set()).add(threading.current_thread().name)
+
+    for _ in range(20):
+        for inst in range(6):
+            pool.submit(inst, note, inst)
+    pool.close()
+    assert all(len(names) == 1 for names in threads.values())
+    assert threads[0] == threads[3] != threads[1]
+    assert {pool.shard(k) for k in range(6)} == {0, 1, 2}
+
+def test_shards_run_in_parallel():
+    pool = ActorPool(shards=2)
+    inside = threading.Barrier(2, timeout=5)
+    done = []
+    # both steps wait for each other: only possible on two threads
+    pool.submit(0, lambda: done.append(inside.wait()))
+    pool.submit(1, lambda: done.append(inside.wait()))
+    pool.close()
+    assert sorted(done) == [0, 1]
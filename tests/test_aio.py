@@ -0,0 +1,60 @@
+# tests/test_aio.py
+import asyncio
+import socket
+
+import grpc
+import pytest
+
+from proto import helloworld_pb2, helloworld_pb2_grpc
+from config import constants as Constants
+from src import aio_server
+from src.context import NodeContext
+
+def _free_ports(k):
+    socks = [socket.socket() for _ in range(k)]
+    for s in socks:
+        s.bind(("127.0.0.1", 0))
+    ports = [s.getsockname()[1] for s in socks]
+    for s in socks:
+        s.close()
+    return ports
+
+@pytest.fixture
+def ports(monkeypatch):
+    ports = _free_ports(4)
+    monkeypatch.setattr(Constants, "N", 4)
+    monkeypatch.setattr(Constants, "PORTLIST", ports)
+    for k, v in (("PRUNE_INTERVAL_S", 0), ("STALL_SKIP_S", 0), ("CATCHUP_AFTER_S", 0)):
+        monkeypatch.setattr(Constants, k, v, raising=False)
+    return ports
+
+async def _submit(port, inst, value):
+    async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+        await channel.channel_ready()
+        stub = helloworld_pb2_grpc.GreeterStub(channel)
+        req = helloworld_pb2.PRORequest(id="client", type="SUBMIT", instance=inst, proof="", value=value)
+        return (await stub.Propose(req, timeout=30)).yes
+
+def test_four_aio_nodes_in_one_loop_agree(ports):
+    ctxs = []
+
+    async def main():
+        for i, port in enumerate(ports):
+            ctx = NodeContext(node_id=f"id{i + 1}", port=port)
+            ctx.init_quorum()
+            ctxs.append(ctx)
+        servers = [asyncio.create_task(aio_server.serve(ctx)) for ctx in ctxs]
+        try:
+            for inst in (1, 2):
+                replies = await asyncio.gather(*(_submit(p, inst, f"v{inst}-{p}") for p in ports))
+                (value,) = set(replies)
+                assert value in {f"v{inst}-{p}" for p in ports}
+        finally:
+            for task in servers:
+                task.cancel()
+            await asyncio.gather(*servers, return_exceptions=True)
+
+    asyncio.run(main())
+    # every protocol step ran on the loop, through the LoopActor
+    assert all(type(ctx.actor).__name__ == "LoopActor" for ctx in ctxs)
+    assert all(ctx.pipeline.next_deliver == 3 for ctx in ctxs)
@@ -0,0 +1,60 @@
+# tests/test_bench.py
+import io
+
+from config import constants as Constants
+from src import bench
+
+def test_percentiles():
+    p = bench.percentiles([0.3, 0.1, 0.2, 0.4])
+    assert p["count"] == 4 and p["p50"] == 0.3 and p["max"] == 0.4
+    assert abs(p["mean"] - 0.25) < 1e-12
+    assert bench.percentiles([]) == {}
+
+def _record(throughput, p50, window=8):
+    return {
+        "config": {"target": "loopback", "mode": "closed", "n": 4, "window": window, "payload": 100, "concurrency": 8},
+        "results": {"throughput_inst_s": throughput, "latency_s": {"deliver": {"p50": p50, "p99": p50}}},
+    }
+
+def test_compare_flags_regressions_beyond_the_tolerance():
+    out = io.StringIO()
+    assert bench.compare([_record(95.0, 0.105)], [_record(100.0, 0.1)], tolerance=0.10, out=out)
+    assert not bench.compare([_record(80.0, 0.1)], [_record(100.0, 0.1)], tolerance=0.10, out=out)
+    assert not bench.compare([_record(100.0, 0.2)], [_record(100.0, 0.1)], tolerance=0.10, out=out)
+    assert "REGRESSION" in out.getvalue()
+    # a run without a matching baseline is reported, not failed
+    assert bench.compare([_record(1.0, 9.0, window=2)], [_record(100.0, 0.1)], tolerance=0.10, out=out)
+
+class EchoTarget:
+    """Delivers everything except the instances in `lose`."""
+
+    def __init__(self, lose=()):
+        self.lose = set(lose)
+        self.submitted = []
+
+    def submit(self, inst, value):
+        self.submitted.append((inst, len(value)))
+        return inst not in self.lose
+
+    def phase_done(self, phase, inst):
+        return None
+
+def test_closed_and_open_loop_workloads():
+    target = EchoTarget(lose={3})
+    res = bench.run_workload(target, "closed", instances=5, payload=64, first_inst=1, concurrency=2)
+    assert (res["delivered"], res["failed"]) == (4, 1)
+    assert sorted(target.submitted) == [(k, 64) for k in range(1, 6)]
+    assert res["latency_s"]["deliver"]["count"] == 4
+    res = bench.run_workload(EchoTarget(), "open", instances=4, payload=10, first_inst=1, rate=200.0)
+    assert res["delivered"] == 4 and res["throughput_inst_s"] > 0
+
+def test_loopback_target_records_phases_and_restores_the_window():
+    window = Constants.PIPELINE_WINDOW
+    target = bench.LoopbackTarget(4, window=2, timeout_s=30)
+    try:
+        res = bench.run_workload(target, "closed", instances=3, payload=32, first_inst=1, concurrency=2)
+    finally:
+        target.close()
+    assert res["delivered"] == 3
+    assert res["latency_s"]["mvba_decide"]["count"] == 3
+    assert Constants.PIPELINE_WINDOW == window
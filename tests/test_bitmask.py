@@ -0,0 +1,28 @@
+# tests/test_bitmask.py
+import pytest
+
+from src.bitmask import Bitmask
+
+@pytest.mark.parametrize("n", [1, 4, 7, 8, 9, 64, 100])
+def test_wire_roundtrip(n):
+    m = Bitmask.from_indices(n, range(0, n, 3))
+    back = Bitmask.from_wire(m.to_wire(), n)
+    assert back == m
+    assert list(back.indices()) == list(range(0, n, 3))
+    assert len(m.to_wire()) == 1 + 2 * ((n + 7) // 8)
+
+def test_bytes_roundtrip_and_ops():
+    a = Bitmask.from_list([1, 0, 1, 0, 0])
+    b = Bitmask.from_indices(5, [1, 2])
+    assert Bitmask.from_bytes(5, a.to_bytes()) == a
+    assert (a | b).popcount() == 3
+    assert str(a | b) == "11100"
+    assert a.test(2) and not a.test(1)
+
+def test_legacy_string():
+    assert Bitmask.from_wire("0110", 4) == Bitmask.from_indices(4, [1, 2])
+
+@pytest.mark.parametrize("wire", ["x", "xzz", "x0000", "x10", "011", "0120", ""])
+def test_rejects_malformed(wire):
+    # wrong length, bad hex, bits beyond n, non-binary legacy string
+    assert Bitmask.from_wire(wire, 4) is None
@@ -0,0 +1,58 @@
+# tests/test_catchup.py
+import json
+
+from proto import helloworld_pb2
+from config import constants as Constants
+from src import catchup, cost
+from src.microbench import make_ctx
+from src.sim import SimCluster, Simulator
+
+def _propose(cluster, greeter, inst, t):
+    req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=f"v{inst}-{greeter.ctx.node_id}")
+    cluster.sim.at(t, greeter.ctx.port, greeter._start_instance, req)
+
+def _run(cluster, done, until):
+    previous = cost.install(cluster.sim.spend)
+    try:
+        cluster.sim.run(until=until, stop=done)
+    finally:
+        cost.install(previous)
+    return done()
+
+def test_node_behind_the_watermark_catches_up(monkeypatch):
+    monkeypatch.setattr(Constants, "RETAIN_DECIDED", 1, raising=False)
+    cluster = SimCluster(4, sim=Simulator(latency_s=0.01, spread_s=0.02, seed=1), prune_interval_s=0.5)
+    try:
+        live, late = cluster.greeters[:3], cluster.greeters[3]
+        insts = range(1, 6)
+        cluster.sim.crash(late.ctx.port)
+        for k in insts:
+            for g in live:
+                _propose(cluster, g, k, t=0.001 * k)
+        everyone = lambda nodes: lambda: all(len(cluster.delivered.get(k, ())) == nodes for k in insts)
+        assert _run(cluster, everyone(3), until=120.0)
+        _run(cluster, lambda: False, until=cluster.sim.now + 2.0)  # let the pruner pass
+        assert all(g.ctx.low_watermark > 1 for g in live)        # instance 1 traffic is now dropped as stale
+
+        cluster.sim.recover(late.ctx.port)
+        for k in insts:
+            _propose(cluster, late, k, t=cluster.sim.now + 0.001 * k)
+        assert _run(cluster, everyone(4), until=cluster.sim.now + 60.0)
+        for k in insts:
+            assert len({v for _, v in cluster.delivered[k].values()}) == 1
+    finally:
+        cluster.close()
+
+def test_decided_needs_f_plus_1_matching_answers():
+    ctx = make_ctx(4)
+    ctx.decided = []
+    ctx.mvba_on_decide = lambda inst, result: ctx.decided.append((inst, result))
+    good = catchup.wire({"proposer": "id2", "value": "v", "proof": "p"})
+    forged = catchup.wire({"proposer": "id3", "value": "x", "proof": "p"})
+    catchup.on_decided(ctx, sender="id2", inst=1, w=good)
+    catchup.on_decided(ctx, sender="id2", inst=1, w=good)     # a repeat is not a second vote
+    catchup.on_decided(ctx, sender="id3", inst=1, w=forged)
+    catchup.on_decided(ctx, sender="id4", inst=1, w="{not json")
+    assert not ctx.decided
+    catchup.on_decided(ctx, sender="id4", inst=1, w=good)
+    assert ctx.decided == [(1, json.loads(good))]
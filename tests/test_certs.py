@@ -0,0 +1,73 @@
+# tests/test_certs.py
+import threading
+import time
+
+from config import constants as Constants
+from src import certs, cost
+from src.microbench import make_ctx
+
+def _verifier(monkeypatch, **costs):
+    monkeypatch.setattr(Constants, "CERT_BACKEND", "sim", raising=False)
+    for name, seconds in costs.items():
+        monkeypatch.setattr(Constants, name, seconds, raising=False)
+    ctx = make_ctx(4)
+    ctx.verifier = certs.Verifier(ctx, workers=0)
+    return ctx.verifier
+
+def test_sleeping_charges_run_off_the_caller(monkeypatch):
+    verifier = _verifier(monkeypatch, SShare=0.2, VTHShare=0.2)
+    try:
+        done = threading.Event()
+        got = []
+        started = time.monotonic()
+        verifier.offload(1, verifier.backend.sign, ("id1", b"m"), lambda share: (got.append(share), done.set()))
+        verifier.verify_cert(1, b"m", "QC|signers=id1,id2,id3", lambda ok: got.append(ok))
+        assert time.monotonic() - started < 0.1      # neither call slept on this thread
+        assert done.wait(5)
+        deadline = time.monotonic() + 5
+        while len(got) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert sorted(got, key=str) == ["", True]
+    finally:
+        verifier.close()
+
+def test_virtual_clock_charges_stay_inline(monkeypatch):
+    verifier = _verifier(monkeypatch, SShare=0.2)
+    spent = []
+    previous = cost.install(spent.append)
+    try:
+        got = []
+        verifier.offload(1, verifier.backend.sign, ("id1", b"m"), got.append)
+        assert got == [""] and spent == [0.2]        # done before offload returned
+        assert verifier._charger is None
+    finally:
+        cost.install(previous)
+        verifier.close()
+
+def test_cert_cache_evicts_the_least_recently_used():
+    cache = certs.CertCache(max_entries=2)
+    a, b, c = (certs.CertCache.key("cert", x) for x in "abc")
+    cache.add(a)
+    cache.add(b)
+    assert a in cache                                # a is now the most recent
+    cache.add(c)                                     # evicts b
+    assert b not in cache and a in cache and c in cache
+    assert cache.stats() == {"entries": 2, "hits": 3, "misses": 1}
+
+def test_cache_key_separates_its_parts():
+    assert certs.CertCache.key("ab", "c") != certs.CertCache.key("a", "bc")
+    assert certs.CertCache.key("x", b"1") == certs.CertCache.key("x", "1")
+
+def test_verified_cert_is_answered_from_the_cache(monkeypatch):
+    verifier = _verifier(monkeypatch)
+    calls = []
+    monkeypatch.setattr(certs, "_verify_cert_job", lambda *args: calls.append(args) or True)
+    previous = cost.install(lambda seconds: None)
+    try:
+        got = []
+        for _ in range(3):
+            verifier.verify_cert(1, b"m", "QC|signers=id1,id2,id3", got.append)
+        assert got == [True, True, True] and len(calls) == 1
+    finally:
+        cost.install(previous)
+        verifier.close()
@@ -0,0 +1,39 @@
+# tests/test_coin.py
+import pytest
+
+from config import constants as Constants
+from src import abba, coin, transport
+from src.microbench import make_ctx
+
+@pytest.fixture
+def ctx():
+    return make_ctx(4)
+
+def test_precompute_fills_the_lookahead_once(ctx, monkeypatch):
+    made = []
+    real = coin.make_share
+    monkeypatch.setattr(coin, "make_share", lambda *args: made.append(args[1:]) or real(*args))
+    coin.precompute(ctx, (1, 0), 1, lookahead=2)
+    coin.precompute(ctx, (1, 0), 2, lookahead=2)     # round 2 is already there
+    assert made == [((1, 0), 1), ((1, 0), 2), ((1, 0), 3)]
+    assert coin.my_share(ctx, (1, 0), 2) == real(ctx.node_id, (1, 0), 2)
+    assert len(made) == 3                           # served from the cache
+
+def test_piggyback_round_trip(ctx):
+    share = coin.my_share(ctx, (1, 0), 1)
+    assert coin.unpiggyback(coin.piggyback(share)) == share
+    assert coin.unpiggyback("") is None and coin.unpiggyback("sig") is None
+
+def test_coin_is_known_once_q_mainvotes_carry_shares(ctx):
+    # no separate COIN messages: the shares ride on the MAINVOTEs
+    aid = (1, 0)
+    ctx.abba_started.add(aid)
+    ctx.abba_round[aid] = 1
+    get_stub = lambda port: transport.get_stub(ctx, port)
+    for sender in ("id2", "id3", "id4"):
+        share = coin.make_share(sender, aid, 1)
+        abba.on_abba_message(ctx, get_stub, inst=1, idx=0, rnd=1, mtype=Constants.MAINVOTE,
+                             sender=sender, bit=abba.ABSTAIN, sign=coin.piggyback(share))
+    expected = coin.combine([coin.make_share(s, aid, 1) for s in ("id2", "id3", "id4")])
+    assert ctx.coins[(aid, 1)] == expected
+    assert (aid, 1) in ctx.coin_ready
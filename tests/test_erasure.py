@@ -0,0 +1,57 @@
+# tests/test_erasure.py
+import itertools
+
+import pytest
+
+from src import erasure, merkle
+
+DATA = bytes(range(256)) * 3 + b"tail"
+
+@pytest.mark.parametrize("n,k", [(4, 2), (7, 3), (10, 4)])
+def test_decode_from_any_k(n, k):
+    frags = erasure.encode(DATA, n, k)
+    assert len(frags) == n
+    for idx in itertools.combinations(range(n), k):
+        assert erasure.decode({i: frags[i] for i in idx}, k) == DATA
+
+def test_decode_with_missing_shards():
+    frags = erasure.encode(DATA, 4, 2)
+    # both data rows gone: rebuilt from the parity fragments alone
+    assert erasure.decode({2: frags[2], 3: frags[3]}, 2) == DATA
+    with pytest.raises(ValueError):
+        erasure.decode({3: frags[3]}, 2)
+
+def test_empty_and_bad_params():
+    assert erasure.decode(dict(enumerate(erasure.encode(b"", 4, 2))), 2) == b""
+    with pytest.raises(ValueError):
+        erasure.encode(DATA, 2, 3)
+
+def test_merkle_proofs():
+    frags = erasure.encode(DATA, 7, 3)
+    root, branches = merkle.tree(frags)
+    assert root == merkle.root(frags)
+    for i, (frag, branch) in enumerate(zip(frags, branches)):
+        assert merkle.verify(root, i, frag, branch)
+
+def test_merkle_rejects_bad_proof():
+    frags = erasure.encode(DATA, 7, 3)
+    root, branches = merkle.tree(frags)
+    tampered = bytes([frags[2][0] ^ 1]) + frags[2][1:]
+    assert not merkle.verify(root, 2, tampered, branches[2])     # altered fragment
+    assert not merkle.verify(root, 3, frags[2], branches[2])     # claimed at another index
+    assert not merkle.verify(root, 2, frags[2], branches[3])     # someone else's branch
+    assert not merkle.verify(root, 2, frags[2], branches[2][:-1])
+
+def test_inconsistent_dispersal_rejected():
+    from src import vcbc_cert
+    from src.context import NodeContext
+
+    ctx = NodeContext(node_id="id1", port=0, n=4, f=1, q=3)
+    k = vcbc_cert._k(ctx)
+    frags = erasure.encode(DATA, ctx.n, k)
+    frags[2] = bytes(len(frags[2]))          # not on the same codeword, but under the same root
+    root, branches = merkle.tree(frags)
+    for i in (0, 2):
+        vcbc_cert.on_fragment(ctx, 7, root, vcbc_cert._frag_wire(root, i, frags[i], branches[i]))
+    assert (7, root) in ctx.bad_dispersals
+    assert (7, root) not in ctx.payloads
@@ -0,0 +1,56 @@
+# tests/test_future_buffer.py
+import pytest
+
+from proto import helloworld_pb2
+from config import constants as Constants
+from src import abba, bitvec, server, transport
+from src.bitmask import Bitmask
+from src.future_buffer import FutureBuffer
+from src.microbench import make_ctx
+
+def test_bound_is_per_sender_and_released_on_take():
+    buf = FutureBuffer(max_per_sender=2)
+    assert buf.hold(("ABBA", 5, 0, 2), "id2", "a")
+    assert buf.hold(("ABBA", 6, 0, 1), "id2", "b")
+    assert not buf.hold(("ABBA", 7, 0, 1), "id2", "c")      # id2 is at its limit
+    assert buf.hold(("ABBA", 7, 0, 1), "id3", "d")          # others are not
+    assert buf.dropped == 1 and len(buf) == 3
+    assert buf.take(("ABBA", 5, 0, 2)) == ["a"]
+    assert buf.hold(("ABBA", 7, 0, 1), "id2", "c")          # room again
+    buf.forget_below(7)
+    assert len(buf) == 2 and buf.take(("ABBA", 6, 0, 1)) == []
+
+def test_vote_for_an_unstarted_instance_is_replayed_on_start():
+    ctx = make_ctx(4)
+    get_stub = lambda port: transport.get_stub(ctx, port)
+    vote = dict(inst=3, idx=0, rnd=1, mtype=Constants.PREVOTE, bit=1, justification="", sign="")
+    abba.on_abba_message(ctx, get_stub, sender="id2", **vote)
+    assert len(ctx.future) == 1
+    abba.start(ctx, (3, 0), input_bit=1, get_stub=get_stub)
+    assert len(ctx.future) == 0
+    assert abba._count(ctx, (3, 0), 1, Constants.PREVOTE) >= 1
+
+@pytest.fixture
+def greeter(monkeypatch):
+    monkeypatch.setattr(Constants, "PRUNE_INTERVAL_S", 0, raising=False)
+    monkeypatch.setattr(Constants, "STALL_SKIP_S", 0, raising=False)
+    monkeypatch.setattr(Constants, "CATCHUP_AFTER_S", 0, raising=False)
+    monkeypatch.setattr(Constants, "PIPELINE_WINDOW", 2, raising=False)
+    g = server.Greeter(make_ctx(4))
+    yield g
+    g.close()
+
+def _bitvec(sender, inst):
+    bits = bitvec.bitvec_to_str(Bitmask.from_indices(4, [0, 1, 2]))
+    return helloworld_pb2.PRORequest(id=sender, type="BITVEC", instance=inst, proof="", value=bits)
+
+def test_bitvec_past_the_window_waits_for_it(greeter):
+    ctx = greeter.ctx
+    greeter.Propose(_bitvec("id2", 2), None)                 # window is [1, 3): handled now
+    greeter.Propose(_bitvec("id2", 4), None)                 # past it: held
+    assert "id2" in ctx.bitvecs[2] and 4 not in ctx.bitvecs
+    assert len(ctx.future) == 1
+    ctx.pipeline.complete(1, None)                           # window [2, 4)
+    assert 4 not in ctx.bitvecs
+    ctx.pipeline.complete(2, None)                           # window [3, 5): replayed
+    assert "id2" in ctx.bitvecs[4] and len(ctx.future) == 0
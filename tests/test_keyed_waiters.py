@@ -0,0 +1,25 @@
+# tests/test_keyed_waiters.py
+import threading
+
+from src.keyed_waiters import KeyedWaiters
+
+def test_written_key_returns_at_once():
+    w = KeyedWaiters()
+    w["a"] = 1
+    assert "a" in w and w["a"] == 1
+    assert w.wait("a", timeout=0) == 1
+
+def test_waiter_wakes_on_its_key_only():
+    w = KeyedWaiters()
+    got = {}
+    waiter = threading.Thread(target=lambda: got.setdefault("v", w.wait("k", timeout=5)))
+    waiter.start()
+    w["other"] = 0
+    waiter.join(0.1)
+    assert waiter.is_alive()                 # another key does not wake it
+    w["k"] = "v"
+    waiter.join(5)
+    assert not waiter.is_alive() and got["v"] == "v"
+
+def test_timeout_returns_none():
+    assert KeyedWaiters().wait("missing", timeout=0.01) is None
@@ -0,0 +1,72 @@
+# tests/test_loopback.py
+import pytest
+
+from proto import helloworld_pb2
+from config import constants as Constants
+from src.loopback import Cluster
+
+INSTANCES = 12
+
+@pytest.mark.parametrize("settings", [
+    {},
+    {"ABBA_ENGINE": "numpy"},
+    {"COIN_BACKEND": "threshold"},
+    {"DISPERSAL": True},
+    {"ACTOR_SHARDS": 4},
+], ids=["default", "numpy", "threshold", "dispersal", "sharded"])
+def test_agreement_with_distinct_proposals(monkeypatch, settings):
+    for k, v in settings.items():
+        monkeypatch.setattr(Constants, k, v, raising=False)
+    cluster = Cluster(4, jitter_s=0.002, seed=1)
+    try:
+        for k in range(1, INSTANCES + 1):
+            cluster.propose(k, lambda node, k=k: f"v{k}-{node}")
+        assert cluster.wait_delivered(INSTANCES, timeout=60)
+        assert all(cluster.wait_delivered(k, timeout=10) for k in range(1, INSTANCES + 1))
+        assert cluster.disagreements() == {}
+        # the agreed value is some node's proposal for that instance
+        for k in range(1, INSTANCES + 1):
+            (value,) = set(cluster.delivered[k].values())
+            assert value.startswith(f"v{k}-id")
+    finally:
+        cluster.close()
+
+def test_admission_timeout_and_skip(monkeypatch):
+    monkeypatch.setattr(Constants, "PIPELINE_WINDOW", 1, raising=False)
+    monkeypatch.setattr(Constants, "ADMIT_TIMEOUT_S", 0.05, raising=False)
+    cluster = Cluster(4, seed=2)
+    try:
+        greeter = cluster.greeters[0]
+        late = helloworld_pb2.PRORequest(id="client", type="", instance=2, proof="", value="v2")
+        assert greeter.Propose(late, None).yes == "busy"        # inst 1 has no input anywhere yet
+
+        # nobody will ever propose for inst 1: give up on it and the window moves on
+        for g in cluster.greeters:
+            g.Propose(helloworld_pb2.PRORequest(id="client", type="SKIP", instance=1), None)
+        assert cluster.wait_delivered(1, timeout=30)
+        assert set(cluster.delivered[1].values()) == {""}
+        assert greeter.Propose(late, None).yes == "yes"
+    finally:
+        cluster.close()
+
+def test_one_input_per_instance_and_bounded_waiters(monkeypatch):
+    monkeypatch.setattr(Constants, "CLIENT_WAITERS", 1, raising=False)
+    cluster = Cluster(4, seed=3)
+    try:
+        cluster.propose(1, lambda node: f"v1-{node}")
+        assert cluster.wait_delivered(1, timeout=30)
+        greeter = cluster.greeters[0]
+        key = Constants.INSTANCE + "1"
+        again = helloworld_pb2.PRORequest(id="client", type="", instance=1, proof="", value="other")
+        assert greeter.Propose(again, None).yes == "taken"
+        greeter._start_instance(again)            # e.g. a client that raced the mempool into the actor
+        assert greeter.ctx.proposeMessage[key][Constants.VALUE] == "v1-id1"
+
+        assert greeter._waiters.acquire(blocking=False)     # the one allowed waiter is busy
+        try:
+            tx = helloworld_pb2.PRORequest(id="client", type="TX", value="tx-1")
+            assert greeter.Propose(tx, None).yes == "busy"
+        finally:
+            greeter._waiters.release()
+    finally:
+        cluster.close()
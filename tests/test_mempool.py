@@ -0,0 +1,73 @@
+# tests/test_mempool.py
+import threading
+
+import pytest
+
+from src import mempool
+from src.actor import ActorPool
+from src.context import NodeContext
+from src.pipeline import Pipeline
+
+@pytest.fixture
+def pool():
+    ctx = NodeContext(node_id="id1", port=50051, n=4)
+    ctx.init_quorum()
+    ctx.actor = ActorPool(1)
+    ctx.pipeline = Pipeline(window=8)
+    proposed = {}
+    cv = threading.Condition()
+
+    def propose(inst, value):
+        with cv:
+            proposed[inst] = mempool.decode_batch(value)
+            cv.notify_all()
+
+    def wait_proposed(k):
+        with cv:
+            assert cv.wait_for(lambda: len(proposed) >= k, 2)
+        return proposed
+
+    mp = mempool.Mempool(ctx, propose=propose, batch_size=3, timeout_s=0.05)
+    yield mp, wait_proposed
+    mp.close()
+    ctx.actor.close()
+
+def test_batch_roundtrip():
+    assert mempool.decode_batch(mempool.encode_batch(["a", "b"])) == ["a", "b"]
+    assert mempool.is_batch("[]") and not mempool.is_batch("v1")
+    assert mempool.decode_batch("v1") == []
+
+def test_cuts_batches_in_order(pool):
+    mp, wait_proposed = pool
+    for i in range(7):
+        assert mp.add(f"tx{i}")
+    # full batches first, the remainder once BATCH_TIMEOUT_S passes
+    assert wait_proposed(3) == {1: ["tx0", "tx1", "tx2"], 2: ["tx3", "tx4", "tx5"], 3: ["tx6"]}
+
+def test_duplicate_tx_not_batched_twice(pool):
+    mp, wait_proposed = pool
+    assert mp.add("tx")
+    assert mp.add("tx")
+    assert wait_proposed(1) == {1: ["tx"]}
+
+def test_commit_and_requeue(pool):
+    mp, wait_proposed = pool
+    for tx in ("a", "b"):
+        mp.add(tx)
+    wait_proposed(1)
+    # another proposer's batch won instance 1: "a" committed there, "b" goes back
+    mp.on_deliver(1, mempool.encode_batch(["x", "a"]))
+    assert mp.wait_committed("a", timeout=1) == (1, 1)
+    assert wait_proposed(2)[2] == ["b"]
+    mp.on_deliver(2, mempool.encode_batch(["b"]))
+    assert mp.wait_committed("b", timeout=1) == (2, 0)
+
+def test_full_pool_rejects():
+    ctx = NodeContext(node_id="id1", port=50051, n=4)
+    ctx.init_quorum()
+    mp = mempool.Mempool(ctx, propose=None, batch_size=10, timeout_s=60, max_pending=2)
+    try:
+        assert mp.add("a") and mp.add("b")
+        assert not mp.add("c")
+    finally:
+        mp.close()
@@ -0,0 +1,83 @@
+# tests/test_metrics.py
+import json
+import urllib.request
+
+from src import metrics
+from src.context import NodeContext
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def _walk(m, clock, inst, steps):
+    for phase, dt in steps:
+        clock.now += dt
+        m.mark(inst, phase)
+
+def test_phase_latency_is_measured_from_the_latest_earlier_phase():
+    clock = Clock()
+    m = metrics.Metrics("id1", clock=clock)
+    _walk(m, clock, 1, [("propose", 0), ("vcbc_cert", 0.004), ("support", 0.02),
+                        ("abba_start", 0.001), ("abba_decide", 0.2), ("mvba_decide", 0.0)])
+    assert m.phase["vcbc_cert"].sum == 0.004
+    assert m.phase["support"].sum == 0.02              # certprop_quorum was never marked
+    assert m.phase["certprop_quorum"].count == 0
+    assert abs(m.instance.sum - 0.225) < 1e-9
+    # marks are first-wins: a second abba_decide (next permutation index) changes nothing
+    m.mark(1, "abba_decide")
+    assert m.phase["abba_decide"].count == 1
+
+def test_histogram_buckets():
+    h = metrics.Histogram((1, 2, 5))
+    for v in (0.5, 1, 1.5, 5, 9):
+        h.observe(v)
+    assert h.counts == [2, 1, 1, 1]
+    lines = h.prometheus("x", 'node="a"')
+    assert 'x_bucket{node="a",le="2"} 3' in lines
+    assert 'x_bucket{node="a",le="+Inf"} 5' in lines
+    assert h.to_dict()["buckets"] == {"1": 2, "2": 1, "5": 1, "+Inf": 1}
+
+def test_coin_wait_and_forget_below():
+    clock = Clock()
+    m = metrics.Metrics("id1", clock=clock)
+    m.coin_ready((3, 0), 1)                 # piggybacked coin known before it is needed
+    clock.now = 1.0
+    m.coin_needed((3, 0), 1)
+    m.mark(3, "propose")
+    m.mark(5, "propose")
+    assert m.coin_wait.count == 1 and m.coin_wait.sum == 0.0
+    m.forget_below(4)
+    assert list(m.marks) == [5] and not m._coin
+
+def test_exports():
+    m = metrics.Metrics("id2")
+    m.mark(0, "propose")
+    m.mark(0, "mvba_decide")
+    m.decided_in(2)
+    text = m.prometheus()
+    assert 'bft_instance_seconds_count{node="id2"} 1' in text
+    assert 'bft_abba_rounds_bucket{node="id2",le="2"} 1' in text
+    snap = json.loads(json.dumps(m.snapshot()))
+    assert snap["node"] == "id2" and snap["instances_tracked"] == 1
+    assert set(snap["phase_seconds"]) == set(metrics.PHASES[1:])
+
+def test_serve_http():
+    ctx = NodeContext(node_id="id3", port=0, metrics=metrics.Metrics("id3"))
+    httpd = metrics.serve_http(ctx, 0)
+    try:
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics", timeout=5) as r:
+            assert b"bft_phase_seconds_bucket" in r.read()
+        with urllib.request.urlopen(base + "/metrics.json", timeout=5) as r:
+            assert json.load(r)["node"] == "id3"
+    finally:
+        httpd.shutdown()
+
+def test_call_sites_are_noops_without_metrics():
+    ctx = NodeContext(node_id="id1", port=0)
+    metrics.mark(ctx, 1, "propose")
+    metrics.decided_in(ctx, 1)
+    metrics.coin_needed(ctx, (1, 0), 1)
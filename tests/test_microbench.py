@@ -0,0 +1,35 @@
+# tests/test_microbench.py
+import json
+import sys
+
+import pytest
+
+from src import cost, microbench
+
+def test_every_benchmark_runs_and_restores_the_cost_hook():
+    hook = cost._spend
+    results = microbench.run_all(list(microbench.BENCHMARKS), sizes=[4], loops=5, repeat=1)
+    assert set(results) == {f"{name}[n=4]" for name in microbench.BENCHMARKS}
+    assert all(r["min_us"] > 0 and r["median_us"] >= r["min_us"] for r in results.values())
+    assert cost._spend is hook
+
+def test_compare_flags_a_slower_median(capsys):
+    base = {"x[n=4]": {"median_us": 10.0}}
+    assert microbench.compare({"x[n=4]": {"median_us": 11.0}}, base, tolerance=0.2)
+    assert not microbench.compare({"x[n=4]": {"median_us": 13.0}}, base, tolerance=0.2)
+    assert microbench.compare({"y[n=4]": {"median_us": 99.0}}, base, tolerance=0.2)   # no baseline yet
+    assert "REGRESSION" in capsys.readouterr().out
+
+def test_save_then_compare_against_this_machine(tmp_path, monkeypatch):
+    baseline = tmp_path / "microbench.json"
+    args = ["microbench", "-k", "mvba.common_perm", "--n", "4", "--loops", "3", "--repeat", "1", "--baseline", str(baseline)]
+    monkeypatch.setattr(sys, "argv", args + ["--save"])
+    with pytest.raises(SystemExit) as done:
+        microbench.main()
+    assert done.value.code == 0
+    assert "mvba.common_perm[n=4]" in json.loads(baseline.read_text())[microbench.machine()]
+    # a huge tolerance: only the plumbing is under test, not this machine's noise
+    monkeypatch.setattr(sys, "argv", args + ["--compare", "--tolerance", "1000"])
+    with pytest.raises(SystemExit) as done:
+        microbench.main()
+    assert done.value.code == 0
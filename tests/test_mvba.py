@@ -0,0 +1,131 @@
+# tests/test_mvba.py
+from concurrent.futures import Future
+
+import pytest
+
+from proto import helloworld_pb2
+from config import constants as Constants
+from src import abba, cost, mvba, transport, vcbc_cert
+from src.loopback import LoopbackStub
+from src.microbench import make_ctx
+from src.sim import SimCluster, Simulator
+
+class Recorder:
+    """ctx.loopback that keeps every send: [(port, method, request)]."""
+
+    def __init__(self):
+        self.sent = []
+
+    def stub(self, src, port):
+        return LoopbackStub(self, src, port)
+
+    def send(self, src, port, method, req):
+        self.sent.append((port, method, req))
+        fut = Future()
+        fut.set_result(None)
+        return fut
+
+@pytest.fixture
+def ctx():
+    ctx = make_ctx(4)
+    ctx.loopback = Recorder()
+    ctx.decided = []
+    ctx.mvba_on_aba_decide = lambda aid, bit: mvba.on_aba_decide(ctx, aid, bit)
+    ctx.mvba_on_decide = lambda inst, result: ctx.decided.append((inst, result))
+    return ctx
+
+def _get_stub(ctx):
+    return lambda port: transport.get_stub(ctx, port)
+
+def _started(ctx, inst):
+    ctx.mvba_started.add(inst)
+    ctx.mvba_perm[inst] = mvba.common_perm(ctx, inst)
+    ctx.mvba_index[inst] = 0
+    return ctx.mvba_perm[inst]
+
+def test_permutation_is_common_and_per_instance(ctx):
+    other = make_ctx(4)
+    assert mvba.common_perm(ctx, 5) == mvba.common_perm(other, 5)
+    assert sorted(mvba.common_perm(ctx, 5)) == ctx.node_ids
+    assert len({tuple(mvba.common_perm(ctx, k)) for k in range(20)}) > 1
+
+def test_decision_adopted_at_f_plus_1(ctx):
+    _started(ctx, 1)
+    ctx.abba_started.add((1, 0))
+    decision = dict(inst=1, idx=0, rnd=2, mtype=Constants.DECISION, bit=0)
+    abba.on_abba_message(ctx, _get_stub(ctx), sender="id2", **decision)
+    assert (1, 0) not in ctx.abba_decided                  # one report could be a liar's
+    abba.on_abba_message(ctx, _get_stub(ctx), sender="id3", **decision)
+    assert ctx.abba_decided[(1, 0)] == 0
+    assert ctx.mvba_index[1] == 1                           # moved on to the next proposer
+
+def test_decision_before_index_is_reached_is_kept(ctx):
+    perm = _started(ctx, 1)
+    ctx.abba_decided[(1, 1)] = 1                            # learned early from f+1 DECISIONs
+    ctx.certified_props[1] = {perm[1]: {"value": "v", "digest": vcbc_cert.digest("v"), "proof": "p"}}
+    mvba.on_aba_decide(ctx, (1, 0), 0)
+    assert ctx.decided == [(1, {"proposer": perm[1], "value": "v", "proof": "p"})]
+
+def test_missing_certificate_is_fetched(ctx):
+    perm = _started(ctx, 1)
+    mvba.on_aba_decide(ctx, (1, 0), 1)
+    assert ctx.mvba_waiting[1] == 0 and not ctx.decided
+    fetches = [req for _, method, req in ctx.loopback.sent if method == "Propose" and req.type == "CERTFETCH"]
+    assert len(fetches) == ctx.n - 1 and fetches[0].value == perm[0]
+
+    # a peer answers with the CERTPROPOSAL; its payload came with the proposer's SEND
+    ctx.payloads[(1, vcbc_cert.digest("v"))] = "v"
+    vcbc_cert._accept_certproposal(ctx, perm[0], 1, vcbc_cert.digest("v"), "p")
+    assert ctx.decided == [(1, {"proposer": perm[0], "value": "v", "proof": "p"})]
+    assert 1 not in ctx.mvba_waiting
+
+def test_every_index_zero_gives_no_value(ctx):
+    _started(ctx, 1)
+    for idx in range(ctx.n):
+        ctx.abba_decided[(1, idx)] = 0
+    mvba.on_aba_decide(ctx, (1, 0), 0)
+    assert ctx.decided == [(1, None)]
+
+def test_silent_first_proposer_is_skipped():
+    cluster = SimCluster(4, sim=Simulator(latency_s=0.01, spread_s=0.02, seed=3))
+    previous = cost.install(cluster.sim.spend)
+    try:
+        first = mvba.common_perm(cluster.greeters[0].ctx, 1)[0]
+        silent = next(g for g in cluster.greeters if g.ctx.node_id == first)
+        live = [g for g in cluster.greeters if g is not silent]
+        cluster.sim.crash(silent.ctx.port)
+        for g in live:
+            req = helloworld_pb2.PRORequest(id="client", type="", instance=1, proof="", value=f"v-{g.ctx.node_id}")
+            cluster.sim.at(0.0, g.ctx.port, g._start_instance, req)
+        cluster.sim.run(until=60.0, stop=lambda: len(cluster.delivered.get(1, ())) == 3)
+
+        (value,) = {v for _, v in cluster.delivered[1].values()}
+        assert value in {f"v-{g.ctx.node_id}" for g in live}
+        assert all(g.ctx.abba_decided[(1, 0)] == 0 for g in live)
+    finally:
+        cost.install(previous)
+        cluster.close()
+
+def test_missing_payload_is_fetched_by_digest(ctx):
+    perm = _started(ctx, 1)
+    d = vcbc_cert.digest("v")
+    ctx.certified_props[1] = {perm[0]: {"value": None, "digest": d, "proof": "p"}}   # CERTPROPOSAL carries the digest only
+    mvba.on_aba_decide(ctx, (1, 0), 1)
+    mvba.on_aba_decide(ctx, (1, 0), 1)
+    fetches = [req for _, method, req in ctx.loopback.sent if method == "Propose" and req.type == "FETCH"]
+    assert len(fetches) == ctx.n - 1 and fetches[0].value == d          # asked once, by digest
+    assert not ctx.decided
+
+    vcbc_cert.on_payload(ctx, 1, d, "forged")                            # does not hash to d
+    assert not ctx.decided
+    vcbc_cert.on_payload(ctx, 1, d, "v")
+    assert ctx.decided == [(1, {"proposer": perm[0], "value": "v", "proof": "p"})]
+
+def test_fetch_is_answered_from_the_payload_store(ctx):
+    d = vcbc_cert.digest("v")
+    vcbc_cert.on_fetch(ctx, "id3", 1, d)
+    assert not ctx.loopback.sent                                         # nothing to give
+    ctx.payloads[(1, d)] = "v"
+    vcbc_cert.on_fetch(ctx, "id3", 1, d)
+    ((port, _, req),) = ctx.loopback.sent
+    assert port == Constants.PORTLIST[2] and req.type == "PAYLOAD" and (req.proof, req.value) == (d, "v")
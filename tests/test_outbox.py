@@ -0,0 +1,79 @@
+# tests/test_outbox.py
+import threading
+import time
+
+import pytest
+
+from proto import helloworld_pb2
+from src import outbox
+from src.context import NodeContext
+
+PEER = 50052
+
+class Sink:
+    """send_batch stand-in: records batches, and can be held shut to let the queue fill."""
+
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+        self.sent = threading.Condition()
+
+    def __call__(self, port, batch):
+        self.gate.wait()
+        with self.sent:
+            self.batches.append([m.instance_id for m in batch.messages])
+            self.sent.notify_all()
+
+    def wait_for(self, count, timeout=5.0):
+        with self.sent:
+            return self.sent.wait_for(lambda: sum(map(len, self.batches)) >= count, timeout)
+
+@pytest.fixture
+def ctx():
+    return NodeContext(node_id="id1", port=50051, id_to_index={"id1": 0})
+
+def _put(box, *instances):
+    for i in instances:
+        box.put("Propose", helloworld_pb2.PRORequest(id="id1", instance=i))
+
+def test_pending_messages_coalesce_into_one_batch(ctx):
+    sink = Sink()
+    sink.gate.clear()
+    box = outbox.PeerOutbox(ctx, PEER, sink)
+    _put(box, 0)                 # taken by the sender, which then blocks in the sink
+    time.sleep(0.05)
+    _put(box, 1, 2, 3)
+    sink.gate.set()
+    assert sink.wait_for(4)
+    assert sink.batches == [[0], [1, 2, 3]]
+    assert ctx.send_ok[PEER] == 4 and ctx.batches_sent[PEER] == 2
+
+def test_full_outbox_drops_oldest(ctx, monkeypatch):
+    monkeypatch.setattr(outbox.Constants, "OUTBOX_MAX_PENDING", 3, raising=False)
+    sink = Sink()
+    sink.gate.clear()
+    box = outbox.PeerOutbox(ctx, PEER, sink)
+    _put(box, 0)
+    time.sleep(0.05)
+    _put(box, 1, 2, 3, 4, 5)
+    assert box.dropped == 2 and ctx.send_failures[PEER] == 2
+    sink.gate.set()
+    assert sink.wait_for(4)
+    assert sink.batches == [[0], [3, 4, 5]]
+
+def test_failed_batch_is_counted(ctx):
+    def broken(port, batch):
+        raise RuntimeError("down")
+    box = outbox.PeerOutbox(ctx, PEER, broken)
+    _put(box, 0, 1)
+    deadline = time.monotonic() + 5
+    while ctx.send_failures.get(PEER, 0) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ctx.send_failures[PEER] == 2 and PEER not in ctx.batches_sent
+
+def test_encode_decode_roundtrip(ctx):
+    req = helloworld_pb2.PRORequest(id="id1", type="BITVEC", instance=9, value="1010")
+    msg = outbox.encode(ctx, "Propose", req)
+    assert msg.instance_id == 9 and msg.sender_id == 0
+    assert outbox.decode(msg) == ("Propose", req)
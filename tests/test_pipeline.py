@@ -0,0 +1,65 @@
+# tests/test_pipeline.py
+import threading
+
+from src.pipeline import Pipeline
+
+def test_delivers_in_instance_order():
+    out = []
+    p = Pipeline(window=4, deliver=lambda inst, res: out.append((inst, res)))
+    for inst in (3, 2, 4):
+        p.complete(inst, f"r{inst}")
+    assert out == []              # 1 is still running
+    p.complete(1, "r1")
+    assert out == [(1, "r1"), (2, "r2"), (3, "r3"), (4, "r4")]
+
+def test_ignores_duplicates_and_delivered():
+    out = []
+    p = Pipeline(window=4, deliver=lambda inst, res: out.append(inst))
+    p.complete(1, "a")
+    p.complete(1, "b")
+    p.complete(2, "c")
+    p.complete(2, "d")
+    assert out == [1, 2]
+    assert p.wait_delivered(2, timeout=0) == (True, "c")
+
+def test_admit_blocks_outside_window():
+    p = Pipeline(window=2)
+    assert p.admit(2, timeout=0)
+    assert not p.admit(3, timeout=0)
+
+    admitted = threading.Event()
+    t = threading.Thread(target=lambda: p.admit(3) and admitted.set())
+    t.start()
+    assert not admitted.wait(0.05)
+    p.complete(1, None)
+    assert admitted.wait(1)
+    t.join()
+
+def test_forget_below():
+    p = Pipeline(window=4)
+    for inst in (1, 2, 3):
+        p.complete(inst, inst)
+    p.forget_below(3)
+    assert p.wait_delivered(2, timeout=0) == (False, None)
+    assert p.wait_delivered(3, timeout=0) == (True, 3)
+
+def test_stalled_only_with_work_queued_behind():
+    p = Pipeline(window=4)
+    assert p.stalled(0) is None                 # idle is not stuck
+    p.complete(3, "r3")
+    assert p.stalled(60) is None                # not for long enough yet
+    assert p.stalled(0) == 1
+    p.complete(1, "r1")
+    assert p.stalled(0) == 2
+    p.complete(2, "r2")
+    assert p.stalled(0) is None
+
+def test_stalled_with_a_blocked_admit():
+    p = Pipeline(window=1)
+    t = threading.Thread(target=p.admit, args=(2, 1.0))
+    t.start()
+    while not p.admitting:
+        pass
+    assert p.stalled(0) == 1
+    t.join()
+    assert p.admitting == 0
@@ -0,0 +1,71 @@
+# tests/test_pruning.py
+import pytest
+
+from config import constants as Constants
+from src import abba, pruning, transport
+from src.microbench import make_ctx
+
+@pytest.fixture
+def ctx(monkeypatch):
+    monkeypatch.setattr(Constants, "RETAIN_DECIDED", 2, raising=False)
+    ctx = make_ctx(4)
+    ctx.mvba_on_aba_decide = None
+    return ctx
+
+def _decision(ctx, sender, inst, bit=1, idx=0):
+    get_stub = lambda port: transport.get_stub(ctx, port)
+    abba.on_abba_message(ctx, get_stub, inst=inst, idx=idx, rnd=1, mtype=Constants.DECISION, sender=sender, bit=bit)
+
+def test_peer_decided_advances_over_contiguous_reports_only(ctx):
+    for inst in (1, 2, 4):
+        pruning.note_decided(ctx, "id2", inst)
+    assert ctx.peer_decided["id2"] == 2
+    pruning.note_decided(ctx, "id2", 3)
+    assert ctx.peer_decided["id2"] == 4 and not ctx.peer_ahead["id2"]
+
+def test_far_ahead_reports_are_bounded(ctx, monkeypatch):
+    monkeypatch.setattr(Constants, "FUTURE_MAX_PER_SENDER", 3, raising=False)
+    for inst in range(10, 20):
+        pruning.note_decided(ctx, "id4", inst)
+    assert len(ctx.peer_ahead["id4"]) == 3 and ctx.peer_decided.get("id4", 0) == 0
+
+def test_a_lone_decision_does_not_count(ctx):
+    _decision(ctx, "id4", 1)
+    assert "id4" not in ctx.peer_decided          # could be forged: nothing decided here yet
+    _decision(ctx, "id3", 1)                      # f+1 = 2 matching: decided, both now count
+    assert ctx.abba_decided[(1, 0)] == 1
+    assert ctx.peer_decided["id3"] == 1 and ctx.peer_decided["id4"] == 1
+    _decision(ctx, "id2", 1, bit=0)               # contradicts the decision
+    assert "id2" not in ctx.peer_decided
+    _decision(ctx, "id2", 2, bit=0, idx=1)
+    _decision(ctx, "id3", 2, bit=0, idx=1)        # decided 0 at an inner index: their MVBA is not over
+    assert ctx.abba_decided[(2, 1)] == 0
+    assert "id2" not in ctx.peer_decided and ctx.peer_decided["id3"] == 1
+
+def test_watermark_needs_q_nodes_and_keeps_retain_decided(ctx):
+    ctx.mvba_done.update(range(1, 11))
+    for node in ("id2", "id3"):
+        for inst in range(1, 9):
+            pruning.note_decided(ctx, node, inst)
+    assert pruning.next_watermark(ctx) == 0            # only two reports, q = 3
+    for inst in range(1, 6):
+        pruning.note_decided(ctx, "id4", inst)
+    # q-th highest report is 5, this node is at 10: keep 4 and 5
+    assert pruning.next_watermark(ctx) == 4
+
+def test_maybe_prune_drops_old_state(ctx):
+    for inst in range(1, 6):
+        ctx.mvba_done.add(inst)
+        ctx.mvba_decided[inst] = {"value": f"v{inst}"}
+        ctx.abba_decided[(inst, 0)] = 1
+        ctx.payloads[(inst, "d")] = "x"
+        ctx.proposeMessage[Constants.INSTANCE + str(inst)] = {}
+        for node in ("id2", "id3", "id4"):
+            pruning.note_decided(ctx, node, inst)
+    pruning.maybe_prune(ctx)
+    assert ctx.low_watermark == 4
+    assert sorted(ctx.mvba_decided) == [4, 5]
+    assert sorted(k[0] for k in ctx.abba_decided) == [4, 5]
+    assert sorted(k[0] for k in ctx.payloads) == [4, 5]
+    assert len(ctx.proposeMessage) == 2
+    assert pruning.is_stale(ctx, 3) and not pruning.is_stale(ctx, 4)
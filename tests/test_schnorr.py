@@ -0,0 +1,35 @@
+# tests/test_schnorr.py
+from src import schnorr
+
+def _keys(n):
+    sks = [schnorr.secret_key("test", f"id{i}") for i in range(1, n + 1)]
+    return sks, [schnorr.mul(sk) for sk in sks]
+
+def test_sign_verify():
+    (sk,), (pk,) = _keys(1)
+    sig = schnorr.sign(sk, b"msg", pk)
+    assert schnorr.verify(pk, b"msg", sig)
+    assert not schnorr.verify(pk, b"other", sig)
+    assert schnorr.public_key("test", "id1") == pk
+
+def test_wrong_key_and_malformed():
+    sks, pks = _keys(2)
+    sig = schnorr.sign(sks[0], b"msg", pks[0])
+    assert not schnorr.verify(pks[1], b"msg", sig)
+    assert not schnorr.verify(pks[0], b"msg", "zz")
+    assert not schnorr.verify(pks[0], b"msg", sig[:-2])
+
+def test_point_encoding():
+    _, (pk,) = _keys(1)
+    assert schnorr.decode_point(schnorr.encode_point(pk)) == pk
+    assert schnorr.decode_point(b"\x05" + bytes(32)) is None
+
+def test_batch_verify():
+    sks, pks = _keys(4)
+    items = [(pk, f"m{i}".encode(), schnorr.sign(sk, f"m{i}".encode(), pk)) for i, (sk, pk) in enumerate(zip(sks, pks))]
+    assert schnorr.batch_verify(items)
+    bad = list(items)
+    bad[2] = (pks[2], b"forged", items[2][2])
+    assert not schnorr.batch_verify(bad)
+    swapped = [(pks[1], *items[0][1:])] + items[1:]
+    assert not schnorr.batch_verify(swapped)
@@ -0,0 +1,83 @@
+# tests/test_sim.py
+import pytest
+
+from proto import helloworld_pb2
+from config import constants as Constants
+from src import cost
+from src import sim as simmod
+from src.sim import HEADER_BYTES, SimCluster, Simulator
+
+def _run(cluster, insts, live, horizon_s=120.0):
+    done = lambda: all(len(cluster.delivered.get(k, ())) == len(live) for k in insts)
+    previous = cost.install(cluster.sim.spend)
+    try:
+        cluster.sim.run(until=horizon_s, stop=done)
+    finally:
+        cost.install(previous)
+    return done()
+
+def _propose_distinct(cluster, inst, greeters, t=0.0):
+    for g in greeters:
+        req = helloworld_pb2.PRORequest(id="client", type="", instance=inst, proof="", value=f"v{inst}-{g.ctx.node_id}")
+        cluster.sim.at(t, g.ctx.port, g._start_instance, req)
+
+@pytest.mark.parametrize("settings", [{}, {"ABBA_ENGINE": "numpy"}], ids=["default", "numpy"])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_agreement_with_a_silent_node(monkeypatch, settings, seed):
+    # n=4, f=1, and id4 never says anything: the other three must still reach
+    # q=3 in every phase, with their own votes counted, and agree
+    for k, v in settings.items():
+        monkeypatch.setattr(Constants, k, v, raising=False)
+    cluster = SimCluster(4, sim=Simulator(latency_s=0.01, spread_s=0.02, seed=seed))
+    try:
+        live = cluster.greeters[:3]
+        cluster.sim.crash(cluster.greeters[3].ctx.port)
+        insts = range(1, 7)
+        for k in insts:
+            _propose_distinct(cluster, k, live, t=0.001 * k)
+        assert _run(cluster, insts, live)
+        for k in insts:
+            (value,) = {v for _, v in cluster.delivered[k].values()}
+            assert value in {f"v{k}-id{i}" for i in (1, 2, 3)}
+    finally:
+        cluster.close()
+
+class Inbox:
+    """Stands in for a Greeter: records when each Propose arrives."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.arrivals = []
+
+    def Propose(self, req, context):
+        self.arrivals.append((round(self.sim.now, 9), req.value))
+        return helloworld_pb2.PROReply(yes="ok")
+
+def test_links_charge_latency_and_bandwidth():
+    sim = Simulator(latency_s=0.1, bandwidth=1000.0)
+    inbox = Inbox(sim)
+    sim.attach(2, inbox)
+    req = helloworld_pb2.PRORequest(id="a", type="X", instance=1, proof="", value="x" * 36)
+    size = req.ByteSize() + HEADER_BYTES
+    futs = [sim.send(1, 2, "Propose", req) for _ in range(2)]
+    sim.run()
+    # the second message waits for the first to leave the link
+    assert [t for t, _ in inbox.arrivals] == [round(size / 1000 + 0.1, 9), round(2 * size / 1000 + 0.1, 9)]
+    assert all(f.result().yes == "ok" for f in futs)
+    assert (sim.msgs, sim.bytes) == (2, 2 * size)
+
+def test_charged_cpu_keeps_the_node_busy():
+    sim = Simulator()
+    ran = []
+    sim.at(0.0, 1, lambda: (ran.append(("a", sim.now)), sim.spend(0.5)))
+    sim.at(0.1, 1, lambda: ran.append(("b", sim.now)))     # same node: waits for a's CPU time
+    sim.at(0.1, 2, lambda: ran.append(("c", sim.now)))     # other node: runs on time
+    sim.run()
+    assert ran == [("a", 0.0), ("c", 0.1), ("b", 0.5)]
+
+def test_runs_are_reproducible():
+    kwargs = dict(n=4, f=None, payload=200, instances=4, interval_s=0.01,
+                  sim_kwargs=dict(latency_s=0.01, spread_s=0.02, seed=7), horizon_s=60.0)
+    first, second = (simmod.run_once(**kwargs) for _ in range(2))
+    first.pop("wall_s"), second.pop("wall_s")
+    assert first == second and first["delivered"] == 4
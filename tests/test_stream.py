@@ -0,0 +1,75 @@
+# tests/test_stream.py
+import threading
+import time
+
+import grpc
+
+from proto import bft_pb2
+from src.microbench import make_ctx
+from src.server import Node
+from src.stream import PeerStream
+
+class Broken(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+class Peer:
+    """open_stream for PeerStream: the first stream acks one batch, takes the next and breaks."""
+
+    def __init__(self):
+        self.streams = []          # seqs seen, per stream
+
+    def __call__(self, requests):
+        seen = []
+        self.streams.append(seen)
+        first = len(self.streams) == 1
+        for batch in requests:
+            seen.append(batch.seq)
+            if first and len(seen) == 2:
+                raise Broken()
+            yield bft_pb2.Ack(ok=True, status=bft_pb2.ACCEPTED)
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+def test_unacked_batches_are_replayed_in_order_after_a_break():
+    peer = Peer()
+    stream = PeerStream(make_ctx(4), 50052, peer, window=8)
+    for _ in range(3):
+        stream.send(bft_pb2.MessageBatch())
+    assert _wait(lambda: len(peer.streams) == 2 and len(peer.streams[1]) == 2)
+    assert peer.streams[0][:2] == [1, 2]
+    assert peer.streams[1] == [2, 3]                # 1 was acked; 2 is sent again
+    assert stream.reconnects == 1
+    assert _wait(lambda: not stream._unacked)
+
+def test_window_blocks_the_sender_until_acks_return():
+    release = threading.Event()
+
+    def slow_peer(requests):
+        for _ in requests:
+            release.wait()
+            yield bft_pb2.Ack(ok=True)
+
+    stream = PeerStream(make_ctx(4), 50052, slow_peer, window=2)
+    stream.send(bft_pb2.MessageBatch())
+    stream.send(bft_pb2.MessageBatch())
+    third = threading.Thread(target=stream.send, args=(bft_pb2.MessageBatch(),), daemon=True)
+    third.start()
+    third.join(0.1)
+    assert third.is_alive()                         # no credit left
+    release.set()
+    third.join(5)
+    assert not third.is_alive()
+
+def test_replayed_batch_is_applied_once():
+    node = Node(greeter=None)                       # empty batches never reach the Greeter
+    batch = lambda seq, session=7: bft_pb2.MessageBatch(sender_id=2, session=session, seq=seq)
+    assert node.SendBatch(batch(1), None).reason == ""
+    assert node.SendBatch(batch(2), None).reason == ""
+    assert node.SendBatch(batch(2), None).reason == "duplicate"
+    assert node.SendBatch(batch(1), None).reason == "duplicate"
+    assert node.SendBatch(batch(1, session=8), None).reason == ""   # a new stream session starts over
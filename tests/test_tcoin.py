@@ -0,0 +1,68 @@
+# tests/test_tcoin.py
+import pytest
+
+from src import schnorr as ec
+from src import tcoin
+
+N, T = 4, 2
+NAME = b"coin|inst=1|idx=0|r=1"
+
+@pytest.fixture(scope="module")
+def ring():
+    return tcoin.deal(N, T)
+
+def _shares(ring, name=NAME):
+    xs, vks = ring
+    return [(i, tcoin.make_share(xs[i], vks[i], i, name)) for i in range(N)]
+
+def _forged(vks, index, name=NAME, k=12345):
+    # S = -VK_i with A1 = kG, A2 = kH, z = k: both DLEQ equations are off by
+    # c*VK_i, with opposite signs, so they cancel when summed with equal weights
+    Hc = tcoin.hash_to_point(name)
+    S = ec.mul(ec.N - 1, vks[index])
+    pts = (S, ec.mul(k), ec.mul(k, Hc))
+    return (index.to_bytes(tcoin.INDEX_BYTES, "big") + b"".join(ec.encode_point(p) for p in pts) + k.to_bytes(32, "big")).hex()
+
+def test_valid_shares_verify(ring):
+    assert tcoin.verify_shares(ring[1], NAME, _shares(ring)) == [True] * N
+
+def test_any_t_shares_give_the_same_coin(ring):
+    shares = [s for _, s in _shares(ring)]
+    coins = {tcoin.combine(T, [shares[i], shares[j]]) for i in range(N) for j in range(i + 1, N)}
+    assert len(coins) == 1
+    assert coins <= {0, 1}
+
+@pytest.mark.parametrize("position", [0, 1, 3])
+def test_forged_share_rejected(ring, position):
+    _, vks = ring
+    items = _shares(ring)
+    items[position] = (position, _forged(vks, position))
+    oks = tcoin.verify_shares(vks, NAME, items)
+    assert oks == [i != position for i in range(N)]
+    # alone too, where the batch check is the only check
+    assert tcoin.verify_shares(vks, NAME, [items[position]]) == [False]
+
+def test_rejects_wrong_index_name_and_garbage(ring):
+    _, vks = ring
+    (i0, s0), (i1, s1) = _shares(ring)[:2]
+    assert tcoin.verify_shares(vks, NAME, [(i1, s0)]) == [False]
+    assert tcoin.verify_shares(vks, b"coin|other", [(i0, s0)]) == [False]
+    assert tcoin.verify_shares(vks, NAME, [(i0, "zz"), (N, s1), (i1, s1)]) == [False, False, True]
+
+def test_keyring_is_deterministic():
+    assert tcoin.keyring("seed", N, T) == tcoin.keyring("seed", N, T)
+    assert tcoin.keyring("seed", N, T)[1] != tcoin.keyring("other", N, T)[1]
+
+def test_indices_beyond_one_byte():
+    # a sharing with only nodes 0 and 300 materialised: the index is not capped at 256
+    coeffs = [7, 11]
+    x = lambda i: (coeffs[0] + coeffs[1] * (i + 1)) % ec.N
+    vks = [None] * 301
+    vks[0], vks[300] = ec.mul(x(0)), ec.mul(x(300))
+    s0 = tcoin.make_share(x(0), vks[0], 0, NAME)
+    s300 = tcoin.make_share(x(300), vks[300], 300, NAME)
+    assert tcoin.parse_share(s300)[0] == 300
+    assert tcoin.verify_shares(vks, NAME, [(0, s0), (300, s300)]) == [True, True]
+    assert tcoin.verify_shares(vks, NAME, [(44, s300)]) == [False]
+    xs, ring_vks = tcoin.shamir(coeffs, 2)
+    assert tcoin.combine(T, [s0, s300]) == tcoin.combine(T, [tcoin.make_share(xs[i], ring_vks[i], i, NAME) for i in range(2)])